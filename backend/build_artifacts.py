@@ -0,0 +1,46 @@
+"""
+Build step for persisted model artifacts.
+Fits the recommenders once and writes their arrays to ARTIFACTS_DIR so
+API workers can memory-map them at startup instead of refitting.
+
+Usage:
+    python -m backend.build_artifacts [--output DIR]
+"""
+
+import argparse
+import time
+from backend import config
+from backend.utils.artifacts import save_artifacts
+from backend.utils.catalog import get_catalog
+from backend.models.recommender import (
+    content_recommender,
+    collaborative_recommender,
+    factorization_recommender,
+    model_params
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the models and persist their arrays.")
+    parser.add_argument('--output', default=config.ARTIFACTS_DIR, help="Artifact directory")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    catalog = get_catalog()
+    content_recommender.fit(catalog)
+    collaborative_recommender.fit(catalog)
+    factorization_recommender.fit(catalog)
+    
+    save_artifacts(
+        args.output,
+        {
+            'catalog': catalog.get_arrays(),
+            'content': content_recommender.get_arrays(),
+            'collaborative': collaborative_recommender.get_arrays(),
+            'factorization': factorization_recommender.get_arrays()
+        },
+        model_params()
+    )
+    print(f"Wrote model artifacts to {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Runtime configuration for the Movie Recommendation System backend.
+Every setting can be overridden with an environment variable.
+"""
+
+import os
+
+def _optional_int(name):
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else None
+
+def _optional_float(name):
+    value = os.environ.get(name, '').strip()
+    return float(value) if value else None
+
+def _flag(name):
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# Model settings (None = dense similarity matrices)
+CONTENT_TOP_K = _optional_int('CONTENT_TOP_K')
+COLLABORATIVE_NEIGHBORS = _optional_int('COLLABORATIVE_NEIGHBORS')
+MODEL_N_JOBS = _optional_int('MODEL_N_JOBS')
+
+# Content similarity search: 'exact' or 'ivf' (approximate IVF index,
+# see backend/utils/ann.py)
+CONTENT_INDEX = os.environ.get('CONTENT_INDEX', 'exact').strip().lower()
+CONTENT_ANN = {
+    'n_lists': _optional_int('ANN_N_LISTS'),
+    'n_probe': int(os.environ.get('ANN_N_PROBE', 16)),
+    'n_components': int(os.environ.get('ANN_COMPONENTS', 128))
+} if CONTENT_INDEX == 'ivf' else None
+
+# Refit the content model once this fraction of the catalog was added or
+# replaced incrementally, so TF-IDF vocabulary and weights catch up
+CONTENT_REFIT_RATIO = float(os.environ.get('CONTENT_REFIT_RATIO', 0.1))
+
+# Matrix factorization (ALS) model
+FACTORIZATION_FACTORS = int(os.environ.get('FACTORIZATION_FACTORS', 32))
+FACTORIZATION_REGULARIZATION = float(os.environ.get('FACTORIZATION_REGULARIZATION', 0.1))
+FACTORIZATION_ITERATIONS = int(os.environ.get('FACTORIZATION_ITERATIONS', 10))
+
+# CSV rows parsed per chunk when streaming the ratings file
+RATINGS_CHUNK_SIZE = int(os.environ.get('RATINGS_CHUNK_SIZE', 1000000))
+
+# Cold-start popularity ranking: prior rating count of the Bayesian
+# average (None = median number of ratings per movie)
+POPULARITY_PRIOR = _optional_float('POPULARITY_PRIOR')
+
+# Persisted model artifacts
+ARTIFACTS_DIR = os.environ.get(
+    'ARTIFACTS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+)
+
+# Precomputed top-N recommendation store
+PRECOMPUTED_PATH = os.environ.get(
+    'PRECOMPUTED_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'precomputed', 'recommendations.sqlite')
+)
+
+# Threads used to run scoring and data access off the event loop
+# (0 = run inline on the event loop)
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Recommendation result cache (size 0 disables it)
+CACHE_SIZE = int(os.environ.get('CACHE_SIZE', 10000))
+CACHE_TTL_SECONDS = float(os.environ.get('CACHE_TTL_SECONDS', 300))
+CACHE_DEPTH = int(os.environ.get('CACHE_DEPTH', 50))
+
+# Background model reload: seconds between checks of the data files for
+# changes (0 disables watching; POST /admin/reload still works)
+RELOAD_INTERVAL_SECONDS = float(os.environ.get('RELOAD_INTERVAL_SECONDS', 30))
+
+# Multi-worker serving (backend/serve.py): name of the shared memory
+# control segment, set by the serving parent for its workers, how often
+# the workers check it for a new model generation, and how long the parent
+# collects reload requests and data changes before refitting
+SHARED_MODELS = os.environ.get('SHARED_MODELS') or None
+SHARED_POLL_SECONDS = float(os.environ.get('SHARED_POLL_SECONDS', 1))
+SHARED_RELOAD_DELAY_SECONDS = float(os.environ.get('SHARED_RELOAD_DELAY_SECONDS', 10))
+
+# Token required in the X-Admin-Token header by admin endpoints
+# (unset = admin endpoints are open)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or None
+
+# Stage timers and per-route latency histograms exposed on /metrics
+# (off = no timing code on the hot paths)
+METRICS_ENABLED = _flag('METRICS_ENABLED')
+
+# Sampling profiler for single requests sent with an X-Profile header
+PROFILE_REQUESTS = _flag('PROFILE_REQUESTS')
+PROFILE_INTERVAL_SECONDS = float(os.environ.get('PROFILE_INTERVAL_SECONDS', 0.001))
+PROFILE_DIR = os.environ.get(
+    'PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+)
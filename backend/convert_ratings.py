@@ -0,0 +1,26 @@
+"""
+Convert the ratings CSV to the columnar binary format.
+Writes backend/data/user_ratings.npz (int32 ids, float32 ratings), which
+model fitting reads instead of parsing the CSV while it is at least as
+new as user_ratings.csv.
+
+Usage:
+    python -m backend.convert_ratings [--output PATH]
+"""
+
+import argparse
+import time
+from backend import config
+from backend.utils.preprocessing import get_data_path, save_ratings_npz
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert user_ratings.csv to user_ratings.npz.")
+    parser.add_argument('--output', default=get_data_path('user_ratings.npz'), help="Output file")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    count = save_ratings_npz(args.output, config.RATINGS_CHUNK_SIZE)
+    print(f"Wrote {count} ratings to {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
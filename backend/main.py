@@ -3,30 +3,37 @@ FastAPI main application file.
 Entry point for the Movie Recommendation System backend.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from backend.routes import recommendations, movies
-from backend.models.recommender import initialize_models
+from backend import config
+from backend.routes import recommendations, movies, ratings, admin
+from backend.models.reloader import reloader
+from backend.utils import metrics
+from backend.utils.profiler import ProfilerMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager.
-    Initializes ML models on startup.
+    Initializes ML models on startup (or maps the shared ones under
+    backend/serve.py) and watches for changes while running.
     """
     print("Starting Movie Recommendation System...")
     print("Initializing ML models...")
     
     try:
-        initialize_models()
+        reloader.load()
         print("ML models initialized successfully!")
     except Exception as e:
         print(f"Error initializing models: {e}")
     
+    reloader.start()
+    
     yield
     
     print("Shutting down Movie Recommendation System...")
+    reloader.stop()
 
 # Create FastAPI application
 app = FastAPI(
@@ -45,9 +52,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms and opt-in request profiling are only
+# installed when enabled, so they cost nothing otherwise
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if config.PROFILE_REQUESTS:
+    app.add_middleware(ProfilerMiddleware)
+
 # Include routers
 app.include_router(recommendations.router)
 app.include_router(movies.router)
+app.include_router(ratings.router)
+app.include_router(admin.router)
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -60,7 +76,10 @@ async def root():
             "health": "/health",
             "movies": "/movies",
             "content_based": "/recommend/content-based?movie_id={id}",
-            "collaborative": "/recommend/collaborative?user_id={id}"
+            "collaborative": "/recommend/collaborative?user_id={id}&model={user-user|als}",
+            "hybrid": "/recommend/hybrid?user_id={id}&seed_movie_id={id}&alpha={0-1}",
+            "ratings": "POST /ratings",
+            "metrics": "/metrics"
         }
     }
 
@@ -68,15 +87,48 @@ async def root():
 async def health_check():
     """
     Health check endpoint.
-    Returns API status and model availability.
+    Returns API status, model availability and versions, the state of
+    background model reloads and, under backend/serve.py, the shared
+    memory generation and segment sizes the worker serves from.
     """
-    from backend.models.recommender import content_recommender, collaborative_recommender
+    from backend.models.recommender import (
+        content_recommender,
+        collaborative_recommender,
+        factorization_recommender,
+        hybrid_recommender,
+        hybrid_factorization_recommender,
+        model_status
+    )
     
     return {
         "status": "healthy",
         "api_version": "1.0.0",
         "models": {
-            "content_based": "ready" if content_recommender.movies_df is not None else "not initialized",
-            "collaborative": "ready" if collaborative_recommender.movies_df is not None else "not initialized"
+            "content_based": "ready" if content_recommender.catalog is not None else "not initialized",
+            "collaborative": "ready" if collaborative_recommender.catalog is not None else "not initialized",
+            "factorization": "ready" if factorization_recommender.catalog is not None else "not initialized"
+        },
+        "model_versions": {
+            "content_based": model_status(content_recommender),
+            "collaborative": model_status(collaborative_recommender),
+            "factorization": model_status(factorization_recommender)
+        },
+        "reload": reloader.status(),
+        "shared_memory": reloader.shared_status(),
+        "cache": {
+            "content_based": content_recommender.cache.stats() if content_recommender.cache else None,
+            "collaborative": collaborative_recommender.cache.stats() if collaborative_recommender.cache else None,
+            "factorization": factorization_recommender.cache.stats() if factorization_recommender.cache else None,
+            "hybrid": hybrid_recommender.cache.stats() if hybrid_recommender.cache else None,
+            "hybrid_als": hybrid_factorization_recommender.cache.stats() if hybrid_factorization_recommender.cache else None
         }
     }
+
+@app.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """
+    Prometheus metrics: stage timers and per-route latency histograms
+    (when METRICS_ENABLED is set), plus model sizes, cache counters and
+    process memory.
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
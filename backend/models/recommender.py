@@ -3,93 +3,1098 @@ Machine Learning models for movie recommendations.
 Implements both Content-Based and Collaborative Filtering approaches.
 """
 
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from backend import config
+from backend.utils.ann import IVFIndex
+from backend.utils.artifacts import load_artifacts, source_fingerprint
+from backend.utils.catalog import get_catalog, publish_catalog, SUMMARY_FIELDS
+from backend.utils import metrics
+from backend.utils.factorization import als_factorize, solve_factors
+from backend.utils.precomputed import PrecomputedStore
 from backend.utils.preprocessing import (
-    load_movies_data,
-    load_user_ratings,
+    load_ratings_matrix,
     create_content_features,
     create_user_item_matrix,
-    normalize_ratings
+    normalize_ratings,
+    restore_vectorizer,
+    transform_content_features
 )
+from backend.utils.serialization import join_records
+from backend.utils.similarity import (
+    PatchedSimilarity,
+    top_k_cosine_neighbors,
+    top_k_cosine_rows,
+    update_top_k_neighbors
+)
+
+# Catalog fields the content features are built from
+_CONTENT_FIELDS = ('genres', 'director', 'cast')
+
+# Growth factor of the buffer of ones shared by successive rated-indicator
+# matrices (see _rated_indicator())
+BUFFER_GROWTH = 1.25
+
+def _top_n_indices(scores, n):
+    """
+    Return the indices of the n highest scores, best first.
+    Uses argpartition plus a small sort of the selected candidates instead
+    of sorting the whole array. Ties are broken by ascending index, which
+    matches a stable descending sort.
+    
+    Args:
+        scores: 1-D array of scores (-inf marks excluded entries)
+        n: Number of indices to return
+    
+    Returns:
+        Array of at most n indices into scores
+    """
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    if n < len(scores):
+        # Everything scoring at least the n-th best value is a candidate,
+        # so ties at the boundary are resolved by index like a full sort
+        threshold = scores[np.argpartition(-scores, n - 1)[n - 1]]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(len(scores))
+    
+    order = np.argsort(-scores[candidates], kind='stable')[:n]
+    top = candidates[order]
+    
+    return top[np.isfinite(scores[top])]
+
+
+def _top_n_rows(scores, n):
+    """
+    Row-wise version of _top_n_indices for a 2-D block of scores.
+    All rows are partitioned and sorted in one array operation; rows where
+    ties straddle the cut-off are re-ranked exactly with _top_n_indices.
+    
+    Args:
+        scores: 2-D array of scores (-inf marks excluded entries)
+        n: Number of indices to return per row
+    
+    Returns:
+        List with one array of at most n column indices per row
+    """
+    n_rows, n_cols = scores.shape
+    n = min(n, n_cols)
+    if n <= 0:
+        return [np.empty(0, dtype=np.intp) for _ in range(n_rows)]
+    
+    if n < n_cols:
+        candidates = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    else:
+        candidates = np.tile(np.arange(n_cols), (n_rows, 1))
+    values = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -values))
+    top = np.take_along_axis(candidates, order, axis=1)
+    
+    if n < n_cols:
+        threshold = values.min(axis=1)
+        ambiguous = (scores >= threshold[:, None]).sum(axis=1) > n
+    else:
+        ambiguous = np.zeros(n_rows, dtype=bool)
+    
+    results = []
+    for row in range(n_rows):
+        if ambiguous[row]:
+            results.append(_top_n_indices(scores[row], n))
+        else:
+            row_top = top[row]
+            results.append(row_top[np.isfinite(scores[row, row_top])])
+    
+    return results
+
+
+# Every fit()/load_arrays() gets a new version so cached results of an
+# older model are never served
+_model_versions = itertools.count(1)
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of ranked results with TTL expiry.
+    Each entry holds the top-`depth` ranking for a key; requests for fewer
+    results are served by slicing it. Entries are tagged with the model
+    version that produced them and ignored once the model is refitted.
+    
+    Args:
+        max_size: Maximum number of cached keys
+        ttl: Seconds an entry stays valid
+        depth: Minimum ranking depth computed on a miss
+    """
+    
+    def __init__(self, max_size=10000, ttl=300.0, depth=50):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, version, n):
+        """Return a cached (indices, scores) ranking sliced to n, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires, depth, indices, scores = entry
+                valid = entry_version == version and expires > time.monotonic()
+                # A list shorter than its depth already holds every candidate
+                if valid and (n <= depth or len(indices) < depth):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return indices[:n], scores[:n]
+                if not valid:
+                    del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, version, depth, indices, scores):
+        """Store the top-`depth` ranking for a key."""
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, depth, indices, scores)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+def _new_cache():
+    if config.CACHE_SIZE <= 0:
+        return None
+    return ResultCache(config.CACHE_SIZE, config.CACHE_TTL_SECONDS, config.CACHE_DEPTH)
+
+
+def _cached_rank(model, kind, key, n_recommendations, live_depth=None):
+    """
+    Shared rank() logic: result cache, then the precomputed store, then
+    live scoring through model._rank_live(key, depth).
+    live_depth caps how far past n_recommendations a cache miss is ranked
+    (e.g. to the neighbour list length in top-K mode).
+    """
+    cache = model.cache
+    version = model.version
+    if cache is not None:
+        hit = cache.get(key, version, n_recommendations)
+        if hit is not None:
+            return hit
+    
+    result = None
+    store = model.precomputed
+    if store is not None and n_recommendations <= store.top_n:
+        depth = store.top_n
+        result = store.lookup(kind, key, depth)
+    if result is None:
+        depth = n_recommendations
+        if cache is not None:
+            depth = max(depth, cache.depth if live_depth is None else min(cache.depth, live_depth))
+        result = model._rank_live(key, depth)
+    
+    if cache is not None:
+        cache.put(key, version, depth, *result)
+    return result[0][:n_recommendations], result[1][:n_recommendations]
+
+
+class _ModelState:
+    """Load bookkeeping shared by the model state snapshots."""
+    
+    source = None
+    fit_seconds = None
+    loaded_at = None
+    
+    def stamp(self, source, started):
+        """Record how the state was produced and how long it took."""
+        self.source = source
+        self.fit_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+    
+    def copy_stamp(self, other):
+        """Keep reporting another state's fit or load (for incremental updates)."""
+        self.source, self.fit_seconds, self.loaded_at = (
+            other.source, other.fit_seconds, other.loaded_at
+        )
+
+
+class _ContentState(_ModelState):
+    """
+    Snapshot of a fitted content-based model.
+    Readers take one reference and use it consistently while a refit or
+    add_movies() builds the next snapshot. The dense similarity matrix is a
+    PatchedSimilarity, so add_movies() gives the new snapshot its own
+    overlay of changed rows instead of writing into the N x N array.
+    """
+    
+    def __init__(self, catalog, feature_matrix, vectorizer, similarity_matrix=None,
+                 neighbor_indices=None, neighbor_scores=None, ann_index=None,
+                 changed_movies=0):
+        self.catalog = catalog
+        self.feature_matrix = feature_matrix
+        self.vectorizer = vectorizer
+        if isinstance(similarity_matrix, np.ndarray):
+            similarity_matrix = PatchedSimilarity(similarity_matrix)
+        self.similarity_matrix = similarity_matrix
+        self.neighbor_indices = neighbor_indices
+        self.neighbor_scores = neighbor_scores
+        self.ann_index = ann_index
+        # Movies added or replaced since the vectorizer was fitted
+        self.changed_movies = changed_movies
+
+
+def _state_attribute(name):
+    """Read-only model attribute backed by the current state snapshot."""
+    def getter(self):
+        state = self._state
+        return None if state is None else getattr(state, name)
+    return property(getter)
+
+
+def _catalog_attribute(name):
+    """Read-only model attribute backed by the current state's catalog."""
+    def getter(self):
+        state = self._state
+        return None if state is None else getattr(state.catalog, name)
+    return property(getter)
+
 
 class ContentBasedRecommender:
     """
     Content-Based Filtering Recommender System.
     Recommends movies similar to a given movie based on content features
     (genres, director, cast).
+
+    By default the full N x N similarity matrix is computed. Passing top_k
+    switches to a truncated neighbour index that keeps only the K most
+    similar movies per movie, so memory scales as O(N * K). Passing
+    ann_params instead builds an approximate IVF index (see
+    backend/utils/ann.py) that is searched per request, so queries stay
+    sublinear in N without precomputing any neighbour lists.
+
+    The fitted state lives in one snapshot object that fit() builds on the
+    side and publishes with a single reference assignment, so the model can
+    be refitted while requests are being served. add_movies() and
+    update_movie() change the catalog the same way without a full refit.
+
+    Args:
+        top_k: Number of neighbours to keep per movie (None = dense matrix)
+        block_size: Rows scored per block when building the neighbour index
+        n_jobs: Worker processes for the neighbour index (-1 = all cores)
+        ann_params: IVFIndex settings for approximate search (None = exact)
+        refit_ratio: Refit once more than this fraction of the catalog was
+            added or replaced incrementally (None = never)
     """
     
-    def __init__(self):
-        self.movies_df = None
-        self.feature_matrix = None
-        self.similarity_matrix = None
+    catalog = _state_attribute('catalog')
+    vectorizer = _state_attribute('vectorizer')
+    feature_matrix = _state_attribute('feature_matrix')
+    similarity_matrix = _state_attribute('similarity_matrix')
+    neighbor_indices = _state_attribute('neighbor_indices')
+    neighbor_scores = _state_attribute('neighbor_scores')
+    ann_index = _state_attribute('ann_index')
+    movies_df = _catalog_attribute('movies_df')
+    movie_ids = _catalog_attribute('movie_ids')
+    
+    def __init__(self, top_k=None, block_size=1024, n_jobs=None, ann_params=None, refit_ratio=None):
+        self.top_k = top_k
+        self.ann_params = ann_params
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.refit_ratio = refit_ratio
+        self.precomputed = None
+        self.cache = _new_cache()
+        self.version = 0
+        self._state = None
+        self._write_lock = threading.Lock()
+    
+    def _publish(self, state):
+        """Swap in a new state snapshot, then bump the version (in that order)."""
+        self.precomputed = None
+        self._state = state
+        self.version = next(_model_versions)
         
-    def fit(self):
+    @metrics.timed('content', 'fit')
+    def fit(self, catalog=None):
         """
         Train the content-based model.
-        Loads data and computes similarity matrix.
+        Computes the similarity matrix or neighbour index over the catalog.
+        
+        Args:
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
         """
+        started = time.perf_counter()
+        
         # Load movie data
-        self.movies_df = load_movies_data()
+        catalog = get_catalog() if catalog is None else catalog
         
-        if self.movies_df.empty:
+        if len(catalog) == 0:
             raise ValueError("Movie data is empty")
         
+        # Serialized with add_movies() so an incremental update can't be
+        # overwritten by a refit that started before it
+        with self._write_lock:
+            state = self._fit_state(catalog)
+            state.stamp('fit', started)
+            self._publish(state)
+        
+        print(f"Content-based model trained on {len(catalog)} movies")
+    
+    def _fit_state(self, catalog):
+        """Fit the vectorizer and similarity structure on a catalog."""
         # Create feature vectors from movie content
-        self.feature_matrix = create_content_features(self.movies_df)
+        with metrics.timer('content', 'fit.features'):
+            feature_matrix, vectorizer = create_content_features(
+                catalog.frame(_CONTENT_FIELDS), return_vectorizer=True
+            )
+        
+        similarity_matrix = neighbor_indices = neighbor_scores = ann_index = None
+        with metrics.timer('content', 'fit.similarity'):
+            if self.ann_params is not None:
+                # Approximate index, searched per request
+                ann_index = IVFIndex(**self.ann_params).fit(feature_matrix)
+            elif self.top_k is not None:
+                # Keep only the top-K neighbours per movie, computed in blocks
+                neighbor_indices, neighbor_scores = top_k_cosine_neighbors(
+                    feature_matrix,
+                    self.top_k,
+                    block_size=self.block_size,
+                    n_jobs=self.n_jobs
+                )
+            else:
+                # Compute cosine similarity between all movies
+                # Higher similarity = more similar content
+                similarity_matrix = cosine_similarity(feature_matrix)
+        
+        return _ContentState(
+            catalog, feature_matrix, vectorizer,
+            similarity_matrix, neighbor_indices, neighbor_scores, ann_index
+        )
+    
+    @metrics.timed('content', 'add_movies')
+    def add_movies(self, movies_df):
+        """
+        Add movies to the fitted model, or replace movies already in it,
+        without a full refit.
+        Only the changed rows are transformed, with the fitted TF-IDF
+        vectorizer (its vocabulary and IDF weights stay frozen), and only
+        their similarities to the other movies are computed: O(changed x N)
+        instead of O(N^2). The similarity matrix or neighbour lists are
+        patched with those similarities; the ANN index moves the changed
+        rows to their closest lists. Like add_ratings() in KNN mode, patched
+        neighbour lists can drift from an exact fit when a movie changes.
+        
+        Once more than refit_ratio of the catalog has changed since the
+        last fit, the model is refitted on the new catalog instead, so the
+        vocabulary and IDF weights catch up with the data.
+        
+        The new state, with its own catalog, is built on the side and
+        swapped in at the end; the dense similarity matrix gets the changed
+        rows as an overlay of the new state (see PatchedSimilarity), never
+        written in place. If the model was fitted on the shared catalog, the
+        new catalog is then saved to movies.csv and becomes the shared
+        catalog (see publish_catalog()), so /movies serves the change and
+        later refits keep it; the saved file is acknowledged to the
+        reloader, so it doesn't trigger a refit of its own.
+        
+        Args:
+            movies_df: DataFrame with the catalog's columns; a movie_id
+                already in the catalog replaces that movie
+        
+        Returns:
+            Number of movies added or replaced
+        """
+        if movies_df.empty:
+            return 0
+        
+        started = time.perf_counter()
+        with self._write_lock:
+            state = self._state
+            if state is None:
+                raise RuntimeError("Model must be fitted before adding movies")
+            
+            catalog, changed = state.catalog.with_movies(movies_df)
+            changed_movies = state.changed_movies + len(changed)
+            if self.refit_ratio is not None and changed_movies > self.refit_ratio * len(catalog):
+                updated = self._fit_state(catalog)
+                updated.stamp('fit', started)
+                self._publish(updated)
+                _persist_catalog(catalog, state.catalog)
+                print(f"Content-based model refitted on {len(catalog)} movies "
+                      f"after {changed_movies} incremental changes")
+                return len(changed)
+            
+            # Old rows with the changed ones swapped for their new features
+            features = transform_content_features(catalog.frame(_CONTENT_FIELDS, changed), state.vectorizer)
+            n_movies = len(catalog)
+            order = np.arange(n_movies)
+            order[changed] = state.feature_matrix.shape[0] + np.arange(len(changed))
+            feature_matrix = sparse.vstack([state.feature_matrix, features], format='csr')[order]
+            
+            similarity_matrix = neighbor_indices = neighbor_scores = ann_index = None
+            if state.ann_index is not None:
+                ann_index = state.ann_index.update(feature_matrix, changed)
+            else:
+                # Rows are L2-normalized, so dot products are cosine similarities
+                changed_similarities = (features @ feature_matrix.T).toarray()
+                
+                if state.neighbor_indices is not None:
+                    # The list length depends on the catalog size while it is below K
+                    if state.neighbor_indices.shape[1] != min(self.top_k, n_movies - 1):
+                        neighbor_indices, neighbor_scores = top_k_cosine_neighbors(
+                            feature_matrix, self.top_k,
+                            block_size=self.block_size, n_jobs=self.n_jobs
+                        )
+                    else:
+                        neighbor_indices, neighbor_scores = update_top_k_neighbors(
+                            state.neighbor_indices, state.neighbor_scores, changed, changed_similarities
+                        )
+                else:
+                    similarity_matrix = state.similarity_matrix.update(changed, changed_similarities)
+            
+            updated = _ContentState(
+                catalog, feature_matrix, state.vectorizer,
+                similarity_matrix, neighbor_indices, neighbor_scores, ann_index,
+                changed_movies
+            )
+            updated.copy_stamp(state)
+            self._publish(updated)
+            _persist_catalog(catalog, state.catalog)
+        
+        print(f"Content-based model updated with {len(changed)} movies")
+        return len(changed)
+    
+    def update_movie(self, movie_id, **fields):
+        """
+        Change fields of one movie (e.g. genres, director or cast) without a
+        full refit; see add_movies().
+        
+        Args:
+            movie_id: ID of a movie in the catalog
+            **fields: New values by catalog column
+        
+        Returns:
+            Number of movies replaced (1)
+        """
+        state = self._state
+        idx = None if state is None else state.catalog.position(movie_id)
+        if idx is None:
+            raise KeyError(f"Movie {movie_id} is not in the catalog")
+        
+        row = state.catalog.frame(indices=[idx])
+        for column, value in fields.items():
+            if column == 'movie_id' or column not in row.columns:
+                raise ValueError(f"Cannot update movie field {column!r}")
+            row[column] = value
+        return self.add_movies(row)
+    
+    def get_arrays(self):
+        """
+        Return the fitted state as a dictionary of NumPy arrays
+        (see backend/utils/artifacts.py).
+        """
+        state = self._state
+        arrays = {
+            'feature_data': state.feature_matrix.data,
+            'feature_indices': state.feature_matrix.indices,
+            'feature_indptr': state.feature_matrix.indptr,
+            'feature_shape': np.array(state.feature_matrix.shape),
+            'vocabulary': state.vectorizer.get_feature_names_out().astype(str),
+            'idf': state.vectorizer.idf_
+        }
+        if state.ann_index is not None:
+            for name, array in state.ann_index.get_arrays().items():
+                arrays[f'ann_{name}'] = array
+        elif state.neighbor_indices is not None:
+            arrays['neighbor_indices'] = state.neighbor_indices
+            arrays['neighbor_scores'] = state.neighbor_scores
+        else:
+            arrays['similarity_matrix'] = state.similarity_matrix.toarray()
+        return arrays
+    
+    @metrics.timed('content', 'load_arrays')
+    def load_arrays(self, arrays, catalog=None, source='artifacts'):
+        """
+        Restore a fitted model from arrays produced by get_arrays().
+        The arrays are used as-is, so memory-mapped inputs stay mapped.
+        
+        Args:
+            arrays: Dictionary of NumPy arrays
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
+            source: Where the arrays come from, as reported by /health
+        """
+        started = time.perf_counter()
+        catalog = get_catalog() if catalog is None else catalog
+        n_movies = int(arrays['feature_shape'][0])
+        if n_movies != len(catalog):
+            raise ValueError(
+                f"Artifacts cover {n_movies} movies but the catalog has {len(catalog)}"
+            )
         
-        # Compute cosine similarity between all movies
-        # Higher similarity = more similar content
-        self.similarity_matrix = cosine_similarity(self.feature_matrix)
+        feature_matrix = sparse.csr_matrix(
+            (arrays['feature_data'], arrays['feature_indices'], arrays['feature_indptr']),
+            shape=tuple(int(n) for n in arrays['feature_shape'])
+        )
+        ann_index = None
+        if self.ann_params is not None:
+            ann_arrays = {
+                name[len('ann_'):]: array for name, array in arrays.items()
+                if name.startswith('ann_')
+            }
+            ann_index = IVFIndex(**self.ann_params).load_arrays(ann_arrays, feature_matrix)
         
-        print(f"Content-based model trained on {len(self.movies_df)} movies")
+        state = _ContentState(
+            catalog, feature_matrix,
+            restore_vectorizer(arrays['vocabulary'], arrays['idf']),
+            arrays.get('similarity_matrix'),
+            arrays.get('neighbor_indices'),
+            arrays.get('neighbor_scores'),
+            ann_index
+        )
+        state.stamp(source, started)
+        with self._write_lock:
+            self._publish(state)
     
-    def recommend(self, movie_id, n_recommendations=10):
+    def rank(self, movie_id, n_recommendations=10):
+        """
+        Rank the movies most similar to a given movie.
+        
+        Args:
+            movie_id: ID of the movie to base recommendations on
+            n_recommendations: Number of movies to rank
+        
+        Returns:
+            Tuple of (row indices, similarity scores) arrays, best first.
+            Both are empty if the movie is unknown.
+        """
+        # Cache misses in top-K mode are ranked from the neighbour lists
+        # unless the request itself asks for more
+        state = self._state
+        live_depth = None if state is None or state.neighbor_indices is None else state.neighbor_indices.shape[1]
+        return _cached_rank(self, 'content', movie_id, n_recommendations, live_depth)
+    
+    def _rank_live(self, movie_id, n_recommendations):
+        """Score a movie against the similarity matrix or neighbour index."""
+        state = self._state
+        with metrics.timer('content', 'recommend.lookup'):
+            movie_idx = state.catalog.position(movie_id)
+        
+        if movie_idx is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        if state.ann_index is not None:
+            # Candidate scoring and ranking happen inside the index search
+            with metrics.timer('content', 'recommend.scoring'):
+                return state.ann_index.search(movie_idx, n_recommendations)
+        
+        if state.neighbor_indices is not None and n_recommendations > state.neighbor_indices.shape[1]:
+            # Deeper than the stored lists: score this movie exactly
+            with metrics.timer('content', 'recommend.scoring'):
+                top_indices, top_scores = top_k_cosine_rows(state.feature_matrix, [movie_idx], n_recommendations)
+                return top_indices[0], top_scores[0]
+        
+        if state.neighbor_indices is not None:
+            # Neighbours are stored pre-sorted and exclude the movie itself
+            with metrics.timer('content', 'recommend.ranking'):
+                top_indices = state.neighbor_indices[movie_idx][:n_recommendations]
+                return top_indices, state.neighbor_scores[movie_idx][:n_recommendations]
+        
+        # Exclude the movie itself by index (not by dropping the best score,
+        # which may belong to another movie tied at similarity 1.0)
+        with metrics.timer('content', 'recommend.scoring'):
+            scores = state.similarity_matrix[movie_idx].copy()
+            scores[movie_idx] = -np.inf
+        
+        with metrics.timer('content', 'recommend.ranking'):
+            top_indices = _top_n_indices(scores, n_recommendations)
+            return top_indices, scores[top_indices]
+    
+    def recommend(self, movie_id, n_recommendations=10, fields=SUMMARY_FIELDS):
         """
         Get movie recommendations based on content similarity.
         
         Args:
             movie_id: ID of the movie to base recommendations on
             n_recommendations: Number of recommendations to return
+            fields: Movie fields of each recommendation
         
         Returns:
             List of recommended movie dictionaries
         """
-        # Find the index of the movie in our dataset
-        movie_idx = self.movies_df[self.movies_df['movie_id'] == movie_id].index
+        top_indices, top_scores = self.rank(movie_id, n_recommendations)
+        return self._to_records(top_indices, top_scores, fields)
+    
+    def recommend_json(self, movie_id, n_recommendations=10, fields=SUMMARY_FIELDS):
+        """
+        Same as recommend(), serialized from the catalog's encoded columns.
         
-        if len(movie_idx) == 0:
-            return []
+        Returns:
+            Tuple of (number of recommendations, JSON array bytes)
+        """
+        top_indices, top_scores = self.rank(movie_id, n_recommendations)
+        with metrics.timer('content', 'recommend.serialization'):
+            return _records_json(self._state.catalog, top_indices, fields, 'similarity_score', top_scores)
+    
+    def rank_many(self, movie_ids, n_recommendations=10):
+        """
+        Rank similar movies for many movies at once.
+        Known movies are scored block by block: one similarity block (or
+        neighbour slice) and one row-wise top-N per block. With an ANN
+        index every movie is a separate index search.
         
-        movie_idx = movie_idx[0]
+        Args:
+            movie_ids: Sequence of movie IDs
+            n_recommendations: Number of movies to rank per movie
         
-        # Get similarity scores for this movie with all others
-        similarity_scores = list(enumerate(self.similarity_matrix[movie_idx]))
+        Returns:
+            List aligned with movie_ids of (row indices, similarity scores)
+            tuples, or None for unknown movies
+        """
+        state = self._state
+        positions = state.catalog.positions(movie_ids).tolist()
+        results = [None] * len(positions)
+        known = [i for i, idx in enumerate(positions) if idx >= 0]
         
-        # Sort movies by similarity (descending)
-        similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+        for start in range(0, len(known), self.block_size):
+            chunk = known[start:start + self.block_size]
+            rows = np.array([positions[i] for i in chunk], dtype=np.intp)
+            
+            if state.ann_index is not None:
+                for i, row in zip(chunk, rows.tolist()):
+                    results[i] = state.ann_index.search(row, n_recommendations)
+                continue
+            
+            if state.neighbor_indices is not None and n_recommendations > state.neighbor_indices.shape[1]:
+                top_indices, top_scores = top_k_cosine_rows(state.feature_matrix, rows, n_recommendations)
+                for i, indices, scores in zip(chunk, top_indices, top_scores):
+                    results[i] = (indices, scores)
+                continue
+            
+            if state.neighbor_indices is not None:
+                top_indices = state.neighbor_indices[rows][:, :n_recommendations]
+                top_scores = state.neighbor_scores[rows][:, :n_recommendations]
+                for i, indices, scores in zip(chunk, top_indices, top_scores):
+                    results[i] = (indices, scores)
+                continue
+            
+            block = state.similarity_matrix[rows]
+            block[np.arange(len(rows)), rows] = -np.inf
+            for offset, (i, top) in enumerate(zip(chunk, _top_n_rows(block, n_recommendations))):
+                results[i] = (top, block[offset, top])
+        
+        return results
+    
+    def recommend_many(self, movie_ids, n_recommendations=10, fields=SUMMARY_FIELDS):
+        """
+        Get content-based recommendations for many movies at once.
+        
+        Args:
+            movie_ids: Sequence of movie IDs
+            n_recommendations: Number of recommendations per movie
+            fields: Movie fields of each recommendation
+        
+        Returns:
+            List aligned with movie_ids of recommendation lists
+            (empty for unknown movies)
+        """
+        return [
+            [] if ranked is None else self._to_records(*ranked, fields)
+            for ranked in self.rank_many(movie_ids, n_recommendations)
+        ]
+    
+    @metrics.timed('content', 'recommend.serialization')
+    def _to_records(self, top_indices, top_scores, fields=SUMMARY_FIELDS):
+        return _records(self._state.catalog, top_indices, fields, 'similarity_score', top_scores)
+
+
+def _persist_catalog(catalog, previous):
+    """
+    Publish a catalog changed by add_movies() (see publish_catalog()) and
+    acknowledge the rewritten movies.csv to the reloader, like POST /ratings
+    does for the ratings file, since the models already have the change.
+    """
+    if publish_catalog(catalog, previous):
+        # Imported here: the reloader module imports this one
+        from backend.models.reloader import reloader
+        reloader.acknowledge()
+
+
+def _records(catalog, indices, fields, field=None, values=None):
+    """Catalog records with the given fields, optionally with one float field each."""
+    records = catalog.records(indices.tolist(), fields)
+    if field is not None:
+        for record, value in zip(records, values.tolist()):
+            record[field] = value
+    return records
+
+
+def _records_json(catalog, indices, fields, field=None, values=None):
+    """Serialize catalog records with the given fields, optionally with one float field each."""
+    fragments = catalog.fragments(indices.tolist(), fields)
+    return len(fragments), join_records(fragments, field, None if values is None else values.tolist())
+
+
+def _rated_indicator(user_item_matrix, ones):
+    """
+    Rated-indicator matrix sharing the rating matrix's sparsity structure.
+    Its data is a prefix of ones (at least nnz long), which is never
+    written, so successive snapshots can share one buffer.
+    """
+    return sparse.csr_matrix(
+        (ones[:user_item_matrix.nnz], user_item_matrix.indices, user_item_matrix.indptr),
+        shape=user_item_matrix.shape
+    )
+
+
+def _grow(capacity, needed):
+    """Geometrically grown capacity for needed entries."""
+    return needed if capacity >= needed else max(needed, int(capacity * BUFFER_GROWTH))
+
+
+def _row_norms(matrix):
+    """L2 norm of every row of a sparse matrix."""
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+
+def _sorted_lookup(ids):
+    """Sorted ids and the positions they came from, for binary-search lookups."""
+    order = np.argsort(ids, kind='stable')
+    return ids[order], order
+
+
+def _extend_lookup(sorted_ids, order, ids):
+    """
+    _sorted_lookup() of ids given that of a prefix of ids: the appended
+    ids are inserted into the sorted view instead of sorting it again.
+    """
+    added = ids[len(order):]
+    if len(added) == 0:
+        return sorted_ids, order
+    added_order = np.argsort(added, kind='stable')
+    at = np.searchsorted(sorted_ids, added[added_order])
+    return (
+        np.insert(sorted_ids, at, added[added_order]),
+        np.insert(order, at, len(order) + added_order)
+    )
+
+
+def _lookup_positions(sorted_ids, order, ids):
+    """Vectorized id -> position lookup; -1 for unknown ids."""
+    ids = np.asarray(ids)
+    if len(sorted_ids) == 0:
+        return np.full(len(ids), -1, dtype=np.intp)
+    found_at = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[found_at] == ids, order[found_at], -1)
+
+
+def _append_ids(ids, sorted_ids, order, new_ids):
+    """
+    Map ids to positions, appending ids that are not known yet.
+    
+    Returns:
+        Tuple of (extended id array, position of every entry of new_ids)
+    """
+    positions = _lookup_positions(sorted_ids, order, new_ids)
+    unknown = positions < 0
+    if unknown.any():
+        added, inverse = np.unique(new_ids[unknown], return_inverse=True)
+        positions[unknown] = len(ids) + inverse
+        ids = np.concatenate([ids, added.astype(ids.dtype)])
+    return ids, positions
+
+
+def _update_user_means(user_means, user_item_matrix, changed):
+    """
+    Recompute the means of the changed rows only (see normalize_ratings).
+    
+    Returns:
+        Tuple of (user means of every row, changed rows centered on them)
+    """
+    changed_rows, changed_means = normalize_ratings(user_item_matrix[changed])
+    user_means = np.concatenate([user_means, np.zeros(user_item_matrix.shape[0] - len(user_means))])
+    user_means[changed] = changed_means
+    return user_means, changed_rows
+
+
+def _clean_new_ratings(ratings_df):
+    """Drop incomplete rows; within one batch the last rating for a pair wins."""
+    ratings_df = ratings_df.dropna(subset=['user_id', 'movie_id', 'rating'])
+    return ratings_df.drop_duplicates(subset=['user_id', 'movie_id'], keep='last')
+
+
+class _PopularityIndex:
+    """
+    Cold-start ranking of the catalog by Bayesian-weighted average rating,
+    (n * mean + m * C) / (n + m), where n is the movie's number of ratings,
+    C the global mean rating and m the prior count. Movies with few ratings
+    are pulled towards C (movies without any score exactly C); ties fall
+    back to the catalog's rating order. Built once per rating snapshot so
+    a cold-start request only slices a precomputed array.
+    
+    Args:
+        catalog: MovieCatalog the rankings refer to
+        user_item_matrix: Sparse CSR rating matrix
+        column_records: Catalog index of every matrix column (-1 if unknown)
+        prior_count: m (None = median number of ratings per rated movie)
+    """
+    
+    def __init__(self, catalog, user_item_matrix, column_records, prior_count=None):
+        n_columns = user_item_matrix.shape[1]
+        column_counts = np.bincount(user_item_matrix.indices, minlength=n_columns)
+        column_sums = np.bincount(user_item_matrix.indices, weights=user_item_matrix.data, minlength=n_columns)
+        
+        # Fold matrix columns onto catalog movies
+        known = column_records >= 0
+        counts = np.zeros(len(catalog))
+        sums = np.zeros(len(catalog))
+        counts[column_records[known]] = column_counts[known]
+        sums[column_records[known]] = column_sums[known]
+        
+        global_mean = float(user_item_matrix.data.mean()) if user_item_matrix.nnz else 0.0
+        if prior_count is None:
+            rated_counts = column_counts[column_counts > 0]
+            prior_count = float(np.median(rated_counts)) if len(rated_counts) else 1.0
+        
+        self.prior_count = prior_count
+        self.scores = np.full(len(catalog), global_mean)
+        np.divide(
+            sums + prior_count * global_mean, counts + prior_count,
+            out=self.scores, where=counts + prior_count > 0
+        )
+        
+        # Best first; each movie's position in that order
+        self.order = np.lexsort((catalog.rating_rank, -self.scores))
+        self.rank = np.empty(len(catalog), dtype=np.intp)
+        self.rank[self.order] = np.arange(len(catalog))
+        
+        # Per-genre lists, each already in popularity order
+        self.genre_lists = {
+            genre: indices[np.argsort(self.rank[indices], kind='stable')]
+            for genre, indices in catalog.genre_index.items()
+        }
+    
+    def top(self, n, genre=None):
+        """
+        Return the n most popular catalog indices.
         
-        # Get top N similar movies (excluding the movie itself)
-        top_indices = [i[0] for i in similarity_scores[1:n_recommendations+1]]
+        Args:
+            n: Number of movies
+            genre: Optional case-insensitive genre hint (substring of a
+                genre name, like /movies?genre=); ignored if nothing matches
         
-        # Return movie details
-        recommendations = []
-        for idx in top_indices:
-            movie = self.movies_df.iloc[idx]
-            recommendations.append({
-                'movie_id': int(movie['movie_id']),
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'director': movie['director'],
-                'rating': float(movie['rating']),
-                'year': int(movie['year']),
-                'description': movie['description'],
-                'similarity_score': float(self.similarity_matrix[movie_idx][idx])
-            })
+        Returns:
+            Catalog indices, most popular first
+        """
+        if genre:
+            needle = genre.lower()
+            lists = [indices for name, indices in self.genre_lists.items() if needle in name]
+            if len(lists) == 1:
+                return lists[0][:n]
+            if lists:
+                # Only the head of each list can make the merged top n
+                merged = np.unique(np.concatenate([indices[:n] for indices in lists]))
+                return merged[np.argsort(self.rank[merged])][:n]
+        return self.order[:n]
+
+
+class _RatingsState(_ModelState):
+    """
+    Rating matrix and id lookups shared by the rating-based model snapshots.
+    
+    A snapshot built by add_ratings() passes the one it updates as
+    previous, with the rows that changed; the lookups are then extended
+    instead of rebuilt, so the cost follows the changed rows rather than
+    the size of the matrix.
+    """
+    
+    def __init__(self, catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                 previous=None, changed=None):
+        self.catalog = catalog
+        self.user_item_matrix = user_item_matrix
+        self.user_ids = user_ids
+        self.movie_ids = movie_ids
+        self.user_means = user_means
         
-        return recommendations
+        if previous is None:
+            # Rows and columns are sorted by id after fit(); users and movies
+            # added later are appended, so lookups go through sorted views
+            self.sorted_user_ids, self.user_order = _sorted_lookup(user_ids)
+            self.sorted_movie_ids, self.movie_order = _sorted_lookup(movie_ids)
+            
+            # Map each matrix column to its movie record (-1 if not in the catalog)
+            self.column_records = catalog.positions(movie_ids)
+            
+            # Observed rating scale (predictions are clipped or scaled to it)
+            if user_item_matrix.nnz:
+                self.rating_range = (float(user_item_matrix.data.min()), float(user_item_matrix.data.max()))
+            else:
+                self.rating_range = (-np.inf, np.inf)
+        else:
+            self.sorted_user_ids, self.user_order = _extend_lookup(
+                previous.sorted_user_ids, previous.user_order, user_ids
+            )
+            self.sorted_movie_ids, self.movie_order = _extend_lookup(
+                previous.sorted_movie_ids, previous.movie_order, movie_ids
+            )
+            self.column_records = np.concatenate([
+                previous.column_records,
+                catalog.positions(movie_ids[len(previous.movie_ids):])
+            ])
+            
+            # Only widened: a replaced extreme rating keeps the range until
+            # the next fit()
+            changed_data = user_item_matrix[changed].data
+            low, high = previous.rating_range if previous.user_item_matrix.nnz else (np.inf, -np.inf)
+            if len(changed_data):
+                low, high = min(low, float(changed_data.min())), max(high, float(changed_data.max()))
+            self.rating_range = (low, high) if low <= high else (-np.inf, np.inf)
+        self._popularity = None
+    
+    def user_position(self, user_id):
+        position = _lookup_positions(self.sorted_user_ids, self.user_order, [user_id])[0]
+        return None if position < 0 else int(position)
+    
+    def popularity(self, prior_count=None):
+        """
+        Return the snapshot's cold-start ranking, building it on first use
+        (fit() and load_arrays() build it before publishing).
+        """
+        index = self._popularity
+        if index is None:
+            # A race only builds the same index twice
+            index = self._popularity = _PopularityIndex(
+                self.catalog, self.user_item_matrix, self.column_records, prior_count
+            )
+        return index
+    
+    def merge_ratings(self, ratings_df):
+        """
+        Build the rating matrix with new ratings applied.
+        New users and movies are appended as rows and columns; a new rating
+        for an already rated movie replaces the old one. Only the changed
+        rows are merged; the others are copied over as runs of the CSR
+        arrays.
+        
+        Args:
+            ratings_df: Cleaned ratings (see _clean_new_ratings)
+        
+        Returns:
+            Tuple of (user_item_matrix, user_ids, movie_ids, changed rows)
+        """
+        user_ids, rows = _append_ids(
+            self.user_ids, self.sorted_user_ids, self.user_order,
+            ratings_df['user_id'].to_numpy()
+        )
+        movie_ids, columns = _append_ids(
+            self.movie_ids, self.sorted_movie_ids, self.movie_order,
+            ratings_df['movie_id'].to_numpy()
+        )
+        changed = np.unique(rows)
+        shape = (len(user_ids), len(movie_ids))
+        old = self.user_item_matrix
+        n_old = old.shape[0]
+        
+        # Changed rows: their old entries merged with the new ratings (new
+        # ratings sorted last so they win), in row and column order
+        existing = changed[changed < n_old]
+        changed_old = old[existing].tocoo()
+        merged = pd.DataFrame({
+            'row': np.concatenate([existing[changed_old.row], rows]),
+            'col': np.concatenate([changed_old.col, columns]),
+            'rating': np.concatenate([changed_old.data, ratings_df['rating'].to_numpy(dtype=np.float64)])
+        }).drop_duplicates(subset=['row', 'col'], keep='last').sort_values(['row', 'col'])
+        merged_rows = merged['row'].to_numpy()
+        merged_columns = merged['col'].to_numpy()
+        merged_ratings = merged['rating'].to_numpy()
+        starts = np.searchsorted(merged_rows, changed)
+        stops = np.searchsorted(merged_rows, changed, side='right')
+        
+        counts = np.zeros(shape[0], dtype=old.indptr.dtype)
+        counts[:n_old] = np.diff(old.indptr)
+        counts[changed] = stops - starts
+        indptr = np.zeros(shape[0] + 1, dtype=old.indptr.dtype)
+        np.cumsum(counts, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=old.indices.dtype)
+        data = np.empty(indptr[-1], dtype=old.data.dtype)
+        
+        # Splice: each run of unchanged rows is one slice copy, each changed
+        # row is written from the merged entries
+        run_start = 0
+        for row, start, stop in zip(changed.tolist() + [shape[0]], starts.tolist() + [0], stops.tolist() + [0]):
+            run_stop = min(row, n_old)
+            if run_stop > run_start:
+                source = slice(old.indptr[run_start], old.indptr[run_stop])
+                target = slice(indptr[run_start], indptr[run_stop])
+                indices[target] = old.indices[source]
+                data[target] = old.data[source]
+            if row < shape[0]:
+                indices[indptr[row]:indptr[row + 1]] = merged_columns[start:stop]
+                data[indptr[row]:indptr[row + 1]] = merged_ratings[start:stop]
+            run_start = row + 1
+        
+        user_item_matrix = sparse.csr_matrix((data, indices, indptr), shape=shape)
+        user_item_matrix.has_sorted_indices = True
+        
+        return user_item_matrix, user_ids, movie_ids, changed
+
+
+class _CollaborativeState(_RatingsState):
+    """
+    Snapshot of a fitted collaborative model.
+    Readers take one reference and use it consistently while add_ratings()
+    builds the next snapshot. The dense similarity matrix is a
+    PatchedSimilarity, so add_ratings() gives the new snapshot its own
+    overlay of changed rows instead of writing into the U x U array.
+    """
+    
+    def __init__(self, catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                 user_similarity_matrix=None, neighbor_indices=None, neighbor_scores=None,
+                 user_norms=None, ones=None, previous=None, changed=None):
+        super().__init__(catalog, user_item_matrix, user_ids, movie_ids, user_means, previous, changed)
+        if ones is None or len(ones) < user_item_matrix.nnz:
+            ones = np.ones(user_item_matrix.nnz)
+        self.ones = ones
+        self.rated_matrix = _rated_indicator(user_item_matrix, ones)
+        if isinstance(user_similarity_matrix, np.ndarray):
+            user_similarity_matrix = PatchedSimilarity(user_similarity_matrix)
+        self.user_similarity_matrix = user_similarity_matrix
+        self.neighbor_indices = neighbor_indices
+        self.neighbor_scores = neighbor_scores
+        self._user_norms = user_norms
+    
+    def user_norms(self):
+        """
+        Return the norm of every user's mean-centered rating row, computing
+        it on first use (add_ratings() then keeps it up to date).
+        """
+        norms = self._user_norms
+        if norms is None:
+            norms = self._user_norms = _row_norms(normalize_ratings(self.user_item_matrix)[0])
+        return norms
 
 
 class CollaborativeFilteringRecommender:
@@ -97,142 +1102,1165 @@ class CollaborativeFilteringRecommender:
     Collaborative Filtering Recommender System.
     Recommends movies based on user rating patterns and similarities
     between users.
+
+    By default the full users x users similarity matrix is computed. Passing
+    n_neighbors keeps only the K most similar users per user (KNN CF), and
+    predictions are made from those neighbours only.
+
+    The fitted state lives in one snapshot object that is replaced with a
+    single reference assignment, so add_ratings() can publish updates while
+    requests are being served.
+
+    Args:
+        n_neighbors: Number of neighbours to keep per user (None = dense matrix)
+        block_size: Rows scored per block when building the neighbour index
+        n_jobs: Worker processes for the neighbour index (-1 = all cores)
+        popularity_prior: Prior rating count of the cold-start popularity
+            ranking (None = median ratings per movie, see _PopularityIndex)
     """
     
-    def __init__(self):
-        self.movies_df = None
-        self.ratings_df = None
-        self.user_item_matrix = None
-        self.user_similarity_matrix = None
+    catalog = _state_attribute('catalog')
+    user_item_matrix = _state_attribute('user_item_matrix')
+    rated_matrix = _state_attribute('rated_matrix')
+    user_similarity_matrix = _state_attribute('user_similarity_matrix')
+    neighbor_indices = _state_attribute('neighbor_indices')
+    neighbor_scores = _state_attribute('neighbor_scores')
+    user_ids = _state_attribute('user_ids')
+    movie_ids = _state_attribute('movie_ids')
+    user_means = _state_attribute('user_means')
+    column_records = _state_attribute('column_records')
+    movies_df = _catalog_attribute('movies_df')
+    
+    def __init__(self, n_neighbors=None, block_size=1024, n_jobs=None, popularity_prior=None):
+        self.n_neighbors = n_neighbors
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.popularity_prior = popularity_prior
+        self.precomputed = None
+        self.cache = _new_cache()
+        self.version = 0
+        self._state = None
+        self._write_lock = threading.Lock()
+    
+    def _publish(self, state):
+        """Swap in a new state snapshot, then bump the version (in that order)."""
+        self.precomputed = None
+        self._state = state
+        self.version = next(_model_versions)
         
-    def fit(self):
+    @metrics.timed('collaborative', 'fit')
+    def fit(self, catalog=None, ratings_df=None):
         """
         Train the collaborative filtering model.
-        Computes user-user similarity based on rating patterns.
+        Computes user-user similarity based on rating patterns. The new
+        state is published in one step once it is complete.
+        
+        Args:
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
+            ratings_df: Optional ratings DataFrame (loaded from disk if omitted)
+        """
+        started = time.perf_counter()
+        
+        # Serialized with add_ratings() so an incremental update can't be
+        # overwritten by a refit that started before it
+        with self._write_lock:
+            # Load data
+            catalog = get_catalog() if catalog is None else catalog
+            
+            # Create sparse user-item matrix and id <-> index maps
+            with metrics.timer('collaborative', 'fit.load'):
+                if ratings_df is None:
+                    # Read under the lock so ratings added meanwhile are not lost
+                    user_item_matrix, user_ids, movie_ids = load_ratings_matrix(config.RATINGS_CHUNK_SIZE)
+                else:
+                    user_item_matrix, user_ids, movie_ids = create_user_item_matrix(ratings_df)
+            
+            if user_item_matrix.nnz == 0:
+                raise ValueError("Ratings data is empty")
+            
+            # Normalize ratings to handle user bias
+            with metrics.timer('collaborative', 'fit.normalize'):
+                normalized_matrix, user_means = normalize_ratings(user_item_matrix)
+            
+            user_similarity_matrix = neighbor_indices = neighbor_scores = None
+            with metrics.timer('collaborative', 'fit.similarity'):
+                if self.n_neighbors is not None:
+                    # Keep only the top-K most similar users, computed in chunks
+                    neighbor_indices, neighbor_scores = top_k_cosine_neighbors(
+                        normalized_matrix,
+                        self.n_neighbors,
+                        block_size=self.block_size,
+                        n_jobs=self.n_jobs
+                    )
+                else:
+                    # Compute user-user similarity using cosine similarity
+                    # Similar users have similar rating patterns
+                    user_similarity_matrix = cosine_similarity(normalized_matrix)
+            
+            with metrics.timer('collaborative', 'fit.state'):
+                state = _CollaborativeState(
+                    catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                    user_similarity_matrix, neighbor_indices, neighbor_scores
+                )
+                state.popularity(self.popularity_prior)
+            state.stamp('fit', started)
+            self._publish(state)
+        
+        print(f"Collaborative filtering model trained on {len(user_ids)} users")
+    
+    def get_arrays(self):
+        """
+        Return the fitted state as a dictionary of NumPy arrays
+        (see backend/utils/artifacts.py).
+        """
+        state = self._state
+        arrays = {
+            'ratings_data': state.user_item_matrix.data,
+            'ratings_indices': state.user_item_matrix.indices,
+            'ratings_indptr': state.user_item_matrix.indptr,
+            'user_ids': state.user_ids,
+            'movie_ids': state.movie_ids,
+            'user_means': state.user_means
+        }
+        if state.neighbor_indices is not None:
+            arrays['neighbor_indices'] = state.neighbor_indices
+            arrays['neighbor_scores'] = state.neighbor_scores
+        else:
+            arrays['user_similarity_matrix'] = state.user_similarity_matrix.toarray()
+        return arrays
+    
+    @metrics.timed('collaborative', 'load_arrays')
+    def load_arrays(self, arrays, catalog=None, source='artifacts'):
+        """
+        Restore a fitted model from arrays produced by get_arrays().
+        The arrays are used as-is, so memory-mapped inputs stay mapped.
+        
+        Args:
+            arrays: Dictionary of NumPy arrays
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
+            source: Where the arrays come from, as reported by /health
+        """
+        started = time.perf_counter()
+        catalog = get_catalog() if catalog is None else catalog
+        user_ids = arrays['user_ids']
+        movie_ids = arrays['movie_ids']
+        user_item_matrix = sparse.csr_matrix(
+            (arrays['ratings_data'], arrays['ratings_indices'], arrays['ratings_indptr']),
+            shape=(len(user_ids), len(movie_ids))
+        )
+        
+        state = _CollaborativeState(
+            catalog, user_item_matrix, user_ids, movie_ids, arrays['user_means'],
+            arrays.get('user_similarity_matrix'),
+            arrays.get('neighbor_indices'),
+            arrays.get('neighbor_scores')
+        )
+        state.popularity(self.popularity_prior)
+        state.stamp(source, started)
+        with self._write_lock:
+            self._publish(state)
+    
+    def user_position(self, user_id):
+        """
+        Return the row index of a user in the user-item matrix, or None.
+        Uses a binary search over the sorted user ids.
+        """
+        state = self._state
+        return None if state is None else state.user_position(user_id)
+    
+    @metrics.timed('collaborative', 'add_ratings')
+    def add_ratings(self, ratings_df):
+        """
+        Fold new ratings into the fitted model without a full refit.
+        New users and movies are appended as new rows and columns, a new
+        rating for an already rated movie replaces the old one, and only the
+        similarities of the users whose ratings changed are recomputed.
+        
+        In KNN mode, other users' neighbour lists are updated with the new
+        similarities to the changed users; a neighbour whose similarity
+        drops is replaced by the best remaining candidate, so lists can
+        drift from an exact fit until the next fit().
+        
+        The new state is built on the side and swapped in at the end, so
+        concurrent recommend() calls see either the old or the new model;
+        the dense similarity matrix gets the changed rows as an overlay of
+        the new state (see PatchedSimilarity), never written in place.
+        
+        Args:
+            ratings_df: DataFrame with user_id, movie_id and rating columns
+        
+        Returns:
+            Number of users whose ratings changed
         """
-        # Load data
-        self.movies_df = load_movies_data()
-        self.ratings_df = load_user_ratings()
+        ratings_df = _clean_new_ratings(ratings_df)
+        if ratings_df.empty:
+            return 0
         
-        if self.ratings_df.empty:
-            raise ValueError("Ratings data is empty")
+        with self._write_lock:
+            state = self._state
+            if state is None:
+                raise RuntimeError("Model must be fitted before adding ratings")
+            
+            user_item_matrix, user_ids, movie_ids, changed = state.merge_ratings(ratings_df)
+            n_users = user_item_matrix.shape[0]
+            
+            # A user's normalized vector depends only on their own ratings,
+            # so only the means, norms and similarities of changed users move
+            user_means, changed_rows = _update_user_means(state.user_means, user_item_matrix, changed)
+            user_norms = np.concatenate([state.user_norms(), np.zeros(n_users - len(state.user_means))])
+            user_norms[changed] = _row_norms(changed_rows)
+            ones = state.ones
+            if len(ones) < user_item_matrix.nnz:
+                ones = np.ones(_grow(len(ones), user_item_matrix.nnz))
+            changed_similarities = self._changed_similarities(
+                user_item_matrix, _rated_indicator(user_item_matrix, ones),
+                user_means, user_norms, changed_rows
+            )
+            
+            user_similarity_matrix = neighbor_indices = neighbor_scores = None
+            if state.neighbor_indices is None:
+                user_similarity_matrix = state.user_similarity_matrix.update(changed, changed_similarities)
+            else:
+                neighbor_indices, neighbor_scores = self._update_neighbors(
+                    state, user_item_matrix, changed, changed_similarities
+                )
+            
+            updated = _CollaborativeState(
+                state.catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                user_similarity_matrix, neighbor_indices, neighbor_scores,
+                user_norms, ones, previous=state, changed=changed
+            )
+            updated.copy_stamp(state)
+            self._publish(updated)
         
-        # Create user-item matrix
-        self.user_item_matrix = create_user_item_matrix(self.ratings_df)
+        print(f"Collaborative filtering model updated with {len(ratings_df)} ratings "
+              f"from {len(changed)} users")
+        return len(changed)
+    
+    def _changed_similarities(self, user_item_matrix, rated_matrix, user_means, user_norms, changed_rows):
+        """
+        Cosine similarities of the changed users (their mean-centered rows)
+        to every user, without centering the whole matrix: for a user with
+        ratings r, mean m and centered norm n, the dot product with a
+        vector c is (r . c - m * sum of c over the rated movies) / n.
         
-        # Normalize ratings to handle user bias
-        normalized_matrix, _ = normalize_ratings(self.user_item_matrix)
+        Returns:
+            Dense (len(changed), U) similarities
+        """
+        changed_unit = normalize(changed_rows, norm='l2', axis=1).T.toarray()
+        dots = user_item_matrix @ changed_unit - user_means[:, None] * (rated_matrix @ changed_unit)
+        norms = user_norms[:, None]
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0).T
+    
+    def _update_neighbors(self, state, user_item_matrix, changed, changed_similarities):
+        """
+        Update the top-K neighbour arrays after the users in changed got new
+        similarity rows (changed_similarities, one row per changed user).
+        """
+        n_users = user_item_matrix.shape[0]
         
-        # Compute user-user similarity using cosine similarity
-        # Similar users have similar rating patterns
-        self.user_similarity_matrix = cosine_similarity(normalized_matrix)
+        # The list length depends on the user count while it is below K
+        if state.neighbor_indices.shape[1] != min(self.n_neighbors, n_users - 1):
+            return top_k_cosine_neighbors(
+                normalize_ratings(user_item_matrix)[0], self.n_neighbors,
+                block_size=self.block_size, n_jobs=self.n_jobs
+            )
         
-        print(f"Collaborative filtering model trained on {len(self.user_item_matrix)} users")
+        return update_top_k_neighbors(
+            state.neighbor_indices, state.neighbor_scores, changed, changed_similarities
+        )
     
-    def recommend(self, user_id, n_recommendations=10):
+    def predict_ratings(self, user_idx, state=None):
+        """
+        Predict ratings for every movie the user hasn't rated.
+        Each prediction is a similarity-weighted average of the ratings given
+        by other users, computed for all movies at once as
+        (similarities @ ratings) / (|similarities| @ rated).
+        In neighbour mode only the user's K neighbours contribute.
+        
+        Args:
+            user_idx: Row index of the user in the user-item matrix
+            state: State snapshot to use (the current one if omitted)
+        
+        Returns:
+            Array with one predicted rating per movie column; NaN where no
+            prediction is possible or the user already rated the movie
+        """
+        state = self._state if state is None else state
+        if state.neighbor_indices is not None:
+            neighbors = state.neighbor_indices[user_idx]
+            user_similarities = state.neighbor_scores[user_idx]
+            ratings = state.user_item_matrix[neighbors]
+            rated = state.rated_matrix[neighbors]
+        else:
+            user_similarities = state.user_similarity_matrix[user_idx]
+            ratings = state.user_item_matrix
+            rated = state.rated_matrix
+        
+        weighted_sum = ratings.T @ user_similarities
+        similarity_sum = rated.T @ np.abs(user_similarities)
+        
+        predicted = np.full(state.user_item_matrix.shape[1], np.nan)
+        np.divide(weighted_sum, similarity_sum, out=predicted, where=similarity_sum > 0)
+        
+        # Only movies the user hasn't rated yet are candidates
+        indptr = state.user_item_matrix.indptr
+        rated = state.user_item_matrix.indices[indptr[user_idx]:indptr[user_idx + 1]]
+        predicted[rated] = np.nan
+        
+        return predicted
+    
+    def rank(self, user_id, n_recommendations=10):
+        """
+        Rank unrated movies for a known user by predicted rating.
+        
+        Args:
+            user_id: ID of the user to recommend movies for
+            n_recommendations: Number of movies to rank
+        
+        Returns:
+            Tuple of (movie record indices, predicted ratings) arrays, best
+            first. Both are empty if the user is unknown.
+        """
+        return _cached_rank(self, 'collaborative', user_id, n_recommendations)
+    
+    def _rank_live(self, user_id, n_recommendations):
+        """Score a user with the similarity-weighted rating predictions."""
+        state = self._state
+        with metrics.timer('collaborative', 'recommend.lookup'):
+            user_idx = state.user_position(user_id)
+        
+        if user_idx is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        with metrics.timer('collaborative', 'recommend.scoring'):
+            predicted = self.predict_ratings(user_idx, state)
+        
+        with metrics.timer('collaborative', 'recommend.ranking'):
+            scores = np.where(np.isnan(predicted), -np.inf, predicted)
+            top_columns = _top_n_indices(scores, n_recommendations)
+            
+            # Movies missing from the catalog are skipped
+            top_records = state.column_records[top_columns]
+            known = top_records >= 0
+        
+        return top_records[known], predicted[top_columns][known]
+    
+    def recommend(self, user_id, n_recommendations=10, genre=None, fields=SUMMARY_FIELDS):
         """
         Get movie recommendations for a user based on collaborative filtering.
         
         Args:
             user_id: ID of the user to recommend movies for
             n_recommendations: Number of recommendations to return
+            genre: Optional genre hint for users without ratings
+            fields: Movie fields of each recommendation
         
         Returns:
             List of recommended movie dictionaries
         """
         # Check if user exists in our data
-        if user_id not in self.user_item_matrix.index:
+        if self.user_position(user_id) is None:
             # Return popular movies for new users (cold start problem)
-            return self._get_popular_movies(n_recommendations)
+            return self._get_popular_movies(n_recommendations, genre, fields)
         
-        # Get user's index in the matrix
-        user_idx = self.user_item_matrix.index.get_loc(user_id)
+        top_records, predicted_ratings = self.rank(user_id, n_recommendations)
+        return self._to_records(top_records, predicted_ratings, fields)
+    
+    def recommend_json(self, user_id, n_recommendations=10, genre=None, fields=SUMMARY_FIELDS):
+        """
+        Same as recommend(), serialized from the catalog's encoded columns.
+        
+        Returns:
+            Tuple of (number of recommendations, JSON array bytes)
+        """
+        state = self._state
+        catalog = state.catalog
+        if self.user_position(user_id) is None:
+            popular = state.popularity(self.popularity_prior).top(n_recommendations, genre)
+            with metrics.timer('collaborative', 'recommend.serialization'):
+                return _records_json(catalog, popular, fields)
         
-        # Get similarity scores with all other users
-        user_similarities = self.user_similarity_matrix[user_idx]
+        top_records, predicted_ratings = self.rank(user_id, n_recommendations)
+        with metrics.timer('collaborative', 'recommend.serialization'):
+            return _records_json(catalog, top_records, fields, 'predicted_rating', predicted_ratings)
+    
+    def rank_many(self, user_ids, n_recommendations=10):
+        """
+        Rank unrated movies for many users at once.
+        Users are scored block by block with sparse matrix-matrix products:
+        (similarity block @ ratings) / (|similarity block| @ rated).
         
-        # Get movies the user hasn't rated yet
-        user_ratings = self.user_item_matrix.iloc[user_idx]
-        unrated_movies = user_ratings[user_ratings == 0].index.tolist()
+        Args:
+            user_ids: Sequence of user IDs
+            n_recommendations: Number of movies to rank per user
         
-        # Predict ratings for unrated movies using weighted average
-        predicted_ratings = {}
-        for movie_id in unrated_movies:
-            # Find users who rated this movie
-            movie_ratings = self.user_item_matrix[movie_id]
-            rated_users = movie_ratings[movie_ratings > 0]
+        Returns:
+            List aligned with user_ids of (movie record indices, predicted
+            ratings) tuples, or None for unknown users
+        """
+        state = self._state
+        positions = [state.user_position(user_id) for user_id in user_ids]
+        results = [None] * len(positions)
+        known = [i for i, idx in enumerate(positions) if idx is not None]
+        n_users = state.user_item_matrix.shape[0]
+        
+        for start in range(0, len(known), self.block_size):
+            chunk = known[start:start + self.block_size]
+            rows = np.array([positions[i] for i in chunk], dtype=np.intp)
             
-            if len(rated_users) == 0:
-                continue
+            if state.neighbor_indices is not None:
+                k = state.neighbor_indices.shape[1]
+                similarities = sparse.csr_matrix(
+                    (state.neighbor_scores[rows].ravel(),
+                     state.neighbor_indices[rows].ravel(),
+                     np.arange(0, len(rows) * k + 1, k)),
+                    shape=(len(rows), n_users)
+                )
+                weighted_sum = (similarities @ state.user_item_matrix).toarray()
+                similarity_sum = (abs(similarities) @ state.rated_matrix).toarray()
+            else:
+                similarities = state.user_similarity_matrix[rows]
+                weighted_sum = (state.user_item_matrix.T @ similarities.T).T
+                similarity_sum = (state.rated_matrix.T @ np.abs(similarities).T).T
             
-            # Weighted average of ratings from similar users
-            weighted_sum = 0
-            similarity_sum = 0
+            predicted = np.full(weighted_sum.shape, np.nan)
+            np.divide(weighted_sum, similarity_sum, out=predicted, where=similarity_sum > 0)
             
-            for other_user_idx in rated_users.index:
-                other_user_position = self.user_item_matrix.index.get_loc(other_user_idx)
-                similarity = user_similarities[other_user_position]
-                rating = rated_users[other_user_idx]
-                
-                weighted_sum += similarity * rating
-                similarity_sum += abs(similarity)
-            
-            # Calculate predicted rating
-            if similarity_sum > 0:
-                predicted_ratings[movie_id] = weighted_sum / similarity_sum
-        
-        # Sort by predicted rating
-        sorted_predictions = sorted(
-            predicted_ratings.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:n_recommendations]
-        
-        # Get movie details
-        recommendations = []
-        for movie_id, predicted_rating in sorted_predictions:
-            movie = self.movies_df[self.movies_df['movie_id'] == movie_id]
-            if not movie.empty:
-                movie = movie.iloc[0]
-                recommendations.append({
-                    'movie_id': int(movie['movie_id']),
-                    'title': movie['title'],
-                    'genres': movie['genres'],
-                    'director': movie['director'],
-                    'rating': float(movie['rating']),
-                    'year': int(movie['year']),
-                    'description': movie['description'],
-                    'predicted_rating': float(predicted_rating)
-                })
-        
-        return recommendations
-    
-    def _get_popular_movies(self, n_recommendations):
-        """
-        Fallback: Return most popular movies for cold start users.
-        """
-        popular_movies = self.movies_df.nlargest(n_recommendations, 'rating')
-        
-        recommendations = []
-        for _, movie in popular_movies.iterrows():
-            recommendations.append({
-                'movie_id': int(movie['movie_id']),
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'director': movie['director'],
-                'rating': float(movie['rating']),
-                'year': int(movie['year']),
-                'description': movie['description']
-            })
-        
-        return recommendations
+            # Mask the movies each user has already rated
+            rated = state.rated_matrix[rows].tocoo()
+            predicted[rated.row, rated.col] = np.nan
+            
+            scores = np.where(np.isnan(predicted), -np.inf, predicted)
+            for offset, (i, top_columns) in enumerate(zip(chunk, _top_n_rows(scores, n_recommendations))):
+                top_records = state.column_records[top_columns]
+                keep = top_records >= 0
+                results[i] = (top_records[keep], predicted[offset, top_columns][keep])
+        
+        return results
+    
+    def recommend_many(self, user_ids, n_recommendations=10, fields=SUMMARY_FIELDS):
+        """
+        Get collaborative recommendations for many users at once.
+        Unknown users get the popular-movies fallback, like recommend().
+        
+        Args:
+            user_ids: Sequence of user IDs
+            n_recommendations: Number of recommendations per user
+            fields: Movie fields of each recommendation
+        
+        Returns:
+            List aligned with user_ids of recommendation lists
+        """
+        return [
+            self._get_popular_movies(n_recommendations, fields=fields) if ranked is None
+            else self._to_records(*ranked, fields)
+            for ranked in self.rank_many(user_ids, n_recommendations)
+        ]
+    
+    @metrics.timed('collaborative', 'recommend.serialization')
+    def _to_records(self, top_records, predicted_ratings, fields=SUMMARY_FIELDS):
+        return _records(self._state.catalog, top_records, fields, 'predicted_rating', predicted_ratings)
+    
+    def _get_popular_movies(self, n_recommendations, genre=None, fields=SUMMARY_FIELDS):
+        """
+        Fallback: Return most popular movies for cold start users, from
+        the snapshot's precomputed popularity ranking.
+        """
+        state = self._state
+        top_indices = state.popularity(self.popularity_prior).top(n_recommendations, genre)
+        return _records(state.catalog, top_indices, fields)
+
+
+class _FactorizationState(_RatingsState):
+    """Snapshot of a fitted matrix factorization model."""
+    
+    def __init__(self, catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                 user_factors, item_factors, previous=None, changed=None):
+        super().__init__(catalog, user_item_matrix, user_ids, movie_ids, user_means, previous, changed)
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+
+
+class MatrixFactorizationRecommender:
+    """
+    Matrix Factorization Recommender System.
+    Learns low-rank user and movie factors from mean-centered ratings with
+    alternating least squares, so memory is O((users + movies) * factors)
+    instead of O(users^2), and scoring a user is one product against the
+    movie-factor matrix.
+
+    Predicted rating = user mean + user factors . movie factors.
+
+    Args:
+        n_factors: Rank of the factorization
+        regularization: L2 penalty (weighted by rating counts)
+        n_iter: ALS sweeps
+        n_jobs: Worker threads for the ALS solves (-1 = all cores)
+        block_size: Users scored per block by rank_many()
+        seed: Random seed
+        popularity_prior: Prior rating count of the cold-start popularity
+            ranking (None = median ratings per movie, see _PopularityIndex)
+    """
+    
+    catalog = _state_attribute('catalog')
+    user_item_matrix = _state_attribute('user_item_matrix')
+    user_ids = _state_attribute('user_ids')
+    movie_ids = _state_attribute('movie_ids')
+    user_means = _state_attribute('user_means')
+    user_factors = _state_attribute('user_factors')
+    item_factors = _state_attribute('item_factors')
+    column_records = _state_attribute('column_records')
+    movies_df = _catalog_attribute('movies_df')
+    
+    def __init__(self, n_factors=32, regularization=0.1, n_iter=10, n_jobs=None,
+                 block_size=1024, seed=0, popularity_prior=None):
+        self.n_factors = n_factors
+        self.regularization = regularization
+        self.n_iter = n_iter
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+        self.seed = seed
+        self.popularity_prior = popularity_prior
+        self.precomputed = None
+        self.cache = _new_cache()
+        self.version = 0
+        self._state = None
+        self._write_lock = threading.Lock()
+    
+    def _publish(self, state):
+        """Swap in a new state snapshot, then bump the version (in that order)."""
+        self.precomputed = None
+        self._state = state
+        self.version = next(_model_versions)
+    
+    @metrics.timed('factorization', 'fit')
+    def fit(self, catalog=None, ratings_df=None):
+        """
+        Train the matrix factorization model.
+        
+        Args:
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
+            ratings_df: Optional ratings DataFrame (loaded from disk if omitted)
+        """
+        started = time.perf_counter()
+        
+        with self._write_lock:
+            catalog = get_catalog() if catalog is None else catalog
+            with metrics.timer('factorization', 'fit.load'):
+                if ratings_df is None:
+                    user_item_matrix, user_ids, movie_ids = load_ratings_matrix(config.RATINGS_CHUNK_SIZE)
+                else:
+                    user_item_matrix, user_ids, movie_ids = create_user_item_matrix(ratings_df)
+            
+            if user_item_matrix.nnz == 0:
+                raise ValueError("Ratings data is empty")
+            with metrics.timer('factorization', 'fit.normalize'):
+                normalized_matrix, user_means = normalize_ratings(user_item_matrix)
+            
+            with metrics.timer('factorization', 'fit.als'):
+                user_factors, item_factors = als_factorize(
+                    normalized_matrix,
+                    self.n_factors,
+                    regularization=self.regularization,
+                    n_iter=self.n_iter,
+                    n_jobs=self.n_jobs,
+                    seed=self.seed
+                )
+            
+            # Compact float32 factors for scoring
+            with metrics.timer('factorization', 'fit.state'):
+                state = _FactorizationState(
+                    catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                    user_factors.astype(np.float32), item_factors.astype(np.float32)
+                )
+                state.popularity(self.popularity_prior)
+            state.stamp('fit', started)
+            self._publish(state)
+        
+        print(f"Matrix factorization model trained on {len(user_ids)} users "
+              f"with {self.n_factors} factors")
+    
+    def get_arrays(self):
+        """
+        Return the fitted state as a dictionary of NumPy arrays
+        (see backend/utils/artifacts.py).
+        """
+        state = self._state
+        return {
+            'ratings_data': state.user_item_matrix.data,
+            'ratings_indices': state.user_item_matrix.indices,
+            'ratings_indptr': state.user_item_matrix.indptr,
+            'user_ids': state.user_ids,
+            'movie_ids': state.movie_ids,
+            'user_means': state.user_means,
+            'user_factors': state.user_factors,
+            'item_factors': state.item_factors
+        }
+    
+    @metrics.timed('factorization', 'load_arrays')
+    def load_arrays(self, arrays, catalog=None, source='artifacts'):
+        """
+        Restore a fitted model from arrays produced by get_arrays().
+        The arrays are used as-is, so memory-mapped inputs stay mapped.
+        
+        Args:
+            arrays: Dictionary of NumPy arrays
+            catalog: Optional MovieCatalog (the shared catalog if omitted)
+            source: Where the arrays come from, as reported by /health
+        """
+        started = time.perf_counter()
+        catalog = get_catalog() if catalog is None else catalog
+        user_ids = arrays['user_ids']
+        movie_ids = arrays['movie_ids']
+        user_item_matrix = sparse.csr_matrix(
+            (arrays['ratings_data'], arrays['ratings_indices'], arrays['ratings_indptr']),
+            shape=(len(user_ids), len(movie_ids))
+        )
+        
+        state = _FactorizationState(
+            catalog, user_item_matrix, user_ids, movie_ids, arrays['user_means'],
+            arrays['user_factors'], arrays['item_factors']
+        )
+        state.popularity(self.popularity_prior)
+        state.stamp(source, started)
+        with self._write_lock:
+            self._publish(state)
+    
+    def user_position(self, user_id):
+        """Return the row index of a user, or None."""
+        state = self._state
+        return None if state is None else state.user_position(user_id)
+    
+    @metrics.timed('factorization', 'add_ratings')
+    def add_ratings(self, ratings_df):
+        """
+        Fold new ratings into the fitted model without a full refit.
+        The factors of the users whose ratings changed are re-solved
+        against the fixed movie factors (one ALS half-step for those users
+        only). Movies without factors yet are not recommended until the
+        next fit().
+        
+        Args:
+            ratings_df: DataFrame with user_id, movie_id and rating columns
+        
+        Returns:
+            Number of users whose ratings changed
+        """
+        ratings_df = _clean_new_ratings(ratings_df)
+        if ratings_df.empty:
+            return 0
+        
+        with self._write_lock:
+            state = self._state
+            if state is None:
+                raise RuntimeError("Model must be fitted before adding ratings")
+            
+            user_item_matrix, user_ids, movie_ids, changed = state.merge_ratings(ratings_df)
+            user_means, changed_rows = _update_user_means(state.user_means, user_item_matrix, changed)
+            
+            n_users, n_movies = user_item_matrix.shape
+            item_factors = state.item_factors
+            if n_movies > len(item_factors):
+                item_factors = np.concatenate([
+                    item_factors,
+                    np.zeros((n_movies - len(item_factors), self.n_factors), dtype=item_factors.dtype)
+                ])
+            user_factors = np.zeros((n_users, self.n_factors), dtype=state.user_factors.dtype)
+            user_factors[:len(state.user_factors)] = state.user_factors
+            user_factors[changed] = solve_factors(
+                changed_rows, item_factors.astype(np.float64), self.regularization
+            )
+            
+            updated = _FactorizationState(
+                state.catalog, user_item_matrix, user_ids, movie_ids, user_means,
+                user_factors, item_factors, previous=state, changed=changed
+            )
+            updated.copy_stamp(state)
+            self._publish(updated)
+        
+        print(f"Matrix factorization model updated with {len(ratings_df)} ratings "
+              f"from {len(changed)} users")
+        return len(changed)
+    
+    def predict_ratings(self, user_idx, state=None):
+        """
+        Predict a user's rating for every movie column.
+        
+        Args:
+            user_idx: Row index of the user in the user-item matrix
+            state: State snapshot to use (the current one if omitted)
+        
+        Returns:
+            Array with one predicted rating per movie column; NaN where the
+            user already rated the movie
+        """
+        state = self._state if state is None else state
+        predicted = state.item_factors @ state.user_factors[user_idx] + state.user_means[user_idx]
+        predicted = np.clip(predicted.astype(np.float64), *state.rating_range)
+        
+        indptr = state.user_item_matrix.indptr
+        rated = state.user_item_matrix.indices[indptr[user_idx]:indptr[user_idx + 1]]
+        predicted[rated] = np.nan
+        
+        return predicted
+    
+    def rank(self, user_id, n_recommendations=10):
+        """
+        Rank unrated movies for a known user by predicted rating.
+        
+        Args:
+            user_id: ID of the user to recommend movies for
+            n_recommendations: Number of movies to rank
+        
+        Returns:
+            Tuple of (movie record indices, predicted ratings) arrays, best
+            first. Both are empty if the user is unknown.
+        """
+        return _cached_rank(self, 'factorization', user_id, n_recommendations)
+    
+    def _rank_live(self, user_id, n_recommendations):
+        """Score a user against the movie-factor matrix."""
+        state = self._state
+        with metrics.timer('factorization', 'recommend.lookup'):
+            user_idx = state.user_position(user_id)
+        
+        if user_idx is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        with metrics.timer('factorization', 'recommend.scoring'):
+            predicted = self.predict_ratings(user_idx, state)
+        
+        with metrics.timer('factorization', 'recommend.ranking'):
+            scores = np.where(np.isnan(predicted), -np.inf, predicted)
+            top_columns = _top_n_indices(scores, n_recommendations)
+            
+            # Movies missing from the catalog are skipped
+            top_records = state.column_records[top_columns]
+            known = top_records >= 0
+        
+        return top_records[known], predicted[top_columns][known]
+    
+    def recommend(self, user_id, n_recommendations=10, genre=None, fields=SUMMARY_FIELDS):
+        """
+        Get movie recommendations for a user from the learned factors.
+        
+        Args:
+            user_id: ID of the user to recommend movies for
+            n_recommendations: Number of recommendations to return
+            genre: Optional genre hint for users without ratings
+            fields: Movie fields of each recommendation
+        
+        Returns:
+            List of recommended movie dictionaries
+        """
+        if self.user_position(user_id) is None:
+            # Return popular movies for new users (cold start problem)
+            return self._get_popular_movies(n_recommendations, genre, fields)
+        
+        top_records, predicted_ratings = self.rank(user_id, n_recommendations)
+        return self._to_records(top_records, predicted_ratings, fields)
+    
+    def recommend_json(self, user_id, n_recommendations=10, genre=None, fields=SUMMARY_FIELDS):
+        """
+        Same as recommend(), serialized from the catalog's encoded columns.
+        
+        Returns:
+            Tuple of (number of recommendations, JSON array bytes)
+        """
+        state = self._state
+        catalog = state.catalog
+        if self.user_position(user_id) is None:
+            popular = state.popularity(self.popularity_prior).top(n_recommendations, genre)
+            with metrics.timer('factorization', 'recommend.serialization'):
+                return _records_json(catalog, popular, fields)
+        
+        top_records, predicted_ratings = self.rank(user_id, n_recommendations)
+        with metrics.timer('factorization', 'recommend.serialization'):
+            return _records_json(catalog, top_records, fields, 'predicted_rating', predicted_ratings)
+    
+    def rank_many(self, user_ids, n_recommendations=10):
+        """
+        Rank unrated movies for many users at once, one
+        (users x factors) @ (factors x movies) product per block.
+        
+        Args:
+            user_ids: Sequence of user IDs
+            n_recommendations: Number of movies to rank per user
+        
+        Returns:
+            List aligned with user_ids of (movie record indices, predicted
+            ratings) tuples, or None for unknown users
+        """
+        state = self._state
+        positions = [state.user_position(user_id) for user_id in user_ids]
+        results = [None] * len(positions)
+        known = [i for i, idx in enumerate(positions) if idx is not None]
+        
+        for start in range(0, len(known), self.block_size):
+            chunk = known[start:start + self.block_size]
+            rows = np.array([positions[i] for i in chunk], dtype=np.intp)
+            
+            predicted = state.user_factors[rows] @ state.item_factors.T
+            predicted = predicted.astype(np.float64) + state.user_means[rows][:, None]
+            np.clip(predicted, *state.rating_range, out=predicted)
+            
+            # Mask the movies each user has already rated
+            rated = state.user_item_matrix[rows].tocoo()
+            predicted[rated.row, rated.col] = -np.inf
+            
+            for offset, (i, top_columns) in enumerate(zip(chunk, _top_n_rows(predicted, n_recommendations))):
+                top_records = state.column_records[top_columns]
+                keep = top_records >= 0
+                results[i] = (top_records[keep], predicted[offset, top_columns][keep])
+        
+        return results
+    
+    def recommend_many(self, user_ids, n_recommendations=10, fields=SUMMARY_FIELDS):
+        """
+        Get matrix factorization recommendations for many users at once.
+        Unknown users get the popular-movies fallback, like recommend().
+        
+        Args:
+            user_ids: Sequence of user IDs
+            n_recommendations: Number of recommendations per user
+            fields: Movie fields of each recommendation
+        
+        Returns:
+            List aligned with user_ids of recommendation lists
+        """
+        return [
+            self._get_popular_movies(n_recommendations, fields=fields) if ranked is None
+            else self._to_records(*ranked, fields)
+            for ranked in self.rank_many(user_ids, n_recommendations)
+        ]
+    
+    @metrics.timed('factorization', 'recommend.serialization')
+    def _to_records(self, top_records, predicted_ratings, fields=SUMMARY_FIELDS):
+        return _records(self._state.catalog, top_records, fields, 'predicted_rating', predicted_ratings)
+    
+    def _get_popular_movies(self, n_recommendations, genre=None, fields=SUMMARY_FIELDS):
+        """
+        Fallback: Return most popular movies for cold start users, from
+        the snapshot's precomputed popularity ranking.
+        """
+        state = self._state
+        top_indices = state.popularity(self.popularity_prior).top(n_recommendations, genre)
+        return _records(state.catalog, top_indices, fields)
+
+
+class HybridRecommender:
+    """
+    Hybrid Recommender System.
+    Blends a seed movie's content similarity with a collaborative model's
+    rating predictions for a user:
+    
+        score = alpha * similarity + (1 - alpha) * scaled predicted rating
+    
+    Nothing is fitted here: both parts are read from the component models'
+    current snapshots as score vectors over the catalog index, so a request
+    is one similarity row, one prediction pass and one top-N selection.
+    Predicted ratings are scaled to [0, 1] with the observed rating range,
+    movies without a prediction count as 0 and movies the user has rated
+    are left out. Users without ratings get the cold-start popularity
+    scores (see _PopularityIndex) in place of predictions.
+    
+    Args:
+        content_model: ContentBasedRecommender providing similarities
+        collaborative_model: CollaborativeFilteringRecommender or
+            MatrixFactorizationRecommender providing predictions
+    """
+    
+    def __init__(self, content_model, collaborative_model):
+        self.content_model = content_model
+        self.collaborative_model = collaborative_model
+        self.precomputed = None
+        self.cache = _new_cache()
+        self._catalog_mapping = None
+    
+    @property
+    def version(self):
+        """Changes whenever either component publishes a new state."""
+        return (self.content_model.version, self.collaborative_model.version)
+    
+    def rank(self, user_id, seed_movie_id, n_recommendations=10, alpha=0.5):
+        """
+        Rank movies for a user by the blended score.
+        
+        Args:
+            user_id: ID of the user to recommend movies for
+            seed_movie_id: ID of the movie the recommendations should resemble
+            n_recommendations: Number of movies to rank
+            alpha: Weight of content similarity, between 0 and 1
+        
+        Returns:
+            Tuple of (movie record indices, hybrid scores) arrays, best
+            first. Both are empty if the seed movie is unknown.
+        """
+        if not 0 <= alpha <= 1:
+            raise ValueError("alpha must be between 0 and 1")
+        return _cached_rank(self, 'hybrid', (user_id, seed_movie_id, float(alpha)), n_recommendations)
+    
+    def _rank_live(self, key, n_recommendations):
+        """Blend the similarity row and the prediction vector, then take the top N."""
+        user_id, seed_movie_id, alpha = key
+        content_state = self.content_model._state
+        ratings_state = self.collaborative_model._state
+        catalog = content_state.catalog
+        with metrics.timer('hybrid', 'recommend.lookup'):
+            seed_idx = catalog.position(seed_movie_id)
+            user_idx = ratings_state.user_position(user_id)
+        
+        if seed_idx is None:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        with metrics.timer('hybrid', 'recommend.scoring'):
+            similarity = self._similarity(content_state, seed_idx)
+            preference = self._preference(ratings_state, user_idx, catalog)
+            
+            # NaN preferences mark movies the user has already rated
+            excluded = np.isnan(preference)
+            scores = alpha * similarity + (1 - alpha) * np.where(excluded, 0.0, preference)
+            scores[excluded] = -np.inf
+            scores[seed_idx] = -np.inf
+        
+        with metrics.timer('hybrid', 'recommend.ranking'):
+            top_indices = _top_n_indices(scores, n_recommendations)
+            return top_indices, scores[top_indices]
+    
+    def _similarity(self, state, seed_idx):
+        """Cosine similarity of the seed movie to every catalog movie."""
+        if state.similarity_matrix is not None:
+            return np.asarray(state.similarity_matrix[seed_idx], dtype=np.float64)
+        
+        # Neighbour lists and ANN indexes only cover the closest movies;
+        # TF-IDF rows are L2-normalized, so one sparse product gives the
+        # exact row
+        features = state.feature_matrix
+        return (features @ features[seed_idx].T).toarray().ravel()
+    
+    def _preference(self, state, user_idx, catalog):
+        """
+        Scaled predicted rating of every catalog movie; NaN for movies the
+        user has rated.
+        """
+        low, high = state.rating_range
+        span = high - low if high > low else 1.0
+        preference = np.zeros(len(state.catalog))
+        
+        if user_idx is None:
+            # Cold start: Bayesian-weighted popularity instead of predictions
+            popularity = state.popularity(self.collaborative_model.popularity_prior)
+            np.clip((popularity.scores - low) / span, 0.0, 1.0, out=preference)
+        else:
+            predicted = self.collaborative_model.predict_ratings(user_idx, state)
+            column_scores = np.clip((predicted - low) / span, 0.0, 1.0)
+            column_scores[np.isnan(column_scores)] = 0.0
+            
+            indptr = state.user_item_matrix.indptr
+            column_scores[state.user_item_matrix.indices[indptr[user_idx]:indptr[user_idx + 1]]] = np.nan
+            
+            known = state.column_records >= 0
+            preference[state.column_records[known]] = column_scores[known]
+        
+        if state.catalog is catalog:
+            return preference
+        
+        # The models were fitted on different catalogs (during a reload, or
+        # after add_movies()); carry the scores over by movie id
+        mapping = self._catalog_mapping
+        if mapping is None or mapping[0] is not state.catalog or mapping[1] is not catalog:
+            mapping = self._catalog_mapping = (
+                state.catalog, catalog, catalog.positions(state.catalog.movie_ids)
+            )
+        positions = mapping[2]
+        mapped = np.zeros(len(catalog))
+        known = positions >= 0
+        mapped[positions[known]] = preference[known]
+        return mapped
+    
+    def recommend(self, user_id, seed_movie_id, n_recommendations=10, alpha=0.5,
+                  fields=SUMMARY_FIELDS):
+        """
+        Get movie recommendations blending content and collaborative scores.
+        
+        Args:
+            user_id: ID of the user to recommend movies for
+            seed_movie_id: ID of the movie the recommendations should resemble
+            n_recommendations: Number of recommendations to return
+            alpha: Weight of content similarity, between 0 and 1
+            fields: Movie fields of each recommendation
+        
+        Returns:
+            List of recommended movie dictionaries
+        """
+        top_indices, top_scores = self.rank(user_id, seed_movie_id, n_recommendations, alpha)
+        with metrics.timer('hybrid', 'recommend.serialization'):
+            return _records(self.content_model._state.catalog, top_indices, fields, 'hybrid_score', top_scores)
+    
+    def recommend_json(self, user_id, seed_movie_id, n_recommendations=10, alpha=0.5,
+                       fields=SUMMARY_FIELDS):
+        """
+        Same as recommend(), serialized from the catalog's encoded columns.
+        
+        Returns:
+            Tuple of (number of recommendations, JSON array bytes)
+        """
+        top_indices, top_scores = self.rank(user_id, seed_movie_id, n_recommendations, alpha)
+        with metrics.timer('hybrid', 'recommend.serialization'):
+            return _records_json(
+                self.content_model._state.catalog, top_indices, fields, 'hybrid_score', top_scores
+            )
 
 
 # Initialize models (singleton pattern)
-content_recommender = ContentBasedRecommender()
-collaborative_recommender = CollaborativeFilteringRecommender()
+content_recommender = ContentBasedRecommender(
+    top_k=config.CONTENT_TOP_K, n_jobs=config.MODEL_N_JOBS, ann_params=config.CONTENT_ANN,
+    refit_ratio=config.CONTENT_REFIT_RATIO
+)
+collaborative_recommender = CollaborativeFilteringRecommender(
+    n_neighbors=config.COLLABORATIVE_NEIGHBORS, n_jobs=config.MODEL_N_JOBS,
+    popularity_prior=config.POPULARITY_PRIOR
+)
+factorization_recommender = MatrixFactorizationRecommender(
+    n_factors=config.FACTORIZATION_FACTORS,
+    regularization=config.FACTORIZATION_REGULARIZATION,
+    n_iter=config.FACTORIZATION_ITERATIONS,
+    n_jobs=config.MODEL_N_JOBS,
+    popularity_prior=config.POPULARITY_PRIOR
+)
+hybrid_recommender = HybridRecommender(content_recommender, collaborative_recommender)
+hybrid_factorization_recommender = HybridRecommender(content_recommender, factorization_recommender)
+
+def model_params():
+    """Settings that persisted artifacts must match to be reused."""
+    return {
+        'content_top_k': content_recommender.top_k,
+        'content_ann': (
+            None if content_recommender.ann_params is None
+            else IVFIndex(**content_recommender.ann_params).params()
+        ),
+        'collaborative_neighbors': collaborative_recommender.n_neighbors,
+        'factorization': {
+            'n_factors': factorization_recommender.n_factors,
+            'regularization': factorization_recommender.regularization,
+            'n_iter': factorization_recommender.n_iter,
+            'seed': factorization_recommender.seed
+        }
+    }
+
+def model_status(model):
+    """Version and load details of a model for the health endpoint."""
+    state = model._state
+    if state is None:
+        return {"status": "not initialized"}
+    
+    return {
+        "status": "ready",
+        "version": model.version,
+        "source": state.source,
+        "fit_seconds": round(state.fit_seconds, 3),
+        "loaded_at": datetime.fromtimestamp(state.loaded_at, timezone.utc).isoformat()
+    }
 
-def initialize_models():
-    """Initialize both recommendation models."""
-    content_recommender.fit()
-    collaborative_recommender.fit()
+def _array_bytes(value):
+    """Bytes held by a dense or sparse array (None for anything else)."""
+    if sparse.issparse(value):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return None
+
+def model_metrics():
+    """
+    Scrape-time gauges for /metrics (see backend/utils/metrics.py): model
+    versions, the shape, stored entries and size of every array in each
+    model's current state, and result cache counters.
+    """
+    models = {
+        'content': content_recommender,
+        'collaborative': collaborative_recommender,
+        'factorization': factorization_recommender
+    }
+    versions, rows, columns, entries, sizes, cache = [], [], [], [], [], []
+    
+    for name, model in models.items():
+        versions.append(({'model': name}, model.version))
+        state = model._state
+        if state is not None:
+            arrays = dict(vars(state))
+            if getattr(state, 'ann_index', None) is not None:
+                arrays.update({f'ann_{key}': value for key, value in state.ann_index.get_arrays().items()})
+            
+            for array_name, value in arrays.items():
+                nbytes = _array_bytes(value)
+                if nbytes is None:
+                    continue
+                labels = {'model': name, 'array': array_name.lstrip('_')}
+                sizes.append((labels, nbytes))
+                if value.ndim == 2:
+                    rows.append((labels, value.shape[0]))
+                    columns.append((labels, value.shape[1]))
+                    entries.append((labels, value.nnz if sparse.issparse(value) else value.size))
+        
+        if model.cache is not None:
+            stats = model.cache.stats()
+            for key in ('size', 'hits', 'misses'):
+                cache.append(({'model': name, 'counter': key}, stats[key]))
+    
+    return [
+        ('recommender_model_version', 'Version of the published model state', versions),
+        ('recommender_array_bytes', 'Memory held by model state arrays', sizes),
+        ('recommender_matrix_rows', 'Rows of model state matrices', rows),
+        ('recommender_matrix_columns', 'Columns of model state matrices', columns),
+        ('recommender_matrix_entries', 'Stored entries of model state matrices', entries),
+        ('recommender_cache', 'Result cache size, hits and misses', cache)
+    ]
+
+metrics.register_collector(model_metrics)
+
+def initialize_models(use_precomputed=True, arrays=None):
+    """
+    Initialize the recommendation models on the shared movie catalog.
+    Memory-maps persisted artifacts (including the catalog columns) when
+    they are up to date and falls back to fitting from the CSV files
+    otherwise. Precomputed top-N lists
+    are attached when they match the current data and settings.
+    
+    Also used for reloads while serving (see backend/models/reloader.py):
+    each model keeps serving its previous state until the new one is
+    published.
+    
+    Args:
+        use_precomputed: Attach the precomputed recommendation store
+        arrays: Model arrays to serve instead of the persisted artifacts,
+            in the same layout (the shared memory segments of backend/serve.py)
+    """
+    loaded = False
+    source = 'artifacts' if arrays is None else 'shared'
+    artifacts = load_artifacts(config.ARTIFACTS_DIR, model_params()) if arrays is None else arrays
+    catalog = get_catalog(None if artifacts is None else artifacts.get('catalog'))
+    if artifacts is not None:
+        try:
+            content_recommender.load_arrays(artifacts['content'], catalog, source)
+            collaborative_recommender.load_arrays(artifacts['collaborative'], catalog, source)
+            factorization_recommender.load_arrays(artifacts['factorization'], catalog, source)
+            print(f"Loaded model artifacts from {config.ARTIFACTS_DIR if arrays is None else 'shared memory'}")
+            loaded = True
+        except (KeyError, ValueError) as e:
+            print(f"Ignoring model artifacts: {e}")
+    else:
+        print("Model artifacts missing or stale, fitting models")
+    
+    if not loaded:
+        content_recommender.fit(catalog)
+        collaborative_recommender.fit(catalog)
+        factorization_recommender.fit(catalog)
+    
+    if use_precomputed:
+        store = PrecomputedStore.open(config.PRECOMPUTED_PATH, source_fingerprint(), model_params())
+        content_recommender.precomputed = store
+        collaborative_recommender.precomputed = store
+        factorization_recommender.precomputed = store
+        if store is not None:
+            print(f"Serving precomputed top-{store.top_n} lists from {config.PRECOMPUTED_PATH}")
@@ -0,0 +1,187 @@
+"""
+Background model reloading.
+Rebuilds the recommendation models on a worker thread when the data files
+change or a reload is requested. Each model publishes its new state with a
+single reference swap when it is complete, so requests keep being served
+from the previous state while the refit runs.
+
+API workers started by backend/serve.py don't refit: they follow the
+model generations the serving parent publishes in shared memory.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from backend import config
+from backend.models.recommender import initialize_models
+from backend.utils.artifacts import source_fingerprint
+from backend.utils.shared_models import SharedModelStore
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+class ModelReloader:
+    """
+    Runs model reloads in the background, one at a time.
+
+    Args:
+        interval: Seconds between data file checks (0 disables watching)
+    """
+    
+    def __init__(self, interval=0):
+        self.interval = interval
+        self.in_progress = False
+        self.last_reload = None
+        self.last_duration = None
+        self.last_reason = None
+        self.last_error = None
+        self._fingerprint = source_fingerprint()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+    
+    def start(self):
+        """Start watching the data files (no-op if the interval is 0)."""
+        if self.interval <= 0 or self._watcher is not None:
+            return
+        
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='model-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop(self):
+        """Stop watching the data files."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def acknowledge(self):
+        """
+        Accept the current data files as loaded.
+        Used after changes that were already applied to the running models
+        (e.g. ratings added through POST /ratings).
+        """
+        self._fingerprint = source_fingerprint()
+    
+    def request_reload(self, reason):
+        """
+        Start a background reload unless one is already running.
+        
+        Args:
+            reason: Short description reported by status()
+        
+        Returns:
+            True if a reload was started
+        """
+        return self._start_reload(reason)
+    
+    def _start_reload(self, reason):
+        with self._lock:
+            if self.in_progress:
+                return False
+            self.in_progress = True
+        
+        threading.Thread(
+            target=self._reload, args=(reason,), name='model-reload', daemon=True
+        ).start()
+        return True
+    
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            reason = self._changed()
+            if reason is not None:
+                self._start_reload(reason)
+    
+    def _changed(self):
+        """Reason to reload checked by the watcher, or None."""
+        if source_fingerprint() != self._fingerprint:
+            return 'data files changed'
+        return None
+    
+    def load(self):
+        """Load the models in the calling thread (at startup and on reloads)."""
+        initialize_models()
+    
+    def _reload(self, reason):
+        print(f"Reloading models ({reason})...")
+        started = time.perf_counter()
+        
+        # Taken before loading so changes made during the reload trigger
+        # another one
+        fingerprint = source_fingerprint()
+        try:
+            self.load()
+            self.last_error = None
+            print(f"Models reloaded in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Error reloading models: {e}")
+        finally:
+            self._fingerprint = fingerprint
+            self.last_reload = time.time()
+            self.last_duration = time.perf_counter() - started
+            self.last_reason = reason
+            self.in_progress = False
+    
+    def status(self):
+        """Reload state for the health endpoint."""
+        return {
+            "in_progress": self.in_progress,
+            "watch_interval_seconds": self.interval,
+            "last_reload": _timestamp(self.last_reload),
+            "last_duration_seconds": None if self.last_duration is None else round(self.last_duration, 3),
+            "last_reason": self.last_reason,
+            "last_error": self.last_error
+        }
+    
+    def shared_status(self):
+        """Shared memory generation for the health endpoint (None unless a worker of backend/serve.py)."""
+        return None
+
+class SharedModelReloader(ModelReloader):
+    """
+    Reloader of an API worker started by backend/serve.py.
+    Instead of refitting, the worker maps each new generation of model
+    arrays the serving parent publishes in shared memory, and hands reload
+    requests to the parent.
+    
+    Args:
+        store: SharedModelStore attached to the parent's control segment
+        interval: Seconds between generation checks
+    """
+    
+    def __init__(self, store, interval):
+        super().__init__(interval)
+        self.store = store
+        self.generation = None
+    
+    def request_reload(self, reason):
+        """Ask the serving parent to refit; workers pick up the result."""
+        self.store.request_reload()
+        return True
+    
+    def _changed(self):
+        # Unmap earlier generations once requests no longer use them
+        self.store.release_retired()
+        if self.store.generation() != self.generation:
+            return 'new model generation'
+        return None
+    
+    def load(self):
+        generation, arrays = self.store.read()
+        if arrays is None:
+            raise RuntimeError(f"No models published in {self.store.name}")
+        initialize_models(arrays=arrays)
+        self.generation = generation
+    
+    def shared_status(self):
+        return self.store.status()
+
+# Shared reloader (started by the application lifespan)
+if config.SHARED_MODELS is not None:
+    reloader = SharedModelReloader(SharedModelStore.attach(config.SHARED_MODELS), config.SHARED_POLL_SECONDS)
+else:
+    reloader = ModelReloader(interval=config.RELOAD_INTERVAL_SECONDS)
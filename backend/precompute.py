@@ -0,0 +1,90 @@
+"""
+Offline precompute job for top-N recommendations.
+Uses the fitted content, collaborative and matrix factorization recommenders
+to materialize top-N lists for every movie and every known user, scoring
+chunks in parallel worker processes, and writes them to a SQLite store that
+the API serves with a single lookup.
+
+Usage:
+    python -m backend.precompute [--top-n 50] [--workers 4] [--output PATH]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from backend import config
+from backend.utils.artifacts import source_fingerprint
+from backend.utils.catalog import MovieCatalog
+from backend.utils.precomputed import PrecomputedWriter
+from backend.models.recommender import (
+    content_recommender,
+    collaborative_recommender,
+    factorization_recommender,
+    initialize_models,
+    model_params
+)
+
+_RECOMMENDERS = {
+    'content': content_recommender,
+    'collaborative': collaborative_recommender,
+    'factorization': factorization_recommender
+}
+
+def _init_worker(arrays):
+    """
+    Pool initializer: restore the fitted models from the parent's arrays
+    once per worker process, so any start method works.
+    """
+    catalog = MovieCatalog.from_arrays(arrays['catalog'])
+    for kind, recommender in _RECOMMENDERS.items():
+        recommender.load_arrays(arrays[kind], catalog, source='precompute')
+
+def _rank_chunk(kind, keys, top_n):
+    """Score one chunk of keys in a worker."""
+    ranked = _RECOMMENDERS[kind].rank_many(keys, top_n)
+    return [
+        (key, result[0], result[1])
+        for key, result in zip(keys, ranked) if result is not None
+    ]
+
+def _chunks(keys, size):
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute top-N recommendation lists.")
+    parser.add_argument('--top-n', type=int, default=50, help="List length per movie/user")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=1024)
+    parser.add_argument('--output', default=config.PRECOMPUTED_PATH)
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    initialize_models(use_precomputed=False)
+    
+    keys = {
+        'content': content_recommender.movie_ids.tolist(),
+        'collaborative': collaborative_recommender.user_ids.tolist(),
+        'factorization': factorization_recommender.user_ids.tolist()
+    }
+    
+    writer = PrecomputedWriter(args.output, args.top_n, source_fingerprint(), model_params())
+    arrays = {kind: recommender.get_arrays() for kind, recommender in _RECOMMENDERS.items()}
+    arrays['catalog'] = content_recommender.catalog.get_arrays()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(arrays,)) as pool:
+        for kind, kind_keys in keys.items():
+            futures = [
+                pool.submit(_rank_chunk, kind, chunk, args.top_n)
+                for chunk in _chunks(kind_keys, args.chunk_size)
+            ]
+            for future in futures:
+                writer.write(kind, future.result())
+            print(f"Precomputed {len(kind_keys)} {kind} lists")
+    writer.close()
+    
+    print(f"Wrote {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Administrative API routes.
+Provides model reload control.
+"""
+
+from fastapi import APIRouter, Header, HTTPException
+from typing import Dict, Any, Optional
+from backend import config
+from backend.models.reloader import reloader
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+def _check_token(token):
+    if config.ADMIN_TOKEN is not None and token != config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.post("/reload", status_code=202)
+async def reload_models(
+    x_admin_token: Optional[str] = Header(None)
+) -> Dict[str, Any]:
+    """
+    Rebuild the recommendation models in the background.
+    
+    The running models keep serving requests until the new ones are
+    complete and swapped in. Progress is reported by /health.
+    
+    Args:
+        x_admin_token: Must match ADMIN_TOKEN when it is configured
+    
+    Returns:
+        Dictionary saying whether a reload was started
+    """
+    _check_token(x_admin_token)
+    
+    started = reloader.request_reload('admin request')
+    return {
+        "status": "started" if started else "already running",
+        "reload": reloader.status()
+    }
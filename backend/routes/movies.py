@@ -5,15 +5,38 @@ Provides endpoints for retrieving movie information.
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Dict, Any, Optional
-from backend.utils.preprocessing import load_movies_data
+from backend.utils.catalog import FIELDS, get_catalog, parse_fields
+from backend.utils.executor import run_scoring
+from backend.utils.serialization import RawJSONResponse, join_object, join_records
 
 router = APIRouter(prefix="/movies", tags=["Movies"])
 
+def _movie_fields(names):
+    """Parse a fields parameter, rejecting unknown names with a 422."""
+    try:
+        return parse_fields(names, FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _list_movies(limit, genre, min_rating, fields):
+    """
+    Answer a filtered listing from the catalog indexes as serialized
+    record fragments (None if no data).
+    """
+    catalog = get_catalog()
+    
+    if len(catalog) == 0:
+        return None
+    
+    top_indices = catalog.top_rated(limit, genre=genre, min_rating=min_rating)
+    return catalog.fragments(top_indices.tolist(), fields)
+
 @router.get("")
 async def get_movies(
     limit: int = Query(30, description="Number of movies to return", ge=1, le=100),
     genre: Optional[str] = Query(None, description="Filter by genre"),
-    min_rating: Optional[float] = Query(None, description="Minimum rating filter", ge=0, le=10)
+    min_rating: Optional[float] = Query(None, description="Minimum rating filter", ge=0, le=10),
+    fields: Optional[str] = Query(None, description="Comma-separated movie fields to return (default: all)")
 ) -> Dict[str, Any]:
     """
     Get a list of movies with optional filters.
@@ -22,87 +45,58 @@ async def get_movies(
         limit: Maximum number of movies to return
         genre: Filter movies by genre (case-insensitive)
         min_rating: Filter movies with rating >= min_rating
+        fields: Movie fields to return, e.g. movie_id,title,rating
     
     Returns:
         Dictionary with movie list and metadata
     """
+    fields = _movie_fields(fields)
     try:
-        movies_df = load_movies_data()
+        movies_list = await run_scoring(
+            ('movies', limit, genre, min_rating, fields),
+            _list_movies, limit, genre, min_rating, fields
+        )
         
-        if movies_df.empty:
+        if movies_list is None:
             raise HTTPException(status_code=500, detail="Movie data not available")
         
-        # Apply filters
-        filtered_df = movies_df.copy()
-        
-        if genre:
-            # Case-insensitive genre filtering
-            filtered_df = filtered_df[
-                filtered_df['genres'].str.contains(genre, case=False, na=False)
-            ]
-        
-        if min_rating is not None:
-            filtered_df = filtered_df[filtered_df['rating'] >= min_rating]
-        
-        # Sort by rating and limit results
-        filtered_df = filtered_df.nlargest(limit, 'rating')
-        
-        # Convert to list of dictionaries
-        movies_list = []
-        for _, movie in filtered_df.iterrows():
-            movies_list.append({
-                'movie_id': int(movie['movie_id']),
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'director': movie['director'],
-                'cast': movie['cast'],
-                'rating': float(movie['rating']),
-                'year': int(movie['year']),
-                'description': movie['description']
-            })
-        
-        return {
+        return RawJSONResponse(join_object({
             "count": len(movies_list),
-            "movies": movies_list,
+            "movies": join_records(movies_list),
             "filters": {
                 "genre": genre,
                 "min_rating": min_rating
             }
-        }
+        }))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/{movie_id}")
-async def get_movie_by_id(movie_id: int) -> Dict[str, Any]:
+async def get_movie_by_id(
+    movie_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated movie fields to return (default: all)")
+) -> Dict[str, Any]:
     """
     Get detailed information about a specific movie.
     
     Args:
         movie_id: The ID of the movie to retrieve
+        fields: Movie fields to return, e.g. title,description
     
     Returns:
         Dictionary with movie details
     """
+    fields = _movie_fields(fields)
     try:
-        movies_df = load_movies_data()
-        movie = movies_df[movies_df['movie_id'] == movie_id]
+        catalog = await run_scoring('catalog', get_catalog)
+        idx = catalog.position(movie_id)
         
-        if movie.empty:
+        if idx is None:
             raise HTTPException(status_code=404, detail=f"Movie with ID {movie_id} not found")
         
-        movie = movie.iloc[0]
-        return {
-            'movie_id': int(movie['movie_id']),
-            'title': movie['title'],
-            'genres': movie['genres'],
-            'director': movie['director'],
-            'cast': movie['cast'],
-            'rating': float(movie['rating']),
-            'year': int(movie['year']),
-            'description': movie['description']
-        }
+        return RawJSONResponse(catalog.record_json(idx, fields))
     
     except HTTPException:
         raise
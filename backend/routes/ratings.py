@@ -0,0 +1,92 @@
+"""
+API routes for rating ingestion.
+New ratings are saved to the ratings file and folded into the
+collaborative models without a full refit. Workers of backend/serve.py
+map the models read-only from shared memory, so there the ratings are
+only saved and the serving parent refits and publishes a new generation.
+"""
+
+import threading
+import pandas as pd
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any
+from backend import config
+from backend.models.recommender import collaborative_recommender, factorization_recommender
+from backend.models.reloader import reloader
+from backend.utils.executor import run_scoring
+from backend.utils.preprocessing import append_user_ratings
+
+router = APIRouter(prefix="/ratings", tags=["Ratings"])
+
+MAX_RATINGS = 10000
+
+# Keeps the file append and the model update in the same order
+_ingest_lock = threading.Lock()
+
+class Rating(BaseModel):
+    user_id: int
+    movie_id: int
+    rating: float = Field(..., gt=0)
+
+class RatingsRequest(BaseModel):
+    ratings: List[Rating]
+
+def _ingest(ratings_df):
+    with _ingest_lock:
+        append_user_ratings(ratings_df)
+        if config.SHARED_MODELS is not None:
+            # Every worker picks the ratings up with the parent's next generation
+            reloader.request_reload('ratings added')
+            return ratings_df['user_id'].nunique()
+        
+        users_updated = collaborative_recommender.add_ratings(ratings_df)
+        factorization_recommender.add_ratings(ratings_df)
+        # Already applied, so the file change must not trigger a refit
+        reloader.acknowledge()
+        return users_updated
+
+@router.post("")
+async def add_ratings(request: RatingsRequest) -> Dict[str, Any]:
+    """
+    Add new user ratings.
+    
+    Ratings are appended to user_ratings.csv and applied to the
+    collaborative models incrementally: only the rating rows, similarities
+    and factors of the users in the request are recomputed. A new rating
+    for a movie the user already rated replaces the old one.
+    
+    Under backend/serve.py the status is "pending": the ratings are
+    saved, and applied when the serving parent publishes the refitted
+    models to all workers.
+    
+    Args:
+        request: List of {user_id, movie_id, rating} entries
+    
+    Returns:
+        Dictionary with the number of ratings and users applied
+    """
+    if not request.ratings or len(request.ratings) > MAX_RATINGS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Request must contain between 1 and {MAX_RATINGS} ratings"
+        )
+    if collaborative_recommender.user_item_matrix is None:
+        raise HTTPException(status_code=503, detail="Collaborative model is not initialized")
+    
+    ratings_df = pd.DataFrame(
+        [(r.user_id, r.movie_id, r.rating) for r in request.ratings],
+        columns=['user_id', 'movie_id', 'rating']
+    )
+    
+    try:
+        users_updated = await run_scoring(None, _ingest, ratings_df)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "status": "ok" if config.SHARED_MODELS is None else "pending",
+        "count": len(ratings_df),
+        "users_updated": users_updated,
+        "model_version": collaborative_recommender.version
+    }
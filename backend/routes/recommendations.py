@@ -1,18 +1,96 @@
 """
 API routes for movie recommendations.
-Provides endpoints for content-based and collaborative filtering.
+Provides endpoints for content-based, collaborative and hybrid filtering.
 """
 
+import json
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any
-from backend.models.recommender import content_recommender, collaborative_recommender
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import List, Dict, Any, Literal, Optional
+from backend.models.recommender import (
+    content_recommender,
+    collaborative_recommender,
+    factorization_recommender,
+    hybrid_recommender,
+    hybrid_factorization_recommender
+)
+from backend.utils.catalog import SUMMARY_FIELDS, parse_fields
+from backend.utils.executor import run_scoring
+from backend.utils.serialization import RawJSONResponse, join_object
 
 router = APIRouter(prefix="/recommend", tags=["Recommendations"])
 
+# Batch requests are scored and streamed back this many ids at a time
+BATCH_CHUNK_SIZE = 256
+MAX_BATCH_SIZE = 100000
+MAX_LIMIT = 50
+
+# Models selectable with the collaborative endpoints' `model` parameter
+COLLABORATIVE_MODELS = {
+    'user-user': collaborative_recommender,
+    'als': factorization_recommender
+}
+CollaborativeModel = Literal['user-user', 'als']
+
+# Hybrid recommenders blending content similarity with each collaborative model
+HYBRID_MODELS = {
+    'user-user': hybrid_recommender,
+    'als': hybrid_factorization_recommender
+}
+
+class ContentBatchRequest(BaseModel):
+    movie_ids: List[int]
+    limit: int = 10
+    fields: Optional[List[str]] = None
+
+class CollaborativeBatchRequest(BaseModel):
+    user_ids: List[int]
+    limit: int = 10
+    model: CollaborativeModel = 'user-user'
+    fields: Optional[List[str]] = None
+
+def _movie_fields(names):
+    """Parse a fields parameter, rejecting unknown names with a 422."""
+    try:
+        return parse_fields(names, SUMMARY_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _validate_batch(ids, limit):
+    if not ids or len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch must contain between 1 and {MAX_BATCH_SIZE} ids"
+        )
+    if not 1 <= limit <= MAX_LIMIT:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {MAX_LIMIT}")
+
+def _ndjson_chunk(chunk, recommend_many, limit, fields, build_line):
+    """Score one chunk of ids and encode one JSON line per id."""
+    lines = [
+        json.dumps(build_line(item_id, recommendations), ensure_ascii=False) + "\n"
+        for item_id, recommendations in zip(chunk, recommend_many(chunk, limit, fields))
+    ]
+    return "".join(lines).encode("utf-8")
+
+async def _stream_ndjson(key, ids, recommend_many, limit, fields, build_line):
+    """
+    Score ids chunk by chunk on the scoring executor and yield one JSON
+    line per id. Identical chunks in flight are collapsed by key.
+    """
+    for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+        chunk = ids[start:start + BATCH_CHUNK_SIZE]
+        yield await run_scoring(
+            key + (tuple(chunk), limit, fields),
+            _ndjson_chunk, chunk, recommend_many, limit, fields, build_line
+        )
+
 @router.get("/content-based")
 async def get_content_based_recommendations(
     movie_id: int = Query(..., description="ID of the movie to base recommendations on"),
-    limit: int = Query(10, description="Number of recommendations to return", ge=1, le=50)
+    limit: int = Query(10, description="Number of recommendations to return", ge=1, le=50),
+    fields: Optional[str] = Query(None, description="Comma-separated movie fields of each recommendation (default: all but cast)")
 ) -> Dict[str, Any]:
     """
     Get movie recommendations using Content-Based Filtering.
@@ -23,25 +101,31 @@ async def get_content_based_recommendations(
     Args:
         movie_id: The movie ID to find similar movies for
         limit: Maximum number of recommendations to return
+        fields: Movie fields of each recommendation
     
     Returns:
         Dictionary with recommendations and metadata
     """
+    fields = _movie_fields(fields)
     try:
-        recommendations = content_recommender.recommend(movie_id, n_recommendations=limit)
+        count, recommendations = await run_scoring(
+            ('content-based', movie_id, limit, fields),
+            content_recommender.recommend_json, movie_id, n_recommendations=limit, fields=fields
+        )
         
-        if not recommendations:
+        if not count:
             raise HTTPException(
                 status_code=404,
                 detail=f"Movie with ID {movie_id} not found or no recommendations available"
             )
         
-        return {
+        # Movie records come pre-serialized from the catalog
+        return RawJSONResponse(join_object({
             "method": "content-based",
             "movie_id": movie_id,
-            "count": len(recommendations),
+            "count": count,
             "recommendations": recommendations
-        }
+        }))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -50,36 +134,189 @@ async def get_content_based_recommendations(
 @router.get("/collaborative")
 async def get_collaborative_recommendations(
     user_id: int = Query(..., description="ID of the user to recommend movies for"),
-    limit: int = Query(10, description="Number of recommendations to return", ge=1, le=50)
+    limit: int = Query(10, description="Number of recommendations to return", ge=1, le=50),
+    model: CollaborativeModel = Query("user-user", description="user-user similarity or als matrix factorization"),
+    genre: Optional[str] = Query(None, description="Genre hint for users without ratings"),
+    fields: Optional[str] = Query(None, description="Comma-separated movie fields of each recommendation (default: all but cast)")
 ) -> Dict[str, Any]:
     """
     Get movie recommendations using Collaborative Filtering.
     
     Recommends movies based on rating patterns of similar users.
-    Uses user-user similarity with cosine similarity on normalized ratings.
+    The default user-user model uses cosine similarity on normalized
+    ratings; model=als scores with matrix factorization factors instead.
     
     Args:
         user_id: The user ID to generate recommendations for
         limit: Maximum number of recommendations to return
+        model: Collaborative model to use
+        genre: Genre of the popular movies returned to users without ratings
+        fields: Movie fields of each recommendation
     
     Returns:
         Dictionary with recommendations and metadata
     """
+    fields = _movie_fields(fields)
     try:
-        recommendations = collaborative_recommender.recommend(user_id, n_recommendations=limit)
+        count, recommendations = await run_scoring(
+            ('collaborative', model, user_id, limit, genre, fields),
+            COLLABORATIVE_MODELS[model].recommend_json, user_id, n_recommendations=limit,
+            genre=genre, fields=fields
+        )
         
-        if not recommendations:
+        if not count:
             raise HTTPException(
                 status_code=404,
                 detail=f"No recommendations available for user {user_id}"
             )
         
-        return {
+        return RawJSONResponse(join_object({
             "method": "collaborative-filtering",
+            "model": model,
             "user_id": user_id,
-            "count": len(recommendations),
+            "count": count,
             "recommendations": recommendations
-        }
+        }))
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hybrid")
+async def get_hybrid_recommendations(
+    user_id: int = Query(..., description="ID of the user to recommend movies for"),
+    seed_movie_id: int = Query(..., description="ID of the movie the recommendations should resemble"),
+    alpha: float = Query(0.5, description="Weight of content similarity (1 = content only, 0 = collaborative only)", ge=0, le=1),
+    limit: int = Query(10, description="Number of recommendations to return", ge=1, le=50),
+    model: CollaborativeModel = Query("user-user", description="Collaborative model providing the predictions"),
+    fields: Optional[str] = Query(None, description="Comma-separated movie fields of each recommendation (default: all but cast)")
+) -> Dict[str, Any]:
+    """
+    Get movie recommendations blending Content-Based and Collaborative Filtering.
+    
+    Each movie is scored as alpha * its content similarity to the seed
+    movie plus (1 - alpha) * the user's predicted rating scaled to [0, 1],
+    in one pass over the catalog. Movies the user already rated are left
+    out; users without ratings get popularity in place of predictions.
+    
+    Args:
+        user_id: The user ID to generate recommendations for
+        seed_movie_id: The movie ID to find similar movies for
+        alpha: Weight of content similarity between 0 and 1
+        limit: Maximum number of recommendations to return
+        model: Collaborative model to blend with
+        fields: Movie fields of each recommendation
+    
+    Returns:
+        Dictionary with recommendations and metadata
+    """
+    fields = _movie_fields(fields)
+    try:
+        count, recommendations = await run_scoring(
+            ('hybrid', model, user_id, seed_movie_id, alpha, limit, fields),
+            HYBRID_MODELS[model].recommend_json, user_id, seed_movie_id,
+            n_recommendations=limit, alpha=alpha, fields=fields
+        )
+        
+        if not count:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Movie with ID {seed_movie_id} not found or no recommendations available"
+            )
+        
+        return RawJSONResponse(join_object({
+            "method": "hybrid",
+            "model": model,
+            "user_id": user_id,
+            "seed_movie_id": seed_movie_id,
+            "alpha": alpha,
+            "count": count,
+            "recommendations": recommendations
+        }))
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch/content-based")
+async def get_content_based_recommendations_batch(request: ContentBatchRequest):
+    """
+    Get content-based recommendations for many movies in one call.
+    
+    Movies are scored in blocks with one similarity slice and one
+    vectorized top-N per block. Results are streamed back as NDJSON, one
+    line per requested movie in request order, each shaped like the
+    /recommend/content-based response.
+    
+    Args:
+        request: movie_ids to recommend for, the per-movie limit and
+            optional movie fields
+    
+    Returns:
+        application/x-ndjson stream
+    """
+    _validate_batch(request.movie_ids, request.limit)
+    fields = _movie_fields(request.fields)
+    
+    def build_line(movie_id, recommendations):
+        line = {
+            "method": "content-based",
+            "movie_id": movie_id,
+            "count": len(recommendations),
+            "recommendations": recommendations
+        }
+        if not recommendations:
+            line["error"] = f"Movie with ID {movie_id} not found or no recommendations available"
+        return line
+    
+    return StreamingResponse(
+        _stream_ndjson(
+            ('batch/content-based',), request.movie_ids, content_recommender.recommend_many,
+            request.limit, fields, build_line
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.post("/batch/collaborative")
+async def get_collaborative_recommendations_batch(request: CollaborativeBatchRequest):
+    """
+    Get collaborative filtering recommendations for many users in one call.
+    
+    Users are scored in blocks with sparse matrix products over the rating
+    matrix (or factor products for model=als). Results are streamed back
+    as NDJSON, one line per requested user in request order, each shaped
+    like the /recommend/collaborative response.
+    
+    Args:
+        request: user_ids to recommend for, the per-user limit, the model
+            and optional movie fields
+    
+    Returns:
+        application/x-ndjson stream
+    """
+    _validate_batch(request.user_ids, request.limit)
+    fields = _movie_fields(request.fields)
+    
+    def build_line(user_id, recommendations):
+        line = {
+            "method": "collaborative-filtering",
+            "model": request.model,
+            "user_id": user_id,
+            "count": len(recommendations),
+            "recommendations": recommendations
+        }
+        if not recommendations:
+            line["error"] = f"No recommendations available for user {user_id}"
+        return line
+    
+    return StreamingResponse(
+        _stream_ndjson(
+            ('batch/collaborative', request.model), request.user_ids,
+            COLLABORATIVE_MODELS[request.model].recommend_many,
+            request.limit, fields, build_line
+        ),
+        media_type="application/x-ndjson"
+    )
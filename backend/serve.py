@@ -0,0 +1,122 @@
+"""
+Multi-worker serving with the models in shared memory.
+The parent process fits (or loads) the models once, copies their arrays
+into shared memory segments (see backend/utils/shared_models.py) and
+starts the uvicorn workers, which map those segments instead of holding
+a copy of the models each. The parent watches the data files and reload
+requests from the workers, and publishes every refit as a new generation
+that the workers swap in without restarting.
+
+Usage:
+    python -m backend.serve [--workers N] [--host HOST] [--port PORT]
+"""
+
+import argparse
+import os
+import time
+import uvicorn
+from backend import config
+from backend.models.recommender import (
+    content_recommender,
+    collaborative_recommender,
+    factorization_recommender,
+    initialize_models
+)
+from backend.models.reloader import ModelReloader
+from backend.utils.catalog import get_catalog
+from backend.utils.shared_models import SharedModelStore
+
+class PublishingReloader(ModelReloader):
+    """
+    Reloader of the serving parent: refits the models and publishes them
+    as the next generation of the shared store.
+    
+    Every POST /ratings in a worker appends to the ratings file and asks
+    for a reload, so a refit only starts once the first pending request or
+    data change is delay seconds old: a burst of requests is served by a
+    single refit instead of one each.
+    
+    Args:
+        store: SharedModelStore created by this process
+        interval: Seconds between checks for data changes and reload requests
+        delay: Seconds to wait after the first pending request before refitting
+    """
+    
+    def __init__(self, store, interval, delay=0):
+        super().__init__(interval)
+        self.store = store
+        self.delay = delay
+        self._catalog = None
+        self._pending_since = None
+    
+    def _changed(self):
+        reason = self._pending_reason()
+        if reason is None:
+            return None
+        
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if now - self._pending_since < self.delay:
+            return None
+        return reason
+    
+    def _pending_reason(self):
+        if self.store.reload_requested():
+            return 'reload requested by a worker'
+        # RELOAD_INTERVAL_SECONDS = 0 turns data file watching off here too
+        if config.RELOAD_INTERVAL_SECONDS > 0:
+            return super()._changed()
+        return None
+    
+    def load(self):
+        # Cleared first so requests arriving during the refit trigger another
+        # (after the delay again)
+        self.store.clear_reload_request()
+        self._pending_since = None
+        initialize_models(use_precomputed=False)
+        
+        started = time.perf_counter()
+        catalog = get_catalog()
+        generation = self.store.publish(
+            {
+                'catalog': catalog.get_arrays(),
+                'content': content_recommender.get_arrays(),
+                'collaborative': collaborative_recommender.get_arrays(),
+                'factorization': factorization_recommender.get_arrays()
+            },
+            unchanged=('catalog',) if catalog is self._catalog else ()
+        )
+        self._catalog = catalog
+        
+        # Point the parent's models at the segments too, so its fitted
+        # copies are freed
+        _, arrays = self.store.read()
+        initialize_models(use_precomputed=False, arrays=arrays)
+        
+        status = self.store.status()
+        print(f"Published model generation {generation} "
+              f"({status['bytes'] / 2**20:.1f} MiB) in {time.perf_counter() - started:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from several workers sharing one copy of the models.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    
+    store = SharedModelStore.create()
+    reloader = PublishingReloader(store, config.SHARED_POLL_SECONDS, config.SHARED_RELOAD_DELAY_SECONDS)
+    try:
+        reloader.load()
+        reloader.start()
+        
+        # Read by backend/config.py in the (spawned) workers
+        os.environ['SHARED_MODELS'] = store.name
+        uvicorn.run('backend.main:app', host=args.host, port=args.port, workers=args.workers)
+    finally:
+        reloader.stop()
+        store.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Regression tests for the vectorized collaborative filtering predictions.
+The reference is the original per-user loop: for every movie the user
+hasn't rated, a similarity-weighted average over the users who rated it.
+GOLDEN_RECOMMENDATIONS pins that loop's output on a fixed fixture.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from backend.models.recommender import CollaborativeFilteringRecommender
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+N_MOVIES = 120
+N_USERS = 80
+
+@pytest.fixture(scope='module')
+def dataset():
+    catalog = MovieCatalog(generate_movies(N_MOVIES, seed=3))
+    ratings_df = generate_ratings(N_USERS, N_MOVIES, ratings_per_user=15, seed=3)
+    return catalog, ratings_df
+
+def loop_predictions(model, user_idx):
+    """Baseline predictions with the original loop over movies and raters."""
+    state = model._state
+    ratings = state.user_item_matrix.toarray()
+    
+    if state.neighbor_indices is not None:
+        user_similarities = np.zeros(ratings.shape[0])
+        user_similarities[state.neighbor_indices[user_idx]] = state.neighbor_scores[user_idx]
+    else:
+        user_similarities = state.user_similarity_matrix[user_idx]
+    
+    predicted = np.full(ratings.shape[1], np.nan)
+    for movie in np.flatnonzero(ratings[user_idx] == 0):
+        weighted_sum = 0.0
+        similarity_sum = 0.0
+        for other in np.flatnonzero(ratings[:, movie] > 0):
+            # In neighbour mode only the user's neighbours contribute
+            if state.neighbor_indices is not None and other not in state.neighbor_indices[user_idx]:
+                continue
+            weighted_sum += user_similarities[other] * ratings[other, movie]
+            similarity_sum += abs(user_similarities[other])
+        
+        if similarity_sum > 0:
+            predicted[movie] = weighted_sum / similarity_sum
+    return predicted
+
+@pytest.mark.parametrize('n_neighbors', [None, 10])
+def test_predict_ratings_matches_loop(dataset, n_neighbors):
+    catalog, ratings_df = dataset
+    model = CollaborativeFilteringRecommender(n_neighbors=n_neighbors)
+    model.fit(catalog, ratings_df)
+    
+    for user_idx in range(0, N_USERS, 7):
+        expected = loop_predictions(model, user_idx)
+        actual = model.predict_ratings(user_idx)
+        assert np.isfinite(expected).any()
+        assert np.allclose(actual, expected, equal_nan=True)
+
+# Fixed fixture: (user_id, movie_id, rating)
+GOLDEN_RATINGS = [
+    (1, 1, 5.0), (1, 2, 3.0), (1, 4, 4.0), (1, 7, 1.0),
+    (2, 1, 4.0), (2, 3, 2.0), (2, 4, 5.0), (2, 5, 3.5), (2, 8, 1.5),
+    (3, 2, 2.0), (3, 3, 4.5), (3, 5, 4.0), (3, 6, 3.0),
+    (4, 1, 3.5), (4, 2, 4.5), (4, 6, 2.5), (4, 7, 4.0), (4, 8, 5.0),
+    (5, 3, 1.0), (5, 4, 3.0), (5, 5, 5.0), (5, 7, 2.0),
+    (6, 1, 2.0), (6, 5, 4.5), (6, 6, 5.0), (6, 8, 3.0)
+]
+
+# (movie_id, predicted_rating) lists returned by recommend() of the
+# DataFrame implementation in the baseline commit (45f2597) on
+# GOLDEN_RATINGS, given the user similarities of the sparse pipeline
+# (ratings centered over observed entries only, see normalize_ratings())
+GOLDEN_RECOMMENDATIONS = {
+    1: [(3, 1.89456841), (5, 0.6285295), (8, -1.8256118), (6, -3.53429868)],
+    2: [(7, -0.45716778), (2, -1.32598431), (6, -2.62771852)],
+    3: [(7, -1.92061751), (1, -2.25419842), (8, -2.35037301), (4, -2.99092564)],
+    4: [(3, -2.38780508), (5, -4.03214606), (4, -4.63955576)],
+    5: [(1, 3.49972667), (6, 2.72270682), (8, 1.99641262), (2, 1.18069068)],
+    6: [(3, 1.0950533), (4, -1.10380733), (7, -1.40197106), (2, -3.72527187)]
+}
+
+def test_recommend_matches_baseline_golden():
+    ratings_df = pd.DataFrame(GOLDEN_RATINGS, columns=['user_id', 'movie_id', 'rating'])
+    model = CollaborativeFilteringRecommender()
+    model.fit(MovieCatalog(generate_movies(8, seed=1)), ratings_df)
+    
+    for user_id, expected in GOLDEN_RECOMMENDATIONS.items():
+        recommendations = model.recommend(user_id, n_recommendations=10)
+        assert [r['movie_id'] for r in recommendations] == [movie_id for movie_id, _ in expected]
+        assert np.allclose([r['predicted_rating'] for r in recommendations],
+                           [predicted for _, predicted in expected])
+
+def split_ratings(ratings_df):
+    """Initial ratings and a batch with new users, new ratings and replacements."""
+    new_users = ratings_df['user_id'] > N_USERS - 10
+    added = ratings_df[~new_users].sample(40, random_state=3)
+    initial = ratings_df[~new_users].drop(added.index)
+    replaced = initial.sample(20, random_state=4).assign(rating=lambda df: 6 - df['rating'])
+    batch = pd.concat([added, replaced, ratings_df[new_users]])
+    final = pd.concat([initial, batch]).drop_duplicates(subset=['user_id', 'movie_id'], keep='last')
+    return initial, batch, final
+
+def by_id(model, user_ids):
+    return np.array([model.user_position(user_id) for user_id in user_ids])
+
+@pytest.mark.parametrize('n_neighbors', [None, 10])
+def test_add_ratings_matches_refit(dataset, n_neighbors):
+    catalog, ratings_df = dataset
+    initial, batch, final = split_ratings(ratings_df)
+    
+    model = CollaborativeFilteringRecommender(n_neighbors=n_neighbors)
+    model.fit(catalog, initial)
+    model.add_ratings(batch.iloc[:30])
+    model.add_ratings(batch.iloc[30:])
+    refit = CollaborativeFilteringRecommender(n_neighbors=n_neighbors)
+    refit.fit(catalog, final)
+    
+    user_ids = refit.user_ids
+    rows = by_id(model, user_ids)
+    columns = np.array([np.flatnonzero(model.movie_ids == movie_id)[0] for movie_id in refit.movie_ids])
+    assert (rows >= 0).all()
+    assert np.array_equal(model.user_item_matrix[rows][:, columns].toarray(), refit.user_item_matrix.toarray())
+    assert np.allclose(model.user_means[rows], refit.user_means)
+    assert np.allclose(model._state.user_norms()[rows], refit._state.user_norms())
+    assert model._state.rating_range == refit._state.rating_range
+    
+    if n_neighbors is None:
+        assert np.allclose(model.user_similarity_matrix.toarray()[np.ix_(rows, rows)], refit.user_similarity_matrix.toarray())
+    else:
+        # Users changed by the last update get exact lists; the others may drift
+        changed = np.flatnonzero(np.isin(user_ids, batch.iloc[30:]['user_id']))
+        assert np.allclose(model.neighbor_scores[rows[changed]], refit.neighbor_scores[changed])
+
+def test_add_ratings_leaves_served_snapshot_unchanged(dataset):
+    catalog, ratings_df = dataset
+    initial, batch, _ = split_ratings(ratings_df)
+    model = CollaborativeFilteringRecommender()
+    model.fit(catalog, initial)
+    
+    served = model._state
+    similarities = served.user_similarity_matrix.toarray().copy()
+    for start in range(0, len(batch), 10):
+        model.add_ratings(batch.iloc[start:start + 10])
+    
+    assert model._state is not served
+    assert np.array_equal(served.user_similarity_matrix.toarray(), similarities)
@@ -0,0 +1,86 @@
+"""
+Tests for incremental catalog updates of the content-based model.
+add_movies() keeps the fitted TF-IDF vocabulary and weights, so the
+reference is a full similarity computation over the extended catalog with
+that same vectorizer (or a plain fit() when the model refits).
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+from backend.models.recommender import ContentBasedRecommender
+from backend.utils.catalog import MovieCatalog
+from backend.utils.preprocessing import transform_content_features
+from benchmarks.synthetic import generate_movies
+
+N_MOVIES = 100
+CONTENT_FIELDS = ['genres', 'director', 'cast']
+
+@pytest.fixture(scope='module')
+def movies():
+    """Initial catalog rows and a batch of new and replaced movies."""
+    movies_df = generate_movies(N_MOVIES + 10, seed=5)
+    initial = movies_df.iloc[:N_MOVIES]
+    replaced = initial.iloc[[3, 40]].assign(genres='Drama|Crime', director='Director7')
+    return initial, pd.concat([replaced, movies_df.iloc[N_MOVIES:]])
+
+def expected_rankings(model, catalog, n):
+    """Top-n lists from an exact similarity matrix with the model's vectorizer."""
+    features = transform_content_features(catalog.frame(CONTENT_FIELDS), model.vectorizer)
+    similarities = cosine_similarity(features)
+    np.fill_diagonal(similarities, -np.inf)
+    return similarities, np.argsort(-similarities, axis=1, kind='stable')[:, :n]
+
+@pytest.mark.parametrize('top_k', [None, 10])
+def test_add_movies_matches_full_similarities(movies, top_k):
+    initial, batch = movies
+    model = ContentBasedRecommender(top_k=top_k)
+    model.fit(MovieCatalog(initial))
+    model.add_movies(batch.iloc[:4])
+    model.add_movies(batch.iloc[4:])
+
+    catalog = model.catalog
+    assert len(catalog) == N_MOVIES + 10
+    similarities, expected = expected_rankings(model, catalog, 10)
+
+    if top_k is None:
+        assert np.allclose(model.similarity_matrix.toarray()[~np.eye(len(catalog), dtype=bool)],
+                           similarities[~np.eye(len(catalog), dtype=bool)])
+        rows = range(len(catalog))
+    else:
+        # Movies changed by the last update get exact lists; the others may drift
+        rows = [catalog.position(movie_id) for movie_id in batch.iloc[4:]['movie_id']]
+
+    for idx in rows:
+        top_indices, top_scores = model.rank(int(catalog.movie_ids[idx]), 10)
+        assert np.allclose(top_scores, similarities[idx, expected[idx]])
+
+def test_add_movies_refit_matches_fit(movies):
+    initial, batch = movies
+    model = ContentBasedRecommender(refit_ratio=0.0)
+    model.fit(MovieCatalog(initial))
+    model.add_movies(batch)
+
+    refit = ContentBasedRecommender()
+    refit.fit(model.catalog)
+    for movie_id in model.catalog.movie_ids[::7]:
+        indices, scores = model.rank(int(movie_id), 10)
+        expected_indices, expected_scores = refit.rank(int(movie_id), 10)
+        assert np.array_equal(indices, expected_indices)
+        assert np.allclose(scores, expected_scores)
+
+def test_add_movies_leaves_served_snapshot_unchanged(movies):
+    initial, batch = movies
+    model = ContentBasedRecommender()
+    model.fit(MovieCatalog(initial))
+
+    served = model._state
+    similarities = served.similarity_matrix.toarray().copy()
+    model.add_movies(batch)
+
+    assert model._state is not served
+    assert np.array_equal(served.similarity_matrix.toarray(), similarities)
@@ -0,0 +1,92 @@
+"""
+Tests for the offline evaluation harness (benchmarks/evaluate.py): the
+fold and hold-out assignment, the ranking metrics on a hand-checked
+example, and fold results computed in spawned workers matching the same
+fold evaluated in-process.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks import evaluate
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+def test_assign_folds_holds_out_newest_ratings():
+    counts = {1: 10, 2: 4, 3: 2, 4: 7, 5: 12, 6: 5}
+    rows = [(user_id, movie_id, timestamp)
+            for user_id, count in counts.items()
+            for movie_id, timestamp in zip(range(count), np.random.default_rng(user_id).permutation(count))]
+    ratings_df = pd.DataFrame(rows, columns=['user_id', 'movie_id', 'timestamp']).assign(rating=3.0)
+    
+    folds, held_out = evaluate.assign_folds(ratings_df, n_folds=2, holdout=0.25, min_ratings=4, seed=0)
+    
+    for user_id, count in counts.items():
+        rows = (ratings_df['user_id'] == user_id).to_numpy()
+        user_folds = np.unique(folds[rows])
+        assert len(user_folds) == 1
+        if count < 4:
+            assert user_folds[0] == -1
+            continue
+        assert user_folds[0] in (0, 1)
+        
+        # round(count * holdout) ratings, at least one and never all,
+        # taken newest first
+        n_holdout = min(max(round(count * 0.25), 1), count - 1)
+        timestamps = ratings_df['timestamp'].to_numpy()[rows]
+        assert held_out[rows].sum() == n_holdout
+        assert set(timestamps[held_out[rows]]) == set(np.sort(timestamps)[::-1][:n_holdout])
+    
+    # Eligible users are spread evenly over the folds
+    fold_sizes = np.bincount([folds[(ratings_df['user_id'] == user_id).to_numpy()][0]
+                              for user_id, count in counts.items() if count >= 4])
+    assert sorted(fold_sizes.tolist()) == [2, 3]
+
+def test_ranking_metrics_hand_checked():
+    catalog = MovieCatalog(generate_movies(10, seed=1))
+    users = np.array([1, 2, 3])
+    ranked = [
+        (np.array([catalog.position(4), catalog.position(7), catalog.position(2)]), None),
+        (np.array([catalog.position(5), catalog.position(6)]), None),
+        None
+    ]
+    test_df = pd.DataFrame(
+        [(1, 7, 5.0), (1, 9, 4.0), (1, 2, 3.0), (2, 5, 4.5), (3, 1, 5.0)],
+        columns=['user_id', 'movie_id', 'rating']
+    )
+    
+    result = evaluate.ranking_metrics(catalog, users, ranked, test_df, k=3, relevant_rating=4.0)
+    
+    # User 1: relevant {7, 9}, hit at rank 2; user 2: relevant {5}, hit at
+    # rank 1; user 3: relevant {1}, no list
+    discounts = 1 / np.log2(np.arange(2, 5))
+    assert result['users'] == 3
+    assert result['precision'] == pytest.approx(np.mean([1 / 3, 1 / 3, 0]))
+    assert result['recall'] == pytest.approx(np.mean([1 / 2, 1, 0]))
+    assert result['ndcg'] == pytest.approx(np.mean([discounts[1] / discounts[:2].sum(), 1, 0]))
+
+def test_spawned_workers_match_in_process_folds():
+    catalog = MovieCatalog(generate_movies(80, seed=4))
+    ratings_df = generate_ratings(60, 80, ratings_per_user=15, seed=4)
+    folds, held_out = evaluate.assign_folds(ratings_df, 3, 0.2, 5, seed=4)
+    args = argparse.Namespace(k=10, relevant=4.0, neighbors=10, factors=8, iterations=5)
+    initargs = (catalog.get_arrays(), ratings_df, folds, held_out)
+    
+    evaluate._init_worker(*initargs)
+    expected = {name: evaluate.evaluate_fold(name, 1, args) for name in evaluate.MODELS}
+    
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=evaluate._init_worker, initargs=initargs) as pool:
+        futures = {name: pool.submit(evaluate.evaluate_fold, name, 1, args) for name in evaluate.MODELS}
+        results = {name: future.result() for name, future in futures.items()}
+    
+    for name in evaluate.MODELS:
+        assert results[name]['users'] > 0
+        for key in ('users', 'precision', 'recall', 'ndcg', 'rmse', 'coverage'):
+            assert results[name][key] == pytest.approx(expected[name][key], nan_ok=True)
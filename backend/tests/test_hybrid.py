@@ -0,0 +1,120 @@
+"""
+Tests for the hybrid recommender's blended score.
+The reference is computed from the component models' public outputs:
+alpha * exact cosine similarity to the seed movie plus (1 - alpha) *
+the predicted rating scaled to [0, 1] with the observed rating range,
+over the movies the user hasn't rated.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+from backend.models.recommender import (
+    CollaborativeFilteringRecommender,
+    ContentBasedRecommender,
+    HybridRecommender,
+    MatrixFactorizationRecommender
+)
+from backend.utils.catalog import MovieCatalog
+from backend.utils.preprocessing import transform_content_features
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+N_MOVIES = 150
+N_USERS = 60
+CONTENT_FIELDS = ['genres', 'director', 'cast']
+
+@pytest.fixture(scope='module')
+def dataset():
+    catalog = MovieCatalog(generate_movies(N_MOVIES, seed=11))
+    ratings_df = generate_ratings(N_USERS, N_MOVIES, ratings_per_user=20, seed=11)
+    return catalog, ratings_df
+
+def build_hybrid(dataset, collaborative_class, top_k=None):
+    catalog, ratings_df = dataset
+    content = ContentBasedRecommender(top_k=top_k)
+    content.fit(catalog)
+    collaborative = collaborative_class()
+    collaborative.fit(catalog, ratings_df)
+    hybrid = HybridRecommender(content, collaborative)
+    hybrid.cache = None
+    return hybrid
+
+def content_similarities(model, seed_idx):
+    catalog = model.catalog
+    features = transform_content_features(catalog.frame(CONTENT_FIELDS), model.vectorizer)
+    return cosine_similarity(features[seed_idx], features).ravel()
+
+def expected_scores(hybrid, user_id, seed_idx, alpha):
+    """Blended score of every catalog movie (-inf for excluded movies)."""
+    catalog = hybrid.content_model.catalog
+    state = hybrid.collaborative_model._state
+    low, high = state.rating_range
+    
+    preference = np.zeros(len(catalog))
+    excluded = np.zeros(len(catalog), dtype=bool)
+    user_idx = state.user_position(user_id)
+    predicted = hybrid.collaborative_model.predict_ratings(user_idx)
+    for column, movie_id in enumerate(state.movie_ids):
+        idx = catalog.position(int(movie_id))
+        if state.user_item_matrix[user_idx, column] != 0:
+            excluded[idx] = True
+        elif not np.isnan(predicted[column]):
+            preference[idx] = min(max((predicted[column] - low) / (high - low), 0.0), 1.0)
+    
+    scores = alpha * content_similarities(hybrid.content_model, seed_idx) + (1 - alpha) * preference
+    scores[excluded] = -np.inf
+    scores[seed_idx] = -np.inf
+    return scores
+
+def assert_ranked(hybrid, user_id, seed_movie_id, alpha, expected, n=10):
+    indices, scores = hybrid.rank(user_id, seed_movie_id, n, alpha)
+    assert len(indices) == n
+    assert np.isfinite(scores).all()
+    assert np.all(np.diff(scores) <= 1e-12)
+    assert np.allclose(scores, expected[indices])
+    assert np.allclose(scores, np.sort(expected)[::-1][:n])
+
+@pytest.mark.parametrize('collaborative_class', [CollaborativeFilteringRecommender, MatrixFactorizationRecommender])
+@pytest.mark.parametrize('top_k', [None, 10])
+@pytest.mark.parametrize('alpha', [0.0, 0.3, 1.0])
+def test_hybrid_blends_similarity_and_predictions(dataset, collaborative_class, top_k, alpha):
+    hybrid = build_hybrid(dataset, collaborative_class, top_k)
+    catalog = hybrid.content_model.catalog
+    
+    for user_id, seed_movie_id in [(1, 5), (17, 42), (N_USERS, 120)]:
+        seed_idx = catalog.position(seed_movie_id)
+        expected = expected_scores(hybrid, user_id, seed_idx, alpha)
+        assert_ranked(hybrid, user_id, seed_movie_id, alpha, expected)
+
+@pytest.mark.parametrize('collaborative_class', [CollaborativeFilteringRecommender, MatrixFactorizationRecommender])
+def test_hybrid_cold_start_uses_popularity(dataset, collaborative_class):
+    hybrid = build_hybrid(dataset, collaborative_class)
+    catalog = hybrid.content_model.catalog
+    state = hybrid.collaborative_model._state
+    low, high = state.rating_range
+    seed_idx = catalog.position(5)
+    
+    # Unknown users get scaled popularity in place of predictions, and
+    # nothing but the seed movie is left out
+    popularity = np.clip((state.popularity(hybrid.collaborative_model.popularity_prior).scores - low) / (high - low), 0, 1)
+    alpha = 0.4
+    expected = alpha * content_similarities(hybrid.content_model, seed_idx) + (1 - alpha) * popularity
+    expected[seed_idx] = -np.inf
+    assert_ranked(hybrid, 10**6, 5, alpha, expected)
+    
+    # With alpha = 0 the ranking follows the collaborative model's
+    # cold-start list (compared by score, as popularity ties may reorder)
+    _, scores = hybrid.rank(10**6, 5, 10, 0.0)
+    popular = [movie['movie_id'] for movie in hybrid.collaborative_model.recommend(10**6, 11)]
+    positions = [catalog.position(movie_id) for movie_id in popular if movie_id != 5][:10]
+    assert np.allclose(scores, popularity[positions])
+
+def test_hybrid_unknown_seed_and_invalid_alpha(dataset):
+    hybrid = build_hybrid(dataset, CollaborativeFilteringRecommender)
+    indices, scores = hybrid.rank(1, 10**6, 10)
+    assert len(indices) == 0 and len(scores) == 0
+    with pytest.raises(ValueError):
+        hybrid.rank(1, 5, 10, alpha=1.5)
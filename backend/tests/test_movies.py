@@ -0,0 +1,73 @@
+"""
+Tests for fields= projection on the /movies endpoints.
+Responses are assembled from the catalog's pre-encoded field slices; the
+reference is the source DataFrame row restricted to the selected fields.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.routes import movies as movies_routes
+from backend.utils.catalog import FIELDS, MovieCatalog
+from benchmarks.synthetic import generate_movies
+
+@pytest.fixture(scope='module')
+def movies_df():
+    movies_df = generate_movies(40, seed=8)
+    # Values that need escaping in JSON
+    movies_df.loc[0, 'title'] = 'Amélie "Le" Film'
+    movies_df.loc[1, 'description'] = 'Line one\nLine two\t\\ end'
+    return movies_df
+
+@pytest.fixture
+def client(movies_df, monkeypatch):
+    catalog = MovieCatalog(movies_df)
+    monkeypatch.setattr(movies_routes, 'get_catalog', lambda: catalog)
+    app = FastAPI()
+    app.include_router(movies_routes.router)
+    return TestClient(app)
+
+def expected_record(movies_df, movie_id, fields):
+    row = movies_df[movies_df['movie_id'] == movie_id].iloc[0]
+    return {field: row[field].item() if hasattr(row[field], 'item') else row[field] for field in fields}
+
+@pytest.mark.parametrize('fields, expected_fields', [
+    (None, FIELDS),
+    ('title,rating', ('title', 'rating')),
+    ('rating, movie_id,rating', ('movie_id', 'rating')),
+    ('description,cast,year,genres,director,title,movie_id,rating', FIELDS)
+])
+def test_movies_fields_projection(client, movies_df, fields, expected_fields):
+    params = {'limit': 20, 'genre': 'drama'}
+    if fields is not None:
+        params['fields'] = fields
+    response = client.get('/movies', params=params)
+    assert response.status_code == 200
+    
+    full = client.get('/movies', params={'limit': 20, 'genre': 'drama'}).json()['movies']
+    movies = response.json()['movies']
+    assert len(movies) == len(full) > 0
+    for movie, full_movie in zip(movies, full):
+        # Keys come back in FIELDS order whatever order was requested
+        assert tuple(movie) == expected_fields
+        assert movie == {field: full_movie[field] for field in expected_fields}
+        assert full_movie == expected_record(movies_df, full_movie['movie_id'], FIELDS)
+
+@pytest.mark.parametrize('movie_id', [1, 2, 17])
+def test_movie_by_id_fields_projection(client, movies_df, movie_id):
+    response = client.get(f'/movies/{movie_id}', params={'fields': 'description,title'})
+    assert response.status_code == 200
+    assert list(response.json()) == ['title', 'description']
+    assert response.json() == expected_record(movies_df, movie_id, ['title', 'description'])
+    
+    response = client.get(f'/movies/{movie_id}')
+    assert response.json() == expected_record(movies_df, movie_id, FIELDS)
+
+def test_movies_unknown_field_is_rejected(client):
+    response = client.get('/movies', params={'fields': 'title,budget'})
+    assert response.status_code == 422
+    assert 'budget' in response.json()['detail']
+    assert client.get('/movies/1', params={'fields': 'poster'}).status_code == 422
@@ -0,0 +1,81 @@
+"""
+Tests for the streamed ratings loader.
+load_ratings_matrix() reads the ratings file in chunks (or from the
+columnar user_ratings.npz) and must build the same matrix and id maps as
+create_user_item_matrix() on a DataFrame of the whole file.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from backend.utils import preprocessing
+from backend.utils.preprocessing import create_user_item_matrix, load_ratings_matrix, save_ratings_npz
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessing, 'get_data_path', lambda filename: str(tmp_path / filename))
+    return tmp_path
+
+def write_ratings(data_dir, user_ids, movie_ids, seed):
+    """Ratings CSV with half-star values, duplicate pairs and blank fields."""
+    rng = np.random.default_rng(seed)
+    n = 400
+    ratings_df = pd.DataFrame({
+        'user_id': rng.choice(user_ids, n),
+        'movie_id': rng.choice(movie_ids, n),
+        'rating': rng.integers(1, 11, n) / 2,
+        'timestamp': rng.integers(0, 10**9, n)
+    })
+    ratings_df = pd.concat([ratings_df, ratings_df.iloc[:25].assign(rating=5.0)])
+    ratings_df.to_csv(data_dir / 'user_ratings.csv', index=False)
+    with open(data_dir / 'user_ratings.csv', 'a') as f:
+        f.write(f"{user_ids[0]},,4.0,0\n,{movie_ids[0]},3.0,0\n{user_ids[1]},{movie_ids[1]},,0\n")
+
+def assert_matches_dataframe(data_dir, loaded):
+    expected_matrix, expected_users, expected_movies = create_user_item_matrix(
+        pd.read_csv(data_dir / 'user_ratings.csv')
+    )
+    user_item_matrix, user_ids, movie_ids = loaded
+    assert np.array_equal(user_ids, expected_users)
+    assert np.array_equal(movie_ids, expected_movies)
+    assert user_item_matrix.dtype == np.float64
+    assert user_item_matrix.shape == expected_matrix.shape
+    assert np.array_equal(user_item_matrix.toarray(), expected_matrix.toarray())
+
+@pytest.mark.parametrize('chunk_size', [7, 64, 10**6])
+@pytest.mark.parametrize('id_spacing', [1, 100003])
+def test_chunked_csv_matches_dataframe(data_dir, chunk_size, id_spacing):
+    # Spaced ids skip the dense lookup tables and go through sorting
+    user_ids = np.arange(1, 41) * id_spacing
+    movie_ids = np.arange(5, 65) * id_spacing
+    write_ratings(data_dir, user_ids, movie_ids, seed=id_spacing)
+    
+    assert_matches_dataframe(data_dir, load_ratings_matrix(chunk_size=chunk_size))
+
+def test_npz_matches_dataframe(data_dir):
+    write_ratings(data_dir, np.arange(1, 41), np.arange(5, 65), seed=2)
+    written = save_ratings_npz(chunk_size=50)
+    assert written == len(pd.read_csv(data_dir / 'user_ratings.csv').dropna(subset=['user_id', 'movie_id', 'rating']))
+    assert preprocessing._ratings_source() == str(data_dir / 'user_ratings.npz')
+    
+    assert_matches_dataframe(data_dir, load_ratings_matrix())
+
+def test_stale_npz_is_ignored(data_dir):
+    write_ratings(data_dir, np.arange(1, 41), np.arange(5, 65), seed=3)
+    save_ratings_npz()
+    # The CSV changed after the conversion
+    write_ratings(data_dir, np.arange(1, 31), np.arange(5, 45), seed=4)
+    csv_mtime = os.path.getmtime(data_dir / 'user_ratings.csv')
+    os.utime(data_dir / 'user_ratings.npz', (csv_mtime - 10, csv_mtime - 10))
+    assert preprocessing._ratings_source() == str(data_dir / 'user_ratings.csv')
+    
+    assert_matches_dataframe(data_dir, load_ratings_matrix(chunk_size=64))
+
+def test_missing_ratings_file(data_dir):
+    user_item_matrix, user_ids, movie_ids = load_ratings_matrix()
+    assert user_item_matrix.shape == (0, 0)
+    assert len(user_ids) == 0 and len(movie_ids) == 0
@@ -0,0 +1,256 @@
+"""
+Approximate nearest-neighbour search for content similarity.
+An inverted-file (IVF) index over a truncated-SVD embedding of the content
+feature matrix: movies are clustered into lists, a query only scans the
+lists whose centroids are closest to it, and the best candidates by
+embedding similarity are re-scored with exact cosine similarity on the
+original features.
+"""
+
+import copy
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+class IVFIndex:
+    """
+    Inverted-file cosine index built with NumPy only.
+
+    Query cost is O(n_lists + N * n_probe / n_lists) instead of O(N), so
+    with the default n_lists ~ 4 * sqrt(N) it grows with sqrt(N).
+    n_probe and refine trade recall for speed; n_components, n_iter and
+    sample_size trade embedding and clustering quality for build time.
+
+    Args:
+        n_lists: Number of clusters (None = 4 * sqrt(N))
+        n_probe: Clusters scanned per query
+        refine: Shortlist re-scored exactly, as a multiple of K (None =
+            score every candidate exactly, best for very sparse features)
+        n_components: Dimensions of the SVD embedding used for clustering
+        n_iter: k-means iterations
+        sample_size: Rows used to train the k-means centroids
+        block_size: Rows assigned to clusters per block
+        seed: Random seed
+    """
+
+    def __init__(self, n_lists=None, n_probe=16, refine=None, n_components=128, n_iter=10,
+                 sample_size=100000, block_size=65536, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.refine = refine
+        self.n_components = n_components
+        self.n_iter = n_iter
+        self.sample_size = sample_size
+        self.block_size = block_size
+        self.seed = seed
+        self.matrix = None
+        self.components = None
+        self.embedding = None
+        self.centroids = None
+        self.list_offsets = None
+        self.list_members = None
+
+    def params(self):
+        """Settings that persisted index arrays must match to be reused."""
+        return {
+            'n_lists': self.n_lists,
+            'n_components': self.n_components,
+            'n_iter': self.n_iter,
+            'sample_size': self.sample_size,
+            'seed': self.seed
+        }
+
+    def fit(self, feature_matrix):
+        """
+        Build the index.
+
+        Args:
+            feature_matrix: Sparse feature matrix with one row per item
+        """
+        rng = np.random.default_rng(self.seed)
+        self.matrix = sparse.csr_matrix(normalize(feature_matrix, norm='l2', axis=1))
+        n_rows, n_features = self.matrix.shape
+
+        # Low-dimensional embedding used only to pick lists
+        n_components = max(1, min(self.n_components, n_features - 1, n_rows - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=self.seed)
+        embedding = svd.fit_transform(self.matrix).astype(np.float32)
+        self.embedding = normalize(embedding, norm='l2', axis=1)
+        # Kept so rows added later can be embedded the same way
+        self.components = svd.components_.astype(np.float32)
+
+        n_lists = self.n_lists or int(4 * np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+        self.centroids = self._train_centroids(n_lists, rng)
+
+        # Assign every row to its closest centroid, block by block
+        assignments = np.empty(n_rows, dtype=np.int32)
+        for start in range(0, n_rows, self.block_size):
+            block = self.embedding[start:start + self.block_size]
+            assignments[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+
+        # Lists stored back to back: members of list i are
+        # list_members[list_offsets[i]:list_offsets[i + 1]]
+        self.list_members = np.argsort(assignments, kind='stable').astype(np.int32)
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=self.list_offsets[1:])
+
+        return self
+
+    def _train_centroids(self, n_lists, rng):
+        """Spherical k-means on a sample of the embedding."""
+        n_rows = len(self.embedding)
+        sample_size = min(n_rows, max(self.sample_size, n_lists))
+        sample = self.embedding[rng.choice(n_rows, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # Empty clusters are reseeded with random sample rows
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            centroids = normalize(sums, norm='l2', axis=1)
+
+        return centroids
+
+    def get_arrays(self):
+        """Return the index as a dictionary of NumPy arrays."""
+        arrays = {
+            'embedding': self.embedding,
+            'centroids': self.centroids,
+            'list_offsets': self.list_offsets,
+            'list_members': self.list_members
+        }
+        if self.components is not None:
+            arrays['components'] = self.components
+        return arrays
+
+    def load_arrays(self, arrays, feature_matrix):
+        """
+        Restore an index from arrays produced by get_arrays().
+
+        Args:
+            arrays: Dictionary of NumPy arrays
+            feature_matrix: The feature matrix the index was built from
+        """
+        self.matrix = sparse.csr_matrix(normalize(feature_matrix, norm='l2', axis=1))
+        self.components = arrays.get('components')
+        self.embedding = arrays['embedding']
+        self.centroids = arrays['centroids']
+        self.list_offsets = arrays['list_offsets']
+        self.list_members = arrays['list_members']
+        return self
+
+    def update(self, feature_matrix, rows):
+        """
+        Index an updated feature matrix in which only some rows changed or
+        were appended. The centroids are kept; changed rows are embedded
+        with the stored SVD components and moved to their closest list, so
+        the cost is O(changed rows + N) instead of a new SVD and k-means.
+        Lists drift from a fresh fit as the data changes.
+
+        Args:
+            feature_matrix: Updated feature matrix (rows past the old end are new)
+            rows: Positions of the changed rows
+
+        Returns:
+            New IVFIndex (this one is left untouched)
+        """
+        index = copy.copy(self)
+        if self.components is None:
+            # Arrays saved without the SVD projection can only be rebuilt
+            return index.fit(feature_matrix)
+
+        index.matrix = sparse.csr_matrix(normalize(feature_matrix, norm='l2', axis=1))
+        n_rows = index.matrix.shape[0]
+        index.embedding = np.empty((n_rows, self.embedding.shape[1]), dtype=np.float32)
+        index.embedding[:len(self.embedding)] = self.embedding
+        embedded = np.asarray(index.matrix[rows] @ self.components.T, dtype=np.float32)
+        index.embedding[rows] = normalize(embedded, norm='l2', axis=1)
+
+        # Recover every row's list from the stored layout, reassign the
+        # changed rows and lay the lists out again
+        n_lists = len(self.centroids)
+        assignments = np.empty(n_rows, dtype=np.int32)
+        assignments[self.list_members] = np.repeat(np.arange(n_lists), np.diff(self.list_offsets))
+        assignments[rows] = np.argmax(index.embedding[rows] @ self.centroids.T, axis=1)
+        index.list_members = np.argsort(assignments, kind='stable').astype(np.int32)
+        index.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=index.list_offsets[1:])
+
+        return index
+
+    def _candidates(self, row, k):
+        """Members of the n_probe closest lists (more if they hold fewer than k others)."""
+        centroid_scores = self.centroids @ self.embedding[row]
+        n_lists = len(centroid_scores)
+        n_probe = min(self.n_probe, n_lists)
+
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        sizes = self.list_offsets[probes + 1] - self.list_offsets[probes]
+        if sizes.sum() <= k and n_probe < n_lists:
+            # Widen the search in centroid order until there are enough rows
+            order = np.argsort(-centroid_scores, kind='stable')
+            all_sizes = self.list_offsets[order + 1] - self.list_offsets[order]
+            n_probe = min(n_lists, int(np.searchsorted(np.cumsum(all_sizes), k + 1)) + 1)
+            probes = order[:n_probe]
+
+        return np.concatenate([
+            self.list_members[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes
+        ])
+
+    def _exact_scores(self, candidates, row):
+        """
+        Cosine similarity of candidate rows to one row, computed straight
+        from the CSR arrays (sparse row slicing costs more than the math
+        for a few hundred rows).
+        """
+        indptr, indices, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+        query = np.zeros(self.matrix.shape[1])
+        query[indices[indptr[row]:indptr[row + 1]]] = data[indptr[row]:indptr[row + 1]]
+
+        starts = indptr[candidates]
+        lengths = indptr[candidates + 1] - starts
+        owners = np.repeat(np.arange(len(candidates)), lengths)
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+
+        return np.bincount(
+            owners, weights=data[positions] * query[indices[positions]], minlength=len(candidates)
+        )
+
+    def search(self, row, k):
+        """
+        Find approximate top-K neighbours of an indexed row (itself excluded).
+
+        Args:
+            row: Row position of the query item
+            k: Number of neighbours to return
+
+        Returns:
+            Tuple of (indices, scores) arrays sorted by descending cosine
+            similarity, ties broken by ascending index
+        """
+        candidates = self._candidates(row, k)
+        candidates = candidates[candidates != row]
+
+        # Optionally shortlist by embedding similarity, then score with
+        # exact cosine similarity on the original features
+        n_refine = len(candidates) if self.refine is None else k * self.refine
+        if n_refine < len(candidates):
+            approximate = self.embedding[candidates] @ self.embedding[row]
+            candidates = candidates[np.argpartition(-approximate, n_refine - 1)[:n_refine]]
+        scores = self._exact_scores(candidates, row)
+
+        if k < len(candidates):
+            keep = np.argpartition(-scores, k - 1)[:k]
+            threshold = scores[keep].min()
+            keep = np.flatnonzero(scores >= threshold)
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:k]
+
+        return candidates[order].astype(np.intp), scores[order]
@@ -0,0 +1,106 @@
+"""
+Persisted model artifacts.
+Fitted arrays are written as individual .npy files next to a versioned
+manifest, so every worker can memory-map them instead of refitting and
+the OS page cache shares the pages between processes.
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from backend.utils.preprocessing import get_data_path
+
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+SOURCE_FILES = ('movies.csv', 'user_ratings.csv', 'user_ratings.npz')
+
+def source_fingerprint():
+    """
+    Describe the data files the artifacts are built from.
+    
+    Returns:
+        Dictionary of filename -> [mtime_ns, size] (None if missing)
+    """
+    fingerprint = {}
+    for filename in SOURCE_FILES:
+        try:
+            stat = os.stat(get_data_path(filename))
+            fingerprint[filename] = [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            fingerprint[filename] = None
+    return fingerprint
+
+def save_artifacts(directory, models, params):
+    """
+    Write fitted model arrays to disk.
+    Files are written to a temporary directory first and moved into place
+    once complete, so readers never see a partial build.
+    
+    Args:
+        directory: Target artifact directory
+        models: Dictionary of model name -> {array name: ndarray}
+        params: Model settings the arrays were fitted with
+    """
+    directory = os.path.abspath(directory)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'sources': source_fingerprint(),
+        'params': params,
+        'arrays': {}
+    }
+    for model_name, arrays in models.items():
+        manifest['arrays'][model_name] = {}
+        for array_name, array in arrays.items():
+            filename = f"{model_name}.{array_name}.npy"
+            np.save(os.path.join(staging, filename), np.ascontiguousarray(array))
+            manifest['arrays'][model_name][array_name] = filename
+    
+    # The manifest is written last and marks the build as complete
+    with open(os.path.join(staging, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    
+    retired = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.rename(directory, retired)
+    os.rename(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+
+def load_artifacts(directory, params, mmap_mode='r'):
+    """
+    Memory-map fitted model arrays if they match the current data and settings.
+    
+    Args:
+        directory: Artifact directory
+        params: Model settings the caller expects
+        mmap_mode: numpy mmap mode (None loads arrays into memory)
+    
+    Returns:
+        Dictionary of model name -> {array name: ndarray}, or None if the
+        artifacts are missing, stale or written in another format version
+    """
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        return None
+    if manifest.get('params') != params:
+        return None
+    if manifest.get('sources') != source_fingerprint():
+        return None
+    
+    models = {}
+    for model_name, files in manifest['arrays'].items():
+        models[model_name] = {
+            array_name: np.load(os.path.join(directory, filename), mmap_mode=mmap_mode)
+            for array_name, filename in files.items()
+        }
+    return models
@@ -0,0 +1,507 @@
+"""
+In-memory movie catalog shared by the API routes and the recommenders.
+Loads movies.csv once and reloads it only when the file changes on disk.
+"""
+
+import functools
+import json
+import math
+import os
+import threading
+from json.encoder import encode_basestring
+import numpy as np
+import pandas as pd
+from backend.utils.preprocessing import load_movies_data, get_data_path, save_movies_data
+from backend.utils.serialization import dumps, encode_float, join_records
+
+# Movie fields in response order
+FIELDS = ('movie_id', 'title', 'genres', 'director', 'cast', 'rating', 'year', 'description')
+# Recommendations leave out the cast by default
+SUMMARY_FIELDS = tuple(field for field in FIELDS if field != 'cast')
+
+_KEYS = {field: dumps(field) + b':' for field in FIELDS}
+
+
+class _ByteBuffer:
+    """
+    Variable-length byte strings stored back to back in one buffer;
+    entry i is data[starts[i]:ends[i]].
+    
+    Args:
+        data: uint8 array
+        starts: int64 array of entry start offsets
+        ends: int64 array of entry end offsets
+    """
+    
+    def __init__(self, data, starts, ends):
+        self.data = data
+        self.starts = starts
+        self.ends = ends
+        # Indexing memoryviews avoids creating NumPy scalars per lookup
+        self._data = memoryview(data)
+        self._starts = memoryview(starts)
+        self._ends = memoryview(ends)
+    
+    @classmethod
+    def from_chunks(cls, chunks):
+        lengths = np.fromiter(map(len, chunks), dtype=np.int64, count=len(chunks))
+        ends = np.cumsum(lengths)
+        return cls(np.frombuffer(b''.join(chunks), dtype=np.uint8), ends - lengths, ends)
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def get(self, idx):
+        """Entry idx as a memoryview into the buffer."""
+        return self._data[self._starts[idx]:self._ends[idx]]
+    
+    def replaced(self, positions, chunks):
+        """
+        New buffer with the entries at positions replaced (positions past
+        the end append). The chunks are added to the end of a copy of the
+        data, which is compacted once it is mostly replaced bytes.
+        """
+        added = _ByteBuffer.from_chunks(chunks)
+        n_entries = max(len(self), int(positions.max()) + 1)
+        starts = np.zeros(n_entries, dtype=np.int64)
+        ends = np.zeros(n_entries, dtype=np.int64)
+        starts[:len(self)] = self.starts
+        ends[:len(self)] = self.ends
+        starts[positions] = added.starts + len(self.data)
+        ends[positions] = added.ends + len(self.data)
+        buffer = _ByteBuffer(np.concatenate([self.data, added.data]), starts, ends)
+        
+        if len(buffer.data) > 2 * int(np.sum(ends - starts)):
+            buffer = _ByteBuffer.from_chunks([buffer.get(idx) for idx in range(n_entries)])
+        return buffer
+
+
+def _encode_records(movies_df):
+    """
+    Encode every movie as the members of its JSON object ('"movie_id":1,
+    "title":...', without braces) and record where each member ends.
+    
+    Returns:
+        Tuple of (list of encoded records, int32 array of member end
+        offsets with one row per movie and one column per field)
+    """
+    columns = []
+    for field in FIELDS:
+        key = _KEYS[field]
+        values = movies_df[field].tolist()
+        if field in ('movie_id', 'year'):
+            members = [key + b'%d' % int(value) for value in values]
+        elif field == 'rating':
+            members = [
+                key + (encode_float(value) if math.isfinite(value) else b'null')
+                for value in map(float, values)
+            ]
+        else:
+            # Same bytes as dumps() for strings, without its per-call setup
+            members = [
+                key + (
+                    encode_basestring(value).encode('utf-8') if isinstance(value, str)
+                    else dumps(None if isinstance(value, float) and value != value else value)
+                )
+                for value in values
+            ]
+        columns.append(members)
+    
+    lengths = np.array([
+        np.fromiter(map(len, members), dtype=np.int32, count=len(members)) for members in columns
+    ]).T.reshape(len(movies_df), len(FIELDS))
+    member_ends = np.cumsum(lengths, axis=1, dtype=np.int32) + np.arange(len(FIELDS), dtype=np.int32)
+    return [b','.join(members) for members in zip(*columns)], member_ends
+
+@functools.lru_cache(maxsize=None)
+def _field_runs(fields):
+    """Runs of consecutive FIELDS positions covered by fields, as (first, last) pairs."""
+    runs = []
+    for k in sorted(FIELDS.index(field) for field in fields):
+        if runs and runs[-1][1] == k - 1:
+            runs[-1][1] = k
+        else:
+            runs.append([k, k])
+    return tuple((first, last) for first, last in runs)
+
+
+class MovieCatalog:
+    """
+    Immutable, columnar view of the movie dataset.
+    Built once per load; treat every attribute as read-only (with_movies()
+    derives an updated catalog instead of changing this one).
+    
+    Attributes:
+        movie_ids: int64 movie ids (catalog index i is row i of movies.csv)
+        ratings: float64 ratings (NaN if missing, serialized as null)
+        years: int32 release years
+        rating_order: Catalog indices sorted by rating (descending, stable)
+        genre_index: Lower-cased genre -> catalog indices in rating order
+    
+    The JSON encoding of every movie is kept in one offset-indexed byte
+    buffer together with the end offset of each field, so a record with
+    any selection of fields is serialized by copying one slice per run of
+    consecutive fields (see fragments()). No per-movie Python objects are
+    held; field values are only decoded on request (records(), frame()).
+    get_arrays() and from_arrays() persist the catalog with the model
+    artifacts, and memory-mapped arrays are shared by every worker
+    through the page cache.
+    """
+    
+    def __init__(self, movies_df, mtime=None):
+        movies_df = movies_df.reset_index(drop=True)
+        if movies_df.empty:
+            movies_df = pd.DataFrame({field: movies_df.get(field, []) for field in FIELDS})
+        records, member_ends = _encode_records(movies_df)
+        
+        self.mtime = mtime
+        self._set_columns(
+            movies_df['movie_id'].astype(np.int64).to_numpy(),
+            movies_df['rating'].astype(np.float64).to_numpy(),
+            movies_df['year'].astype(np.int32).to_numpy(),
+            _ByteBuffer.from_chunks(records),
+            member_ends
+        )
+        self._index_genres()
+    
+    @classmethod
+    def from_arrays(cls, arrays, mtime=None):
+        """
+        Restore a catalog from arrays produced by get_arrays().
+        The arrays are used as-is, so memory-mapped inputs stay mapped.
+        """
+        catalog = cls.__new__(cls)
+        catalog.mtime = mtime
+        catalog._set_columns(
+            arrays['movie_id'], arrays['rating'], arrays['year'],
+            _ByteBuffer(arrays['record_data'], arrays['record_starts'], arrays['record_ends']),
+            arrays['member_ends']
+        )
+        catalog._index_genres()
+        return catalog
+    
+    def get_arrays(self):
+        """Return the catalog as a dictionary of NumPy arrays."""
+        return {
+            'movie_id': self.movie_ids,
+            'rating': self.ratings,
+            'year': self.years,
+            'record_data': self._records.data,
+            'record_starts': self._records.starts,
+            'record_ends': self._records.ends,
+            'member_ends': self._member_ends
+        }
+    
+    def _set_columns(self, movie_ids, ratings, years, records, member_ends):
+        self.movie_ids = movie_ids
+        self.ratings = ratings
+        self.years = years
+        self._records = records
+        self._member_ends = member_ends
+        self._member_view = memoryview(np.ascontiguousarray(member_ends).reshape(-1))
+        
+        # Binary-search id lookup; a stable sort keeps the first row of a
+        # repeated movie_id in front
+        self._id_order = np.argsort(movie_ids, kind='stable')
+        self._sorted_ids = movie_ids[self._id_order]
+        
+        # Rating-sorted order (ties keep file order, movies without a
+        # rating are left out) and each movie's position in that order
+        order = np.argsort(-ratings, kind='stable')
+        self.rating_order = order[~np.isnan(ratings[order])]
+        self.rating_rank = np.full(len(ratings), len(ratings), dtype=np.intp)
+        self.rating_rank[self.rating_order] = np.arange(len(self.rating_order))
+    
+    def _index_genres(self):
+        """Inverted genre index, each posting list already in rating order."""
+        rating_order = self.rating_order.tolist()
+        postings = {}
+        for idx, genres in zip(rating_order, self.values('genres', rating_order)):
+            for genre in _genre_names(genres):
+                postings.setdefault(genre, []).append(idx)
+        self.genre_index = {
+            genre: np.array(indices, dtype=np.intp) for genre, indices in postings.items()
+        }
+    
+    def with_movies(self, movies_df):
+        """
+        Build a new catalog with movies added or replaced.
+        A row whose movie_id is already in the catalog replaces that movie
+        at its index; other rows are appended. Only the changed movies are
+        encoded; the other records are copied as raw bytes.
+        
+        Args:
+            movies_df: DataFrame with the catalog's columns (for a repeated
+                movie_id the last row wins)
+        
+        Returns:
+            Tuple of (new MovieCatalog, sorted catalog indices of the
+            changed movies)
+        """
+        if len(self) == 0:
+            catalog = MovieCatalog(movies_df.drop_duplicates('movie_id', keep='last'))
+            return catalog, np.arange(len(catalog))
+        
+        missing = [field for field in FIELDS if field not in movies_df.columns]
+        if missing:
+            raise ValueError(f"Movies are missing columns: {', '.join(missing)}")
+        rows = movies_df.drop_duplicates('movie_id', keep='last').reset_index(drop=True)
+        records, member_ends = _encode_records(rows)
+        
+        # Existing movies keep their index, new ones are numbered on
+        positions = self.positions(rows['movie_id'].astype(np.int64).to_numpy())
+        unknown = positions < 0
+        positions[unknown] = len(self) + np.arange(np.count_nonzero(unknown))
+        n_movies = len(self) + int(np.count_nonzero(unknown))
+        
+        columns = []
+        for current, values in (
+            (self.movie_ids, rows['movie_id']),
+            (self.ratings, rows['rating']),
+            (self.years, rows['year']),
+            (self._member_ends, member_ends)
+        ):
+            column = np.empty((n_movies,) + current.shape[1:], dtype=current.dtype)
+            column[:len(self)] = current
+            column[positions] = values
+            columns.append(column)
+        movie_ids, ratings, years, member_ends = columns
+        
+        catalog = MovieCatalog.__new__(MovieCatalog)
+        catalog.mtime = None
+        catalog._set_columns(
+            movie_ids, ratings, years, self._records.replaced(positions, records), member_ends
+        )
+        
+        # Drop the changed movies from the genre lists, add them back under
+        # their current genres and restore rating order
+        changed = np.sort(positions)
+        postings = {
+            genre: indices[~np.isin(indices, changed)]
+            for genre, indices in self.genre_index.items()
+        }
+        rated = changed[catalog.rating_rank[changed] < n_movies].tolist()
+        for idx, genres in zip(rated, catalog.values('genres', rated)):
+            for genre in _genre_names(genres):
+                postings[genre] = np.append(postings.get(genre, np.empty(0, dtype=np.intp)), idx)
+        catalog.genre_index = {
+            genre: indices[np.argsort(catalog.rating_rank[indices], kind='stable')]
+            for genre, indices in postings.items() if len(indices)
+        }
+        
+        return catalog, changed
+    
+    def __len__(self):
+        return len(self.movie_ids)
+    
+    def position(self, movie_id):
+        """Catalog index of a movie_id, or None if unknown."""
+        found = int(np.searchsorted(self._sorted_ids, movie_id))
+        if found == len(self._sorted_ids) or self._sorted_ids[found] != movie_id:
+            return None
+        return int(self._id_order[found])
+    
+    def positions(self, movie_ids):
+        """Vectorized position(): catalog index of every movie_id, -1 if unknown."""
+        try:
+            movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        except OverflowError:
+            return np.array([
+                -1 if idx is None else idx for idx in map(self.position, movie_ids)
+            ], dtype=np.intp)
+        if len(self._sorted_ids) == 0:
+            return np.full(len(movie_ids), -1, dtype=np.intp)
+        found = np.minimum(np.searchsorted(self._sorted_ids, movie_ids), len(self._sorted_ids) - 1)
+        return np.where(self._sorted_ids[found] == movie_ids, self._id_order[found], -1)
+    
+    def fragments(self, indices, fields=SUMMARY_FIELDS):
+        """
+        Serialized records of several catalog indices with the given fields
+        (in FIELDS order), each without its closing brace so callers can
+        append fields (see serialization.join_records).
+        """
+        runs = _field_runs(fields)
+        data = self._records._data
+        starts = self._records._starts
+        member_ends = self._member_view
+        n_fields = len(FIELDS)
+        fragments = []
+        for idx in indices:
+            start = starts[idx]
+            base = idx * n_fields
+            fragments.append(b'{' + b','.join([
+                data[start + (member_ends[base + first - 1] + 1 if first else 0):start + member_ends[base + last]]
+                for first, last in runs
+            ]))
+        return fragments
+    
+    def record_json(self, idx, fields=FIELDS):
+        """Serialized record of a catalog index (all fields by default)."""
+        return self.fragments([idx], fields)[0] + b'}'
+    
+    def records(self, indices, fields=FIELDS):
+        """Record dictionaries of several catalog indices."""
+        return json.loads(join_records(self.fragments(indices, fields)))
+    
+    def get(self, movie_id, fields=FIELDS):
+        """Return the record of a movie_id, or None if unknown."""
+        idx = self.position(movie_id)
+        return None if idx is None else self.records([idx], fields)[0]
+    
+    def values(self, field, indices):
+        """Decode one field of several catalog indices."""
+        k = FIELDS.index(field)
+        skip = len(_KEYS[field])
+        ends = self._member_view
+        parts = []
+        for idx in indices:
+            base = idx * len(FIELDS)
+            start = (0 if k == 0 else ends[base + k - 1] + 1) + skip
+            parts.append(self._records.get(idx)[start:ends[base + k]])
+        return json.loads(b'[' + b','.join(parts) + b']')
+    
+    def frame(self, fields=FIELDS, indices=None):
+        """
+        Decode fields of some (default all) catalog indices into a movie
+        DataFrame. Built on every call; meant for fitting, not serving.
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.intp)
+        numeric = {'movie_id': self.movie_ids, 'rating': self.ratings, 'year': self.years}
+        return pd.DataFrame({
+            field: numeric[field][indices] if field in numeric
+            else self.values(field, indices.tolist())
+            for field in fields
+        })
+    
+    @property
+    def movies_df(self):
+        """All fields as a DataFrame (see frame())."""
+        return self.frame()
+    
+    def top_rated(self, limit, genre=None, min_rating=None):
+        """
+        Return the highest rated movies matching the filters.
+        
+        Args:
+            limit: Maximum number of movies to return
+            genre: Case-insensitive genre filter (substring of a genre name)
+            min_rating: Keep movies with rating >= min_rating
+        
+        Returns:
+            Catalog indices in descending rating order
+        """
+        if genre:
+            needle = genre.lower()
+            postings = [
+                indices for name, indices in self.genre_index.items() if needle in name
+            ]
+            if not postings:
+                return np.empty(0, dtype=np.intp)
+            if len(postings) == 1:
+                candidates = postings[0]
+            else:
+                # Merge several posting lists back into rating order
+                merged = np.unique(np.concatenate(postings))
+                candidates = merged[np.argsort(self.rating_rank[merged])]
+        else:
+            candidates = self.rating_order
+        
+        if min_rating is not None:
+            # Candidates are sorted by descending rating, so cut at the first
+            # movie below the threshold
+            cutoff = np.searchsorted(-self.ratings[candidates], -min_rating, side='right')
+            candidates = candidates[:cutoff]
+        
+        return candidates[:limit]
+
+
+def _genre_names(genres):
+    """Distinct lower-cased genre names of a '|'-separated genres field."""
+    if not isinstance(genres, str):
+        return set()
+    return {g.strip().lower() for g in genres.split('|') if g.strip()}
+
+def parse_fields(names, default):
+    """
+    Parse a fields= selection.
+    
+    Args:
+        names: Comma-separated string or list of field names (None or
+            empty selects the default)
+        default: Fields used when names is empty
+    
+    Returns:
+        Tuple of field names in FIELDS order
+    
+    Raises:
+        ValueError: If a name is not a movie field
+    """
+    if isinstance(names, str):
+        names = names.split(',')
+    names = {name.strip() for name in names or () if name.strip()}
+    if not names:
+        return default
+    unknown = sorted(names.difference(FIELDS))
+    if unknown:
+        raise ValueError(
+            f"Unknown movie fields: {', '.join(unknown)} (available: {', '.join(FIELDS)})"
+        )
+    return tuple(field for field in FIELDS if field in names)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog(arrays=None):
+    """
+    Return the shared movie catalog.
+    The catalog is loaded on first use and rebuilt only when movies.csv's
+    modification time changes.
+    
+    Args:
+        arrays: Optional catalog columns persisted for the current
+            movies.csv (see MovieCatalog.get_arrays()); used instead of
+            parsing the CSV file if the catalog has to be built
+    """
+    global _catalog
+    
+    data_path = get_data_path('movies.csv')
+    try:
+        mtime = os.stat(data_path).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    
+    catalog = _catalog
+    if catalog is not None and catalog.mtime == mtime:
+        return catalog
+    
+    with _catalog_lock:
+        if _catalog is None or _catalog.mtime != mtime:
+            if arrays is not None:
+                _catalog = MovieCatalog.from_arrays(arrays, mtime=mtime)
+            else:
+                _catalog = MovieCatalog(load_movies_data(), mtime=mtime)
+        return _catalog
+
+def publish_catalog(catalog, previous):
+    """
+    Save an updated catalog (see MovieCatalog.with_movies()) to movies.csv
+    and make it the shared catalog, so the API routes and later refits see
+    the change.
+    
+    Args:
+        catalog: New MovieCatalog
+        previous: Catalog it was derived from
+    
+    Returns:
+        True if published; False (nothing written) if previous is not the
+        shared catalog, e.g. for a model fitted on a catalog of its own
+    """
+    global _catalog
+    
+    with _catalog_lock:
+        if previous is not _catalog:
+            return False
+        catalog.mtime = save_movies_data(catalog.frame())
+        _catalog = catalog
+        return True
@@ -0,0 +1,70 @@
+"""
+Bounded executor for CPU-bound work called from async route handlers.
+Scoring runs on a fixed-size thread pool (NumPy/SciPy release the GIL for
+the heavy parts) so the event loop keeps serving other requests, and
+concurrent requests for the same key share one computation.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from backend import config
+from backend.utils.profiler import profiled
+
+_executor = None
+_max_workers = config.SCORING_WORKERS
+_in_flight = {}
+
+def configure_executor(max_workers):
+    """
+    Resize the scoring executor.
+    
+    Args:
+        max_workers: Number of worker threads (0 = run work inline)
+    """
+    global _executor, _max_workers
+    
+    old_executor = _executor
+    _executor = None
+    _max_workers = max_workers
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+def _get_executor():
+    global _executor
+    
+    if _executor is None and _max_workers > 0:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix='scoring')
+    return _executor
+
+async def run_scoring(key, func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) on the scoring executor.
+    If a call with the same key is already running, wait for its result
+    instead of starting another computation.
+    
+    Args:
+        key: Hashable identity of the computation (None disables collapsing)
+        func: Function to call
+    
+    Returns:
+        The function's return value
+    """
+    func = profiled(func)
+    executor = _get_executor()
+    if executor is None:
+        return func(*args, **kwargs)
+    
+    loop = asyncio.get_running_loop()
+    if key is None:
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    
+    flight_key = (id(loop), key)
+    future = _in_flight.get(flight_key)
+    if future is None:
+        future = loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        _in_flight[flight_key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(flight_key, None))
+    
+    # Shield so one cancelled waiter doesn't cancel the shared computation
+    return await asyncio.shield(future)
@@ -0,0 +1,111 @@
+"""
+Matrix factorization utilities for the movie recommendation system.
+Learns low-rank user and item factors from a sparse rating matrix with
+alternating least squares (ALS), solving many small regularized systems
+at once with batched NumPy linear algebra.
+"""
+
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from backend.utils.similarity import resolve_n_jobs
+
+def _row_blocks(counts, block_size, max_entries):
+    """
+    Group rows with observations into blocks of similar length, so the
+    padded (rows x longest row) gather of each block stays small.
+    """
+    order = np.argsort(counts, kind='stable')
+    order = order[counts[order] > 0]
+    sorted_counts = counts[order]
+
+    blocks = []
+    start = 0
+    while start < len(order):
+        stop = min(len(order), start + block_size)
+        # Rows are sorted by length, so the last row of a block is the longest
+        while stop - start > 1 and (stop - start) * sorted_counts[stop - 1] > max_entries:
+            stop = start + max(1, (stop - start) // 2)
+        blocks.append(order[start:stop])
+        start = stop
+    return blocks
+
+def _solve_block(rows, matrix, fixed, regularization, out):
+    """Solve the regularized least-squares problems of one block of rows."""
+    indptr, indices, data = matrix.indptr, matrix.indices, matrix.data
+    counts = indptr[rows + 1] - indptr[rows]
+    offsets = np.arange(counts.max())
+    valid = offsets[None, :] < counts[:, None]
+    positions = np.where(valid, indptr[rows][:, None] + offsets[None, :], 0)
+
+    # Padded gather: factors of each row's observed columns (zeros as padding)
+    gathered = fixed[indices[positions]] * valid[..., None]
+    values = np.where(valid, data[positions], 0.0)
+
+    # (F^T F + lambda * n * I) x = F^T r for every row at once
+    gram = np.matmul(gathered.transpose(0, 2, 1), gathered)
+    gram += (regularization * counts)[:, None, None] * np.eye(fixed.shape[1])
+    rhs = np.matmul(gathered.transpose(0, 2, 1), values[..., None])
+    out[rows] = np.linalg.solve(gram, rhs)[..., 0]
+
+def solve_factors(matrix, fixed, regularization, n_jobs=None, block_size=1024, max_entries=1 << 18):
+    """
+    Solve one ALS half-step: the factors of every row of matrix given the
+    fixed factors of its columns. Rows without observations get zeros.
+
+    Args:
+        matrix: Sparse CSR matrix of observations (rows x columns)
+        fixed: Dense column factors (columns x F)
+        regularization: L2 penalty, scaled by each row's observation count
+        n_jobs: Worker threads (None = serial, -1 = all cores)
+        block_size: Maximum rows solved per batch
+        max_entries: Maximum padded observations gathered per batch
+
+    Returns:
+        Dense row factors (rows x F)
+    """
+    solved = np.zeros((matrix.shape[0], fixed.shape[1]))
+    blocks = _row_blocks(np.diff(matrix.indptr), block_size, max_entries)
+
+    # Batched matmul and LAPACK solves release the GIL, so threads scale
+    # without copying the factor matrices to worker processes
+    n_workers = min(resolve_n_jobs(n_jobs), len(blocks))
+    if n_workers <= 1:
+        for rows in blocks:
+            _solve_block(rows, matrix, fixed, regularization, solved)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='als') as pool:
+            futures = [
+                pool.submit(_solve_block, rows, matrix, fixed, regularization, solved)
+                for rows in blocks
+            ]
+            for future in futures:
+                future.result()
+
+    return solved
+
+def als_factorize(matrix, n_factors, regularization=0.1, n_iter=10, n_jobs=None, seed=0):
+    """
+    Factorize a sparse matrix over its observed entries only:
+    matrix[u, i] ~ user_factors[u] . item_factors[i].
+
+    Args:
+        matrix: Sparse CSR matrix (users x items), e.g. mean-centered ratings
+        n_factors: Rank of the factorization
+        regularization: L2 penalty (weighted by observation counts)
+        n_iter: Number of ALS sweeps (users, then items)
+        n_jobs: Worker threads for the solves (None = serial, -1 = all cores)
+        seed: Random seed for the initial item factors
+
+    Returns:
+        Tuple of (user_factors, item_factors) dense arrays
+    """
+    rng = np.random.default_rng(seed)
+    transposed = matrix.T.tocsr()
+    item_factors = rng.normal(scale=0.1, size=(matrix.shape[1], n_factors))
+    user_factors = np.zeros((matrix.shape[0], n_factors))
+
+    for _ in range(n_iter):
+        user_factors = solve_factors(matrix, item_factors, regularization, n_jobs)
+        item_factors = solve_factors(transposed, user_factors, regularization, n_jobs)
+
+    return user_factors, item_factors
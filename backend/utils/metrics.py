@@ -0,0 +1,234 @@
+"""
+Instrumentation for the recommender stack.
+Stage timers, per-route HTTP latency histograms and scrape-time gauges,
+rendered in the Prometheus text exposition format without third-party
+dependencies.
+
+Timers are switched on with METRICS_ENABLED. When it is off, timed()
+returns functions undecorated, timer() returns a shared no-op context and
+the HTTP middleware is not installed, so hot paths pay nothing beyond one
+function call.
+"""
+
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from backend import config
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage
+    resource = None
+
+ENABLED = config.METRICS_ENABLED
+
+# Upper bounds in seconds, from sub-millisecond lookups to full refits
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    """
+    Cumulative latency histogram keyed by a tuple of label values.
+
+    Args:
+        name: Metric name
+        help_text: Description shown in the exposition
+        label_names: Names of the label values passed to observe()
+        buckets: Sorted bucket upper bounds in seconds
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """Record one observation for a tuple of label values."""
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot = +Inf), then the sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[position] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+
+        names = self.label_names + ('le',)
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                bound = bound if bound == '+Inf' else repr(bound)
+                lines.append(f'{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}')
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {series[-1]!r}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+STAGE_SECONDS = Histogram(
+    'recommender_stage_seconds', 'Time spent in data loading, fitting and recommendation stages',
+    ('model', 'stage')
+)
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ('method', 'route', 'status')
+)
+
+class _Timer:
+    __slots__ = ('labels', 'start')
+
+    def __init__(self, labels):
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(model, stage):
+    """
+    Context manager timing one stage into recommender_stage_seconds.
+
+    Args:
+        model: Model (or 'data') the stage belongs to
+        stage: Stage name, e.g. 'fit.similarity' or 'recommend.scoring'
+    """
+    return _Timer((model, stage)) if ENABLED else _NULL_TIMER
+
+def timed(model, stage):
+    """Decorator form of timer(); leaves the function untouched when disabled."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        labels = (model, stage)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+_collectors = []
+
+def register_collector(collect):
+    """
+    Add a callable evaluated on every scrape. It returns an iterable of
+    (name, help text, [(labels dict, value), ...]) gauge families.
+    """
+    _collectors.append(collect)
+
+def _process_gauges():
+    """Current and peak resident memory of this process."""
+    families = []
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        families.append((
+            'process_resident_memory_bytes', 'Resident memory size in bytes',
+            [({}, resident_pages * os.sysconf('SC_PAGE_SIZE'))]
+        ))
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Without /proc or getrusage the memory gauges are left out of the scrape
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != 'darwin':
+            peak *= 1024
+        families.append(('process_peak_resident_memory_bytes', 'Peak resident memory size in bytes', [({}, peak)]))
+    return families
+
+def render():
+    """
+    Render every metric in the Prometheus text format.
+
+    Returns:
+        Exposition text
+    """
+    lines = []
+    for collect in [_process_gauges] + _collectors:
+        for name, help_text, samples in collect():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}')
+
+    lines.extend(STAGE_SECONDS.render())
+    lines.extend(REQUEST_SECONDS.render())
+    return '\n'.join(lines) + '\n'
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template (so
+    /movies/1 and /movies/2 share a series) until the response is complete,
+    streamed responses included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            REQUEST_SECONDS.observe(
+                (scope['method'], route, str(status[0])), time.perf_counter() - start
+            )
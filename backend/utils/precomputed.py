@@ -0,0 +1,127 @@
+"""
+Precomputed top-N recommendation store.
+Lists are kept in a local SQLite file, one row per (kind, key), with the
+movie record indices and scores packed as binary arrays.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE metadata (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE recommendations (
+    kind TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    indices BLOB NOT NULL,
+    scores BLOB NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+"""
+
+class PrecomputedWriter:
+    """
+    Writes a new store to a temporary file and moves it into place on close,
+    so readers only ever open complete stores.
+    """
+    
+    def __init__(self, path, top_n, sources, params):
+        self.path = path
+        self.staging = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(self.staging):
+            os.remove(self.staging)
+        
+        self.connection = sqlite3.connect(self.staging)
+        self.connection.executescript(SCHEMA)
+        self.connection.executemany(
+            "INSERT INTO metadata VALUES (?, ?)",
+            [('top_n', json.dumps(top_n)),
+             ('sources', json.dumps(sources)),
+             ('params', json.dumps(params))]
+        )
+    
+    def write(self, kind, rows):
+        """
+        Add lists for one kind ('content' or 'collaborative').
+        
+        Args:
+            kind: List kind
+            rows: Iterable of (key, record indices, scores)
+        """
+        self.connection.executemany(
+            "INSERT INTO recommendations VALUES (?, ?, ?, ?)",
+            (
+                (kind, int(key), np.asarray(indices, dtype=np.int32).tobytes(),
+                 np.asarray(scores, dtype=np.float64).tobytes())
+                for key, indices, scores in rows
+            )
+        )
+    
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+        os.replace(self.staging, self.path)
+
+
+class PrecomputedStore:
+    """
+    Read-only access to a precomputed store.
+    Each thread gets its own SQLite connection.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        metadata = dict(self._connection().execute("SELECT name, value FROM metadata"))
+        self.top_n = json.loads(metadata['top_n'])
+        self.sources = json.loads(metadata['sources'])
+        self.params = json.loads(metadata['params'])
+    
+    @classmethod
+    def open(cls, path, sources, params):
+        """
+        Open a store if it exists and was built from the current data and
+        model settings.
+        
+        Returns:
+            PrecomputedStore, or None if missing or stale
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            store = cls(path)
+        except (sqlite3.Error, KeyError, ValueError):
+            return None
+        if store.sources != sources or store.params != params:
+            return None
+        return store
+    
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+    
+    def lookup(self, kind, key, n):
+        """
+        Return the precomputed top-n list for a key.
+        
+        Returns:
+            Tuple of (record indices, scores) arrays, or None if the key was
+            not precomputed or n exceeds the stored list length
+        """
+        if n > self.top_n:
+            return None
+        row = self._connection().execute(
+            "SELECT indices, scores FROM recommendations WHERE kind = ? AND key = ?",
+            (kind, int(key))
+        ).fetchone()
+        if row is None:
+            return None
+        indices = np.frombuffer(row[0], dtype=np.int32)[:n]
+        scores = np.frombuffer(row[1], dtype=np.float64)[:n]
+        return indices, scores
@@ -5,17 +5,26 @@ Handles data loading, cleaning, and feature engineering.
 
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import MultiLabelBinarizer
 import os
+from backend.utils import metrics
 
+def get_data_path(filename):
+    """
+    Return the absolute path of a file in the backend data directory.
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(current_dir, '..', 'data', filename)
+
+@metrics.timed('data', 'load_movies')
 def load_movies_data():
     """
     Load movie dataset from CSV file.
     Returns a pandas DataFrame with movie information.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(current_dir, '..', 'data', 'movies.csv')
+    data_path = get_data_path('movies.csv')
     
     try:
         movies_df = pd.read_csv(data_path)
@@ -24,13 +33,13 @@ def load_movies_data():
         print(f"Error: movies.csv not found at {data_path}")
         return pd.DataFrame()
 
+@metrics.timed('data', 'load_ratings')
 def load_user_ratings():
     """
     Load user ratings dataset from CSV file.
     Returns a pandas DataFrame with user-movie ratings.
     """
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(current_dir, '..', 'data', 'user_ratings.csv')
+    data_path = get_data_path('user_ratings.csv')
     
     try:
         ratings_df = pd.read_csv(data_path)
@@ -39,6 +48,211 @@ def load_user_ratings():
         print(f"Error: user_ratings.csv not found at {data_path}")
         return pd.DataFrame()
 
+# Compact dtypes for streamed ratings: 4 bytes per id and per rating
+# (float32 holds half-star and integer rating scales exactly)
+RATING_DTYPES = {'user_id': np.int32, 'movie_id': np.int32, 'rating': np.float32}
+
+def _ratings_source():
+    """
+    Pick the ratings file to read: the columnar user_ratings.npz when it is
+    at least as new as user_ratings.csv, otherwise the CSV.
+    
+    Returns:
+        Path of the file to read, or None if neither exists
+    """
+    csv_path = get_data_path('user_ratings.csv')
+    npz_path = get_data_path('user_ratings.npz')
+    
+    if os.path.exists(npz_path):
+        if not os.path.exists(csv_path) or os.path.getmtime(npz_path) >= os.path.getmtime(csv_path):
+            return npz_path
+        print("user_ratings.npz is older than user_ratings.csv, reading the CSV")
+    return csv_path if os.path.exists(csv_path) else None
+
+def iter_rating_chunks(data_path, chunk_size=1000000):
+    """
+    Stream ratings as compact NumPy arrays without building a DataFrame
+    of the whole file. Rows with missing values are skipped.
+    
+    Args:
+        data_path: user_ratings CSV, or an .npz with user_id, movie_id
+            and rating arrays (returned as a single chunk)
+        chunk_size: CSV rows parsed per chunk
+    
+    Yields:
+        Tuples of (user_id int32, movie_id int32, rating float32) arrays
+    """
+    columns = list(RATING_DTYPES)
+    
+    if data_path.endswith('.npz'):
+        with np.load(data_path) as arrays:
+            yield tuple(arrays[name].astype(dtype, copy=False) for name, dtype in RATING_DTYPES.items())
+        return
+    
+    # Ids are parsed as floats so blank fields become NaN instead of failing
+    # the chunk (pandas' nullable integer parser is several times slower)
+    dtypes = {'user_id': np.float64, 'movie_id': np.float64, 'rating': np.float32}
+    for chunk in pd.read_csv(data_path, usecols=columns, dtype=dtypes, chunksize=chunk_size):
+        chunk = chunk.dropna()
+        yield tuple(chunk[name].to_numpy(dtype=dtype) for name, dtype in RATING_DTYPES.items())
+
+@metrics.timed('data', 'load_ratings_matrix')
+def load_ratings_matrix(chunk_size=1000000):
+    """
+    Load the ratings file straight into a sparse user-item matrix.
+    Ratings are read in chunks with compact dtypes while the sorted id
+    maps grow chunk by chunk, so peak memory stays within a small
+    multiple of the final matrix instead of a full pandas DataFrame.
+    
+    Args:
+        chunk_size: CSV rows parsed per chunk
+    
+    Returns:
+        Same as create_user_item_matrix(); an empty matrix if there is no
+        ratings file
+    """
+    data_path = _ratings_source()
+    if data_path is None:
+        print(f"Error: user_ratings.csv not found at {get_data_path('user_ratings.csv')}")
+        return sparse.csr_matrix((0, 0)), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+    
+    user_ids = np.empty(0, dtype=np.int32)
+    movie_ids = np.empty(0, dtype=np.int32)
+    user_chunks, movie_chunks, rating_chunks = [], [], []
+    for users, movies, ratings in iter_rating_chunks(data_path, chunk_size):
+        user_ids = _merge_ids(user_ids, users)
+        movie_ids = _merge_ids(movie_ids, movies)
+        user_chunks.append(users)
+        movie_chunks.append(movies)
+        rating_chunks.append(ratings)
+    
+    # Concatenate one column at a time and drop its chunks right away, so
+    # only one column is ever held twice
+    users = _concatenate_chunks(user_chunks, np.int32)
+    del user_chunks
+    movies = _concatenate_chunks(movie_chunks, np.int32)
+    del movie_chunks
+    ratings = _concatenate_chunks(rating_chunks, np.float32)
+    del rating_chunks
+    
+    # Replace ids with row/column indices in place
+    _ids_to_positions(users, user_ids, chunk_size)
+    _ids_to_positions(movies, movie_ids, chunk_size)
+    
+    user_item_matrix = _coordinates_to_matrix(users, movies, ratings, (len(user_ids), len(movie_ids)))
+    return user_item_matrix, user_ids, movie_ids
+
+def _merge_ids(ids, values):
+    """Sorted union of the known ids and the ids in values."""
+    if len(values) == 0:
+        return ids
+    
+    # Ids in a compact range are collected with bincount instead of a sort
+    low, high = int(values.min()), int(values.max())
+    if high - low <= 4 * len(values) + 1024:
+        present = np.flatnonzero(np.bincount(values - low)) + low
+    else:
+        present = np.unique(values)
+    return np.union1d(ids, present.astype(ids.dtype))
+
+def _concatenate_chunks(chunks, dtype):
+    """Join chunk arrays (a single chunk is returned without copying)."""
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+def _ids_to_positions(values, ids, block_size):
+    """
+    Overwrite every id in values with its position in the sorted ids
+    array, block by block. Ids that span a compact range go through a
+    dense lookup table, which is much faster than binary search.
+    """
+    offset = int(ids[0]) if len(ids) else 0
+    id_range = int(ids[-1]) - offset + 1 if len(ids) else 0
+    table = None
+    if id_range <= 4 * len(ids) + 1024:
+        table = np.zeros(id_range, dtype=np.int32)
+        table[ids - offset] = np.arange(len(ids), dtype=np.int32)
+    
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        if table is not None:
+            block[:] = table[block - offset]
+        else:
+            block[:] = np.searchsorted(ids, block)
+
+def save_ratings_npz(output_path=None, chunk_size=1000000):
+    """
+    Convert user_ratings.csv to the columnar .npz format read by
+    load_ratings_matrix(). The file is written next to a temporary name
+    and moved into place, so readers never see a partial file.
+    
+    Args:
+        output_path: Target file (backend/data/user_ratings.npz by default)
+        chunk_size: CSV rows parsed per chunk
+    
+    Returns:
+        Number of ratings written
+    """
+    output_path = output_path or get_data_path('user_ratings.npz')
+    chunks = list(iter_rating_chunks(get_data_path('user_ratings.csv'), chunk_size))
+    arrays = {
+        name: np.concatenate([chunk[i] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype)
+        for i, (name, dtype) in enumerate(RATING_DTYPES.items())
+    }
+    
+    staging = f"{output_path}.tmp-{os.getpid()}"
+    with open(staging, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(staging, output_path)
+    
+    return len(arrays['rating'])
+
+def append_user_ratings(ratings_df):
+    """
+    Append ratings to the user ratings CSV file.
+    
+    Args:
+        ratings_df: DataFrame with user_id, movie_id and rating columns
+    """
+    data_path = get_data_path('user_ratings.csv')
+    columns = ['user_id', 'movie_id', 'rating']
+    
+    if not os.path.exists(data_path):
+        ratings_df[columns].to_csv(data_path, index=False)
+        return
+    
+    # Make sure the first new row doesn't end up on the last existing line
+    with open(data_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        needs_newline = False
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+    
+    with open(data_path, 'a', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        ratings_df[columns].to_csv(f, header=False, index=False)
+
+def save_movies_data(movies_df):
+    """
+    Replace the movies CSV file with a new version of the catalog.
+    The file is written next to it and renamed into place, so readers
+    never see a partial file.
+    
+    Args:
+        movies_df: DataFrame with the catalog's columns
+    
+    Returns:
+        Modification time of the new file in nanoseconds
+    """
+    data_path = get_data_path('movies.csv')
+    staging = f"{data_path}.tmp-{os.getpid()}"
+    movies_df.to_csv(staging, index=False)
+    os.replace(staging, data_path)
+    return os.stat(data_path).st_mtime_ns
+
 def preprocess_genres(movies_df):
     """
     Convert genre strings into binary encoded vectors.
@@ -59,48 +273,117 @@ def preprocess_genres(movies_df):
     
     return genre_matrix, mlb.classes_
 
-def create_content_features(movies_df):
+def _content_text(movies_df):
+    """
+    Combine text features: genres, director, cast
+    (kept local so a shared catalog DataFrame is never modified)
+    """
+    return (
+        movies_df['genres'].fillna('') + ' ' +
+        movies_df['director'].fillna('') + ' ' +
+        movies_df['cast'].str.replace('|', ' ').fillna('')
+    )
+
+@metrics.timed('data', 'content_features')
+def create_content_features(movies_df, return_vectorizer=False):
     """
     Create feature vectors for content-based filtering.
     Combines genres, director, and cast information using TF-IDF.
     
     Args:
         movies_df: DataFrame with movie information
+        return_vectorizer: Also return the fitted TfidfVectorizer
     
     Returns:
         Feature matrix for content-based similarity calculation
+        (and the fitted vectorizer if requested)
     """
-    # Combine text features: genres, director, cast
-    movies_df['combined_features'] = (
-        movies_df['genres'].fillna('') + ' ' +
-        movies_df['director'].fillna('') + ' ' +
-        movies_df['cast'].str.replace('|', ' ').fillna('')
-    )
-    
     # Use TF-IDF to vectorize the combined features
     tfidf = TfidfVectorizer(stop_words='english', max_features=500)
-    feature_matrix = tfidf.fit_transform(movies_df['combined_features'])
+    feature_matrix = tfidf.fit_transform(_content_text(movies_df))
     
+    if return_vectorizer:
+        return feature_matrix, tfidf
     return feature_matrix
 
+def transform_content_features(movies_df, vectorizer):
+    """
+    Create feature vectors for more movies with an already fitted vectorizer.
+    The vocabulary and IDF weights stay frozen, so the rows line up with
+    the existing feature matrix; terms outside the vocabulary are ignored.
+    
+    Args:
+        movies_df: DataFrame with movie information
+        vectorizer: Fitted TfidfVectorizer (see create_content_features)
+    
+    Returns:
+        Sparse feature matrix with one L2-normalized row per movie
+    """
+    return vectorizer.transform(_content_text(movies_df))
+
+def restore_vectorizer(terms, idf):
+    """
+    Rebuild a fitted TF-IDF vectorizer from its vocabulary and IDF weights.
+    
+    Args:
+        terms: Vocabulary terms ordered by feature index
+        idf: Inverse document frequency per feature
+    
+    Returns:
+        TfidfVectorizer equivalent to the one that produced terms and idf
+    """
+    vocabulary = {term: idx for idx, term in enumerate(terms.tolist())}
+    tfidf = TfidfVectorizer(stop_words='english', max_features=500, vocabulary=vocabulary)
+    tfidf.idf_ = np.asarray(idf)
+    
+    return tfidf
+
 def create_user_item_matrix(ratings_df):
     """
-    Create user-item rating matrix for collaborative filtering.
+    Create a sparse user-item rating matrix for collaborative filtering.
     Rows represent users, columns represent movies, values are ratings.
+    Only observed ratings are stored; duplicate (user, movie) pairs are
+    averaged.
     
     Args:
         ratings_df: DataFrame with user_id, movie_id, rating columns
     
     Returns:
-        User-item matrix as pandas DataFrame
-    """
-    # Pivot the ratings to create user-item matrix
-    user_item_matrix = ratings_df.pivot_table(
-        index='user_id',
-        columns='movie_id',
-        values='rating',
-        fill_value=0  # Fill missing ratings with 0
-    )
+        Tuple of (CSR matrix, user_ids, movie_ids). user_ids[i] and
+        movie_ids[j] are the ids of row i and column j (sorted ascending).
+    """
+    ratings_df = ratings_df.dropna(subset=['user_id', 'movie_id', 'rating'])
+    
+    # Map ids to contiguous row/column indices
+    user_ids, user_codes = np.unique(ratings_df['user_id'].to_numpy(), return_inverse=True)
+    movie_ids, movie_codes = np.unique(ratings_df['movie_id'].to_numpy(), return_inverse=True)
+    shape = (len(user_ids), len(movie_ids))
+    
+    ratings = ratings_df['rating'].to_numpy(dtype=np.float64)
+    user_item_matrix = _coordinates_to_matrix(user_codes, movie_codes, ratings, shape)
+    
+    return user_item_matrix, user_ids, movie_ids
+
+def _coordinates_to_matrix(rows, columns, ratings, shape):
+    """
+    Build a float64 CSR rating matrix from (row, column, rating) triples,
+    averaging duplicate (row, column) pairs.
+    """
+    # Building CSR from coordinates sums duplicates; divide by the
+    # per-entry counts to average them like a pivot table would
+    user_item_matrix = sparse.csr_matrix((ratings, (rows, columns)), shape=shape)
+    user_item_matrix.sum_duplicates()
+    
+    # Counting is only needed when some pair occurred more than once
+    counts = None
+    if user_item_matrix.nnz < len(ratings):
+        counts = sparse.csr_matrix((np.ones(len(ratings), dtype=np.float32), (rows, columns)), shape=shape)
+        counts.sum_duplicates()
+    
+    user_item_matrix.data = user_item_matrix.data.astype(np.float64, copy=False)
+    if counts is not None:
+        user_item_matrix.data /= counts.data
+    user_item_matrix.eliminate_zeros()
     
     return user_item_matrix
 
@@ -108,18 +391,21 @@ def normalize_ratings(user_item_matrix):
     """
     Normalize user ratings by subtracting mean rating per user.
     This helps handle rating bias across different users.
+    Only stored (observed) ratings are centered, so the matrix stays sparse.
     
     Args:
-        user_item_matrix: User-item rating matrix
+        user_item_matrix: Sparse CSR user-item rating matrix
     
     Returns:
-        Normalized user-item matrix
+        Tuple of (normalized CSR matrix, user mean ratings array)
     """
-    # Calculate mean rating per user (ignoring zeros)
-    user_means = user_item_matrix.replace(0, np.nan).mean(axis=1)
+    # Calculate mean rating per user over observed ratings only
+    counts = np.diff(user_item_matrix.indptr)
+    sums = np.asarray(user_item_matrix.sum(axis=1)).ravel()
+    user_means = np.divide(sums, counts, out=np.zeros(len(counts)), where=counts > 0)
     
-    # Subtract mean from each user's ratings
-    normalized_matrix = user_item_matrix.sub(user_means, axis=0)
-    normalized_matrix = normalized_matrix.fillna(0)
+    # Subtract each user's mean from their stored ratings
+    normalized_matrix = user_item_matrix.copy()
+    normalized_matrix.data -= np.repeat(user_means, counts)
     
     return normalized_matrix, user_means
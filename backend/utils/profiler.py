@@ -0,0 +1,156 @@
+"""
+Opt-in sampling profiler for single requests.
+While a profiled request runs, a background thread samples the Python
+stack of the thread doing the request's work (the scoring executor thread,
+see profiled()) at a fixed interval, so concurrent requests don't end up
+in the profile. The result is written in collapsed-stack format
+("frame;frame;frame count" per line), which flamegraph.pl and speedscope
+read directly.
+
+Enabled with PROFILE_REQUESTS; a request opts in with an X-Profile header
+(plus X-Admin-Token when ADMIN_TOKEN is set).
+"""
+
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from backend import config
+
+# Profiler of the request being handled (set by ProfilerMiddleware)
+_current = contextvars.ContextVar('profiler', default=None)
+
+class SamplingProfiler:
+    """
+    Stack sampler for the threads registered with tracking().
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.samples = Counter()
+        self._threads = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    @contextmanager
+    def tracking(self):
+        """Sample the calling thread until the block exits."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads[thread_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[thread_id] -= 1
+                if not self._threads[thread_id]:
+                    del self._threads[thread_id]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                thread_ids = list(self._threads)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Samples in collapsed-stack format, most frequent first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def profiled(func):
+    """
+    Wrap func so the thread that runs it is sampled by the profiler of the
+    current request, if it is being profiled. Call it in the request's
+    context, before handing func to a worker thread.
+    """
+    profiler = _current.get()
+    if profiler is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with profiler.tracking():
+            return func(*args, **kwargs)
+    return wrapper
+
+def _header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware profiling requests that carry an X-Profile header.
+    The profile is written to PROFILE_DIR and its path returned in the
+    X-Profile-File response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or _header(scope, b'x-profile') is None:
+            await self.app(scope, receive, send)
+            return
+        if config.ADMIN_TOKEN is not None and _header(scope, b'x-admin-token') != config.ADMIN_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler(config.PROFILE_INTERVAL_SECONDS).start()
+        written = []
+
+        async def send_wrapper(message):
+            # Handlers finish their work before the response starts
+            if message['type'] == 'http.response.start' and not written:
+                written.append(_write_profile(profiler.stop(), scope['path']))
+                message = dict(message)
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'x-profile-file', written[0].encode('latin-1'))
+                ]
+            await send(message)
+
+        token = _current.set(profiler)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if not written:
+                profiler.stop()
+
+def _write_profile(profiler, path):
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    name = path.strip('/').replace('/', '_') or 'root'
+    filename = os.path.join(config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{os.getpid()}.txt")
+    with open(filename, 'w') as f:
+        f.write(profiler.collapsed())
+    print(f"Wrote request profile to {filename} ({sum(profiler.samples.values())} samples)")
+    return filename
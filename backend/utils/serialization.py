@@ -0,0 +1,75 @@
+"""
+JSON serialization helpers for API responses.
+Movie payloads are serialized once per catalog load and cached as bytes;
+responses are assembled by joining those bytes with per-request fields,
+byte-for-byte identical to what FastAPI's default JSONResponse renders.
+"""
+
+import json
+import math
+from fastapi.responses import Response
+
+def dumps(content):
+    """
+    Serialize content exactly like Starlette's JSONResponse.render().
+
+    Args:
+        content: JSON-compatible Python object
+
+    Returns:
+        UTF-8 encoded JSON bytes
+    """
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def encode_float(value):
+    """Serialize one float the way json.dumps(allow_nan=False) does."""
+    if not math.isfinite(value):
+        raise ValueError("Out of range float values are not JSON compliant: " + repr(value))
+    return float.__repr__(value).encode("ascii")
+
+def join_records(fragments, field=None, values=None):
+    """
+    Assemble a JSON array of objects from cached object fragments.
+
+    Args:
+        fragments: Serialized objects without their closing brace
+        field: Optional name of a float field appended to every object
+        values: Floats for field, aligned with fragments
+
+    Returns:
+        JSON array bytes
+    """
+    if field is None:
+        return b"[" + b"},".join(fragments) + (b"}]" if fragments else b"]")
+
+    key = b"," + dumps(field) + b":"
+    return b"[" + b",".join([
+        fragment + key + encode_float(value) + b"}"
+        for fragment, value in zip(fragments, values)
+    ]) + b"]"
+
+def join_object(fields):
+    """
+    Assemble a JSON object, keeping key order.
+
+    Args:
+        fields: Dictionary of fields; bytes values are inserted as
+            already-serialized JSON, anything else goes through dumps()
+
+    Returns:
+        JSON object bytes
+    """
+    return b"{" + b",".join([
+        dumps(key) + b":" + (value if isinstance(value, bytes) else dumps(value))
+        for key, value in fields.items()
+    ]) + b"}"
+
+class RawJSONResponse(Response):
+    """Response for bodies that are already serialized JSON bytes."""
+    media_type = "application/json"
@@ -0,0 +1,259 @@
+"""
+Model arrays in shared memory for multi-worker serving.
+The serving parent (backend/serve.py) copies the fitted arrays of every
+model into multiprocessing.shared_memory segments and describes them in
+a small control segment. API workers map the same segments and wrap them
+in read-only NumPy views, so N workers share one copy of the models.
+
+Every publish is a new generation. The control segment holds a sequence
+number that is odd while the layout is being rewritten (readers retry),
+a reload request flag set by workers, and the JSON layout of the current
+generation: segment name and size per model group, and dtype, shape and
+offset of every array in it.
+"""
+
+import json
+import os
+import secrets
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+CONTROL_SIZE = 1 << 16
+
+# Control segment fields (int64) and where the layout starts
+_SEQUENCE = 0
+_RELOAD_REQUESTED = 8
+_LAYOUT_LENGTH = 16
+_LAYOUT = 24
+
+# Arrays start on cache line boundaries
+_ALIGNMENT = 64
+
+def _attach(name):
+    """Map an existing segment without taking ownership of it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Older versions always register the segment with the resource tracker.
+    # Workers started by the serving parent share its tracker, which
+    # already has the name from create() and drops it again on unlink()
+    return shared_memory.SharedMemory(name=name)
+
+def _layout(arrays):
+    """Offsets of arrays packed into one segment, and the segment size."""
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+    return layout, offset
+
+class SharedModelStore:
+    """
+    Generations of model arrays in shared memory.
+    The serving parent creates the store and publishes generations; API
+    workers attach to it by name and read the current one.
+    
+    Args:
+        control: Control segment
+        owner: Whether this process created the store (and unlinks it)
+    """
+    
+    def __init__(self, control, owner):
+        self.name = control.name
+        self.owner = owner
+        self._control = control
+        self._segments = {}
+        self._layout = None
+        self._lock = threading.Lock()
+        self._prefix = control.name[:-len('-control')]
+    
+    @classmethod
+    def create(cls):
+        """Create an empty store (generation 0) in the serving parent."""
+        prefix = f"movierec-{os.getpid()}-{secrets.token_hex(4)}"
+        control = shared_memory.SharedMemory(name=f"{prefix}-control", create=True, size=CONTROL_SIZE)
+        control.buf[:_LAYOUT] = bytes(_LAYOUT)
+        return cls(control, owner=True)
+    
+    @classmethod
+    def attach(cls, name):
+        """Attach to the store created by the serving parent."""
+        return cls(_attach(name), owner=False)
+    
+    def _get(self, offset):
+        return struct.unpack_from('<q', self._control.buf, offset)[0]
+    
+    def _set(self, offset, value):
+        struct.pack_into('<q', self._control.buf, offset, value)
+    
+    def generation(self):
+        """Number of the latest published generation (0 before the first)."""
+        return self._get(_SEQUENCE) // 2
+    
+    def request_reload(self):
+        """Ask the serving parent to reload the models."""
+        self._set(_RELOAD_REQUESTED, 1)
+    
+    def reload_requested(self):
+        return self._get(_RELOAD_REQUESTED) != 0
+    
+    def clear_reload_request(self):
+        self._set(_RELOAD_REQUESTED, 0)
+    
+    def publish(self, models, unchanged=()):
+        """
+        Copy model arrays into new segments and make them the current
+        generation. Segments of the previous generation are unlinked; their
+        memory is freed once every worker has moved on.
+        
+        Args:
+            models: Dictionary of model name -> {array name: ndarray}
+            unchanged: Model names whose segment of the previous generation
+                is reused instead of copying the arrays again
+        
+        Returns:
+            The new generation number
+        """
+        with self._lock:
+            return self._publish(models, unchanged)
+    
+    def _publish(self, models, unchanged):
+        sequence = self._get(_SEQUENCE)
+        generation = sequence // 2 + 1
+        previous = {} if self._layout is None else self._layout['segments']
+        
+        segments = {}
+        for model_name, arrays in models.items():
+            if model_name in unchanged and model_name in previous:
+                segments[model_name] = previous[model_name]
+                continue
+            
+            arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+            layout, size = _layout(arrays)
+            segment = shared_memory.SharedMemory(
+                name=f"{self._prefix}-{model_name}-{generation}", create=True, size=max(size, 1)
+            )
+            for name, array in arrays.items():
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf, offset=layout[name]['offset'])
+                view[...] = array
+            self._segments[segment.name] = segment
+            segments[model_name] = {'name': segment.name, 'size': segment.size, 'arrays': layout}
+        
+        layout = {'generation': generation, 'segments': segments}
+        data = json.dumps(layout).encode()
+        if _LAYOUT + len(data) > CONTROL_SIZE:
+            raise ValueError(f"Model layout of {len(data)} bytes does not fit the control segment")
+        
+        # Odd while the layout is rewritten, so readers never see a torn one
+        self._set(_SEQUENCE, sequence + 1)
+        self._control.buf[_LAYOUT:_LAYOUT + len(data)] = data
+        self._set(_LAYOUT_LENGTH, len(data))
+        self._set(_SEQUENCE, sequence + 2)
+        self._layout = layout
+        
+        live = {segment['name'] for segment in segments.values()}
+        for segment in previous.values():
+            if segment['name'] not in live:
+                self._segments[segment['name']].unlink()
+        self._release_retired()
+        return generation
+    
+    def _read_layout(self):
+        while True:
+            sequence = self._get(_SEQUENCE)
+            if sequence % 2 == 0:
+                length = self._get(_LAYOUT_LENGTH)
+                data = bytes(self._control.buf[_LAYOUT:_LAYOUT + length])
+                if self._get(_SEQUENCE) == sequence:
+                    return json.loads(data) if length else None
+            time.sleep(0.001)
+    
+    def read(self):
+        """
+        Map the current generation.
+        
+        Returns:
+            Tuple of (generation, {model name: {array name: read-only ndarray}}),
+            or (0, None) before the first publish
+        """
+        with self._lock:
+            return self._read()
+    
+    def _read(self):
+        while True:
+            layout = self._read_layout()
+            if layout is None:
+                return 0, None
+            try:
+                for segment in layout['segments'].values():
+                    if segment['name'] not in self._segments:
+                        self._segments[segment['name']] = _attach(segment['name'])
+                break
+            except FileNotFoundError:
+                # A newer generation replaced it in the meantime
+                continue
+        
+        models = {}
+        for model_name, segment in layout['segments'].items():
+            buffer = self._segments[segment['name']].buf
+            models[model_name] = {}
+            for name, spec in segment['arrays'].items():
+                view = np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=buffer, offset=spec['offset'])
+                view.flags.writeable = False
+                models[model_name][name] = view
+        
+        self._layout = layout
+        self._release_retired()
+        return layout['generation'], models
+    
+    def release_retired(self):
+        """
+        Unmap segments of earlier generations that no array refers to any
+        more (views still held by in-flight requests keep theirs mapped
+        until a later call).
+        """
+        with self._lock:
+            self._release_retired()
+    
+    def _release_retired(self):
+        live = set() if self._layout is None else {
+            segment['name'] for segment in self._layout['segments'].values()
+        }
+        for name in list(self._segments):
+            if name in live:
+                continue
+            try:
+                self._segments[name].close()
+            except BufferError:
+                continue
+            del self._segments[name]
+    
+    def status(self):
+        """Generation and segment sizes for the health endpoint."""
+        segments = {} if self._layout is None else self._layout['segments']
+        return {
+            "control_segment": self.name,
+            "generation": 0 if self._layout is None else self._layout['generation'],
+            "latest_generation": self.generation(),
+            "segments": {
+                model_name: {"name": segment['name'], "bytes": segment['size']}
+                for model_name, segment in segments.items()
+            },
+            "bytes": sum(segment['size'] for segment in segments.values()),
+            "mapped_segments": len(self._segments)
+        }
+    
+    def close(self):
+        """Unmap every segment; the owner also unlinks them."""
+        if self.owner:
+            # Earlier generations were unlinked when they were replaced
+            for segment in self.status()['segments'].values():
+                self._segments[segment['name']].unlink()
+            self._control.unlink()
+        self._layout = None
+        self.release_retired()
+        self._control.close()
@@ -0,0 +1,309 @@
+"""
+Similarity utilities for the movie recommendation system.
+Computes truncated (top-K) cosine neighbour indexes from sparse feature
+matrices without materializing the full N x N similarity matrix.
+"""
+
+import os
+import numpy as np
+from scipy import sparse
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.preprocessing import normalize
+
+# Upper bound on the dense similarity scores materialized per block
+# (64 MiB of float64), so the working buffer doesn't grow with N
+MAX_BLOCK_ENTRIES = 1 << 23
+
+# Matrix shared with pool workers (set once per worker by the initializer)
+_worker_matrix = None
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+def select_top_k(block, k):
+    """
+    Select the K best columns of every row of a dense score block.
+
+    Args:
+        block: Dense 2-D array of scores
+        k: Number of columns to keep per row
+
+    Returns:
+        Tuple of (indices, scores) arrays of shape (rows, K), sorted by
+        descending score with ties broken by ascending column index
+    """
+    # Partial selection of the K best columns, then a small sort of those
+    candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(block, candidates, axis=1)
+    order = np.lexsort((candidates, -scores))
+    indices = np.take_along_axis(candidates, order, axis=1).astype(np.int32)
+    scores = np.take_along_axis(scores, order, axis=1)
+
+    return indices, scores
+
+def _top_k_rows(matrix, rows, k):
+    """
+    Compute the top-K neighbours for some rows of a row-normalized matrix.
+    Each row's own entry is excluded.
+    """
+    block = (matrix[rows] @ matrix.T).toarray()
+    block[np.arange(len(rows)), rows] = -np.inf
+
+    return select_top_k(block, k)
+
+def _top_k_block(matrix, start, stop, k):
+    indices, scores = _top_k_rows(matrix, np.arange(start, stop), k)
+    return start, indices, scores
+
+def _block_rows(n_columns, block_size, max_block_entries):
+    """Rows per block, so one dense rows x n_columns block fits max_block_entries."""
+    return max(1, min(block_size, max_block_entries // max(1, n_columns)))
+
+def _top_k_worker_block(start, stop, k):
+    return _top_k_block(_worker_matrix, start, stop, k)
+
+def resolve_n_jobs(n_jobs):
+    """Translate an n_jobs setting (None, -1 or a positive int) to a worker count."""
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return os.cpu_count() or 1
+    return max(1, n_jobs)
+
+def top_k_cosine_neighbors(feature_matrix, k, block_size=1024, n_jobs=None,
+                           max_block_entries=MAX_BLOCK_ENTRIES):
+    """
+    Compute the K most cosine-similar rows for every row of a feature matrix.
+    Similarities are computed block by block straight from the sparse matrix,
+    so memory scales as O(N * K) plus one working block of at most
+    max_block_entries scores per worker.
+
+    Args:
+        feature_matrix: Sparse (or dense) matrix with one row per item
+        k: Number of neighbours to keep per row
+        block_size: Maximum number of rows scored per block
+        n_jobs: Number of worker processes (None = serial, -1 = all cores)
+        max_block_entries: Maximum dense scores per block; large N get
+            proportionally fewer rows per block
+
+    Returns:
+        Tuple of (indices, scores) arrays of shape (N, K), sorted by
+        descending similarity. indices are int32 row positions.
+    """
+    matrix = sparse.csr_matrix(normalize(feature_matrix, norm='l2', axis=1))
+
+    n_rows = matrix.shape[0]
+    k = min(k, n_rows - 1)
+    if k <= 0:
+        return (np.empty((n_rows, 0), dtype=np.int32),
+                np.empty((n_rows, 0), dtype=np.float64))
+
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    scores = np.empty((n_rows, k), dtype=np.float64)
+    block_size = _block_rows(n_rows, block_size, max_block_entries)
+    bounds = [(start, min(start + block_size, n_rows))
+              for start in range(0, n_rows, block_size)]
+
+    n_workers = min(resolve_n_jobs(n_jobs), len(bounds))
+    if n_workers <= 1:
+        results = (_top_k_block(matrix, start, stop, k) for start, stop in bounds)
+        for start, block_indices, block_scores in results:
+            indices[start:start + len(block_indices)] = block_indices
+            scores[start:start + len(block_scores)] = block_scores
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 initializer=_init_worker,
+                                 initargs=(matrix,)) as pool:
+            futures = [pool.submit(_top_k_worker_block, start, stop, k)
+                       for start, stop in bounds]
+            for future in futures:
+                start, block_indices, block_scores = future.result()
+                indices[start:start + len(block_indices)] = block_indices
+                scores[start:start + len(block_scores)] = block_scores
+
+    return indices, scores
+
+def top_k_cosine_rows(feature_matrix, rows, k, max_block_entries=MAX_BLOCK_ENTRIES):
+    """
+    Compute the exact K most cosine-similar rows for some rows of a feature
+    matrix, e.g. rankings deeper than a stored top-K index holds.
+
+    Args:
+        feature_matrix: Sparse (or dense) matrix with one row per item
+        rows: Positions of the rows to score
+        k: Number of neighbours to return per row
+        max_block_entries: Maximum dense scores per block
+
+    Returns:
+        Tuple of (indices, scores) arrays of shape (len(rows), K), sorted
+        like top_k_cosine_neighbors()
+    """
+    matrix = sparse.csr_matrix(normalize(feature_matrix, norm='l2', axis=1))
+    rows = np.asarray(rows, dtype=np.intp)
+    k = max(0, min(k, matrix.shape[0] - 1))
+
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float64)
+    if k == 0:
+        return indices, scores
+
+    step = _block_rows(matrix.shape[0], max(1, len(rows)), max_block_entries)
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        indices[start:start + len(chunk)], scores[start:start + len(chunk)] = _top_k_rows(matrix, chunk, k)
+
+    return indices, scores
+
+def update_top_k_neighbors(indices, scores, changed, changed_similarities):
+    """
+    Patch top-K neighbour arrays after some rows got new similarity rows,
+    without recomputing the others. Rows past the end of the old arrays
+    (appended items) must be listed in changed.
+
+    Changed rows get freshly selected lists. Any other row is updated if a
+    changed row is on its list or now beats its weakest entry; a neighbour
+    whose similarity drops is replaced by the best remaining candidate, so
+    lists can drift from an exact recomputation.
+
+    Args:
+        indices: Old (N_old, K) neighbour indices
+        scores: Old (N_old, K) neighbour similarities
+        changed: Sorted positions of the changed rows
+        changed_similarities: Dense (len(changed), N) similarities of the
+            changed rows to every row
+
+    Returns:
+        Tuple of new (N, K) indices and scores arrays
+    """
+    n_rows = changed_similarities.shape[1]
+    n_old, k = indices.shape
+
+    neighbor_indices = np.empty((n_rows, k), dtype=indices.dtype)
+    neighbor_scores = np.empty((n_rows, k), dtype=scores.dtype)
+    neighbor_indices[:n_old] = indices
+    neighbor_scores[:n_old] = scores
+    if k == 0:
+        return neighbor_indices, neighbor_scores
+
+    # Changed rows get freshly selected lists (self excluded)
+    own = changed_similarities.copy()
+    own[np.arange(len(changed)), changed] = -np.inf
+    neighbor_indices[changed], neighbor_scores[changed] = select_top_k(own, k)
+
+    # Other rows are affected if a changed row is on their list or now
+    # beats the weakest entry on it
+    unchanged = np.ones(n_old, dtype=bool)
+    unchanged[changed[changed < n_old]] = False
+    others = np.flatnonzero(unchanged)
+    if len(others) == 0:
+        return neighbor_indices, neighbor_scores
+    listed = np.isin(indices[others], changed)
+    incoming = changed_similarities[:, others].T
+    affected = listed.any(axis=1) | (incoming > scores[others, -1:]).any(axis=1)
+    rows = others[affected]
+
+    # Candidates: the old list without changed rows, plus every changed row
+    # with its new similarity; keep the best K
+    candidate_scores = np.concatenate([
+        np.where(listed[affected], -np.inf, scores[rows]),
+        incoming[affected]
+    ], axis=1)
+    candidate_indices = np.concatenate([
+        indices[rows],
+        np.broadcast_to(changed.astype(indices.dtype), (len(rows), len(changed)))
+    ], axis=1)
+    order = np.lexsort((candidate_indices, -candidate_scores))[:, :k]
+    neighbor_indices[rows] = np.take_along_axis(candidate_indices, order, axis=1)
+    neighbor_scores[rows] = np.take_along_axis(candidate_scores, order, axis=1)
+
+    return neighbor_indices, neighbor_scores
+
+
+class PatchedSimilarity:
+    """
+    Dense, symmetric N x N similarity matrix that incremental updates
+    never write to. An update returns a new object holding the untouched
+    base array plus the current full rows of every item changed since the
+    base was built (an overlay of D x N floats). Snapshots that still hold
+    the old object keep reading consistent rows.
+
+    Reading a row costs O(N) plus the overlay column; once the overlay
+    grows past about sqrt(N) rows it is folded into a new base, so the
+    O(N^2) copy is paid once per sqrt(N) changed items.
+
+    Args:
+        base: Dense (N_base, N_base) similarity array (not modified)
+        items: Sorted item indices with an overlay row (None = no overlay)
+        rows: (len(items), N) current similarity rows of those items
+    """
+
+    def __init__(self, base, items=None, rows=None):
+        self.base = base
+        self.items = np.empty(0, dtype=np.intp) if items is None else items
+        self.rows = np.empty((0, base.shape[0]), dtype=base.dtype) if rows is None else rows
+        self.shape = (self.rows.shape[1],) * 2
+        self.dtype = base.dtype
+
+    @property
+    def nbytes(self):
+        return self.base.nbytes + self.rows.nbytes
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        """Rows by index (an int gives one row, an array a 2-D block)."""
+        if not len(self.items) and self.base.shape[0] == self.shape[0]:
+            return self.base[index]
+
+        rows = np.asarray(index)
+        single = rows.ndim == 0
+        rows = rows.reshape(-1)
+        n_base = self.base.shape[0]
+
+        block = np.zeros((len(rows), self.shape[0]), dtype=self.dtype)
+        in_base = rows < n_base
+        block[in_base, :n_base] = self.base[rows[in_base]]
+        # Columns of changed items come from their current rows (the
+        # matrix is symmetric), then changed items get their whole row
+        block[:, self.items] = self.rows[:, rows].T
+        found_at = np.minimum(np.searchsorted(self.items, rows), max(len(self.items) - 1, 0))
+        overlaid = (self.items[found_at] == rows) if len(self.items) else np.zeros(len(rows), dtype=bool)
+        block[overlaid] = self.rows[found_at[overlaid]]
+        return block[0] if single else block
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.toarray()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+    def toarray(self):
+        """The full matrix as one array (the base itself without an overlay)."""
+        return self[np.arange(self.shape[0])] if len(self.items) or len(self.base) != self.shape[0] else self.base
+
+    def update(self, changed, changed_similarities):
+        """
+        Return the matrix with new rows (and, by symmetry, columns) for
+        some items.
+
+        Args:
+            changed: Sorted indices of the changed items; indices past the
+                end add items
+            changed_similarities: Dense (len(changed), N) similarities of
+                the changed items to every item
+
+        Returns:
+            New PatchedSimilarity (this one is left as it was)
+        """
+        n_items = changed_similarities.shape[1]
+        items = np.union1d(self.items, changed).astype(np.intp)
+        rows = np.zeros((len(items), n_items), dtype=self.dtype)
+        kept = ~np.isin(self.items, changed)
+        rows[np.searchsorted(items, self.items[kept]), :self.shape[0]] = self.rows[kept]
+        rows[:, changed] = changed_similarities[:, items].T
+        rows[np.searchsorted(items, changed)] = changed_similarities
+
+        updated = PatchedSimilarity(self.base, items, rows)
+        if len(items) > max(32, int(np.sqrt(n_items))):
+            updated = PatchedSimilarity(updated.toarray())
+        return updated
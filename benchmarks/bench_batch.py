@@ -0,0 +1,70 @@
+"""
+Compare throughput of single recommendation calls with the batch API.
+Measures both the model methods and the HTTP endpoints (in-process, via
+FastAPI's TestClient, which requires httpx).
+
+Usage:
+    python -m benchmarks.bench_batch --movies 5000 --users 5000 --ids 2000
+"""
+
+import argparse
+import time
+import numpy as np
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models.recommender import content_recommender, collaborative_recommender
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def report(name, n_ids, single_seconds, batch_seconds):
+    single_qps = n_ids / single_seconds
+    batch_qps = n_ids / batch_seconds
+    print(f"{name:>24} {single_qps:>12.0f} {batch_qps:>12.0f} {batch_qps / single_qps:>8.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--movies', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--ids', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+    content_recommender.fit(catalog)
+    collaborative_recommender.fit(catalog, generate_ratings(args.users, args.movies, seed=args.seed))
+    # Measure scoring, not the result cache (ids repeat)
+    content_recommender.cache = None
+    collaborative_recommender.cache = None
+    
+    rng = np.random.default_rng(args.seed)
+    movie_ids = rng.integers(1, args.movies + 1, size=args.ids).tolist()
+    user_ids = rng.integers(1, args.users + 1, size=args.ids).tolist()
+    limit = args.limit
+    client = TestClient(app)
+    
+    print(f"{'path':>24} {'single qps':>12} {'batch qps':>12} {'speedup':>9}")
+    report('content (model)', args.ids,
+           timed(lambda: [content_recommender.recommend(m, limit) for m in movie_ids]),
+           timed(lambda: content_recommender.recommend_many(movie_ids, limit)))
+    report('collaborative (model)', args.ids,
+           timed(lambda: [collaborative_recommender.recommend(u, limit) for u in user_ids]),
+           timed(lambda: collaborative_recommender.recommend_many(user_ids, limit)))
+    report('content (http)', args.ids,
+           timed(lambda: [client.get('/recommend/content-based', params={'movie_id': m, 'limit': limit})
+                          for m in movie_ids]),
+           timed(lambda: client.post('/recommend/batch/content-based',
+                                     json={'movie_ids': movie_ids, 'limit': limit}).content))
+    report('collaborative (http)', args.ids,
+           timed(lambda: [client.get('/recommend/collaborative', params={'user_id': u, 'limit': limit})
+                          for u in user_ids]),
+           timed(lambda: client.post('/recommend/batch/collaborative',
+                                     json={'user_ids': user_ids, 'limit': limit}).content))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare full-matrix and top-K neighbour collaborative filtering.
+Reports fit time, peak resident memory, similarity storage size, held-out
+RMSE and top-10 overlap with the full-matrix recommendations.
+
+Usage:
+    python -m benchmarks.bench_collaborative_knn --users 5000 --neighbors 50
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+import numpy as np
+from backend.models.recommender import CollaborativeFilteringRecommender
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+def split_holdout(ratings_df, seed):
+    """Hold out one rating per user with at least two ratings."""
+    counts = ratings_df.groupby('user_id')['movie_id'].transform('size')
+    eligible = ratings_df[counts >= 2]
+    holdout = eligible.groupby('user_id').sample(n=1, random_state=seed)
+    return ratings_df.drop(holdout.index), holdout
+
+def run_mode(n_neighbors, n_jobs, args, queue):
+    """Fit one mode in a fresh process and report its measurements."""
+    catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+    ratings_df = generate_ratings(args.users, args.movies, args.ratings_per_user, seed=args.seed)
+    train_df, holdout_df = split_holdout(ratings_df, args.seed)
+    
+    model = CollaborativeFilteringRecommender(n_neighbors=n_neighbors, n_jobs=n_jobs)
+    start = time.perf_counter()
+    model.fit(catalog, train_df)
+    fit_seconds = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    
+    if n_neighbors is None:
+        similarity_bytes = model.user_similarity_matrix.nbytes
+    else:
+        similarity_bytes = model.neighbor_indices.nbytes + model.neighbor_scores.nbytes
+    
+    # Held-out RMSE over the pairs the model can predict
+    column_index = {movie_id: idx for idx, movie_id in enumerate(model.movie_ids.tolist())}
+    errors = []
+    for row in holdout_df.itertuples(index=False):
+        user_idx = model.user_position(row.user_id)
+        column = column_index.get(row.movie_id)
+        if user_idx is None or column is None:
+            continue
+        predicted = model.predict_ratings(user_idx)[column]
+        if not np.isnan(predicted):
+            errors.append(predicted - row.rating)
+    
+    rng = np.random.default_rng(args.seed)
+    sample_users = rng.choice(model.user_ids, size=min(args.sample_users, len(model.user_ids)), replace=False)
+    start = time.perf_counter()
+    top_lists = {
+        int(user_id): [movie['movie_id'] for movie in model.recommend(int(user_id), 10)]
+        for user_id in sample_users
+    }
+    recommend_ms = (time.perf_counter() - start) * 1000 / len(sample_users)
+    
+    queue.put({
+        'fit_seconds': fit_seconds,
+        'peak_rss_mb': peak_rss_mb,
+        'similarity_mb': similarity_bytes / 1024 ** 2,
+        'rmse': float(np.sqrt(np.mean(np.square(errors)))) if errors else float('nan'),
+        'coverage': len(errors) / max(1, len(holdout_df)),
+        'recommend_ms': recommend_ms,
+        'top_lists': top_lists
+    })
+
+def measure(n_neighbors, n_jobs, args):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_mode, args=(n_neighbors, n_jobs, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--movies', type=int, default=2000)
+    parser.add_argument('--ratings-per-user', type=int, default=30)
+    parser.add_argument('--neighbors', type=int, nargs='+', default=[20, 50, 100])
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--sample-users', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    full = measure(None, None, args)
+    rows = [('full', full)]
+    for k in args.neighbors:
+        rows.append((f'knn-{k}', measure(k, args.n_jobs, args)))
+    
+    print(f"{'mode':>9} {'fit s':>8} {'rss MB':>8} {'sim MB':>8} {'rmse':>7} "
+          f"{'cover':>6} {'rec ms':>7} {'overlap@10':>11}")
+    for name, result in rows:
+        overlaps = [
+            len(set(result['top_lists'][user]) & set(full_list)) / max(1, len(full_list))
+            for user, full_list in full['top_lists'].items()
+        ]
+        print(f"{name:>9} {result['fit_seconds']:>8.2f} {result['peak_rss_mb']:>8.0f} "
+              f"{result['similarity_mb']:>8.1f} {result['rmse']:>7.3f} {result['coverage']:>6.2f} "
+              f"{result['recommend_ms']:>7.2f} {np.mean(overlaps):>11.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark ContentBasedRecommender.recommend latency against catalog size.
+Compares the previous sort-based ranking with the argpartition path.
+
+Usage:
+    python -m benchmarks.bench_content_recommend --sizes 1000 2000 5000
+"""
+
+import argparse
+import time
+import numpy as np
+from backend.models.recommender import ContentBasedRecommender
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies
+
+def legacy_recommend(model, movies_df, movie_id, n_recommendations=10):
+    """Previous implementation: full Python sort plus per-row pandas access."""
+    movie_idx = movies_df[movies_df['movie_id'] == movie_id].index
+    if len(movie_idx) == 0:
+        return []
+    movie_idx = movie_idx[0]
+    
+    similarity_scores = list(enumerate(model.similarity_matrix[movie_idx]))
+    similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
+    top_indices = [i[0] for i in similarity_scores[1:n_recommendations+1]]
+    
+    recommendations = []
+    for idx in top_indices:
+        movie = movies_df.iloc[idx]
+        recommendations.append({
+            'movie_id': int(movie['movie_id']),
+            'title': movie['title'],
+            'genres': movie['genres'],
+            'director': movie['director'],
+            'rating': float(movie['rating']),
+            'year': int(movie['year']),
+            'description': movie['description'],
+            'similarity_score': float(model.similarity_matrix[movie_idx][idx])
+        })
+    return recommendations
+
+def measure(func, movie_ids, n_recommendations):
+    """Return per-call latencies in milliseconds."""
+    latencies = []
+    for movie_id in movie_ids:
+        start = time.perf_counter()
+        func(int(movie_id), n_recommendations)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    print(f"{'movies':>8} {'path':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    
+    for size in args.sizes:
+        model = ContentBasedRecommender()
+        model.fit(MovieCatalog(generate_movies(size, seed=args.seed)))
+        # Measure scoring, not the result cache
+        model.cache = None
+        movie_ids = rng.integers(1, size + 1, size=args.queries)
+        # The old model held the DataFrame; the catalog decodes it on request
+        movies_df = model.movies_df
+        
+        paths = [
+            ('legacy', lambda m, n: legacy_recommend(model, movies_df, m, n)),
+            ('numpy', model.recommend)
+        ]
+        for name, func in paths:
+            latencies = measure(func, movie_ids, args.limit)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{size:>8} {name:>8} {p50:>9.3f} {p99:>9.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare the ALS matrix factorization model with user-user collaborative
+filtering. Reports fit time, peak resident memory, model storage size,
+held-out RMSE (with coverage) and per-user recommend latency.
+
+Usage:
+    python -m benchmarks.bench_factorization --users 5000 --factors 16 32 64
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+import numpy as np
+from backend.models.recommender import (
+    CollaborativeFilteringRecommender,
+    MatrixFactorizationRecommender
+)
+from backend.utils.catalog import MovieCatalog
+from benchmarks.bench_collaborative_knn import split_holdout
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+def build_model(mode, args):
+    if mode == 'user-user':
+        return CollaborativeFilteringRecommender()
+    if mode.startswith('knn-'):
+        return CollaborativeFilteringRecommender(n_neighbors=int(mode[4:]), n_jobs=args.n_jobs)
+    return MatrixFactorizationRecommender(
+        n_factors=int(mode[4:]), regularization=args.regularization,
+        n_iter=args.iterations, n_jobs=args.n_jobs
+    )
+
+def model_bytes(model):
+    """Size of the learned model (similarities or factors), excluding ratings."""
+    if isinstance(model, MatrixFactorizationRecommender):
+        return model.user_factors.nbytes + model.item_factors.nbytes
+    if model.neighbor_indices is not None:
+        return model.neighbor_indices.nbytes + model.neighbor_scores.nbytes
+    return model.user_similarity_matrix.nbytes
+
+def run_mode(mode, args, queue):
+    """Fit one mode in a fresh process and report its measurements."""
+    catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+    ratings_df = generate_ratings(args.users, args.movies, args.ratings_per_user, seed=args.seed)
+    train_df, holdout_df = split_holdout(ratings_df, args.seed)
+
+    model = build_model(mode, args)
+    start = time.perf_counter()
+    model.fit(catalog, train_df)
+    fit_seconds = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # Held-out RMSE over the pairs the model can predict
+    column_index = {movie_id: idx for idx, movie_id in enumerate(model.movie_ids.tolist())}
+    errors = []
+    for row in holdout_df.itertuples(index=False):
+        user_idx = model.user_position(row.user_id)
+        column = column_index.get(row.movie_id)
+        if user_idx is None or column is None:
+            continue
+        predicted = model.predict_ratings(user_idx)[column]
+        if not np.isnan(predicted):
+            errors.append(predicted - row.rating)
+
+    rng = np.random.default_rng(args.seed)
+    sample_users = rng.choice(model.user_ids, size=min(args.sample_users, len(model.user_ids)), replace=False)
+    start = time.perf_counter()
+    for user_id in sample_users:
+        model.recommend(int(user_id), 10)
+    recommend_ms = (time.perf_counter() - start) * 1000 / len(sample_users)
+
+    queue.put({
+        'fit_seconds': fit_seconds,
+        'peak_rss_mb': peak_rss_mb,
+        'model_mb': model_bytes(model) / 1024 ** 2,
+        'rmse': float(np.sqrt(np.mean(np.square(errors)))) if errors else float('nan'),
+        'coverage': len(errors) / max(1, len(holdout_df)),
+        'recommend_ms': recommend_ms
+    })
+
+def measure(mode, args):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_mode, args=(mode, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--movies', type=int, default=2000)
+    parser.add_argument('--ratings-per-user', type=int, default=30)
+    parser.add_argument('--factors', type=int, nargs='+', default=[16, 32, 64])
+    parser.add_argument('--neighbors', type=int, nargs='*', default=[50])
+    parser.add_argument('--regularization', type=float, default=0.1)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--sample-users', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    modes = ['user-user'] + [f'knn-{k}' for k in args.neighbors] + [f'als-{f}' for f in args.factors]
+
+    print(f"{'mode':>10} {'fit s':>8} {'rss MB':>8} {'model MB':>9} {'rmse':>7} {'cover':>6} {'rec ms':>7}")
+    for mode in modes:
+        result = measure(mode, args)
+        print(f"{mode:>10} {result['fit_seconds']:>8.2f} {result['peak_rss_mb']:>8.0f} "
+              f"{result['model_mb']:>9.1f} {result['rmse']:>7.3f} {result['coverage']:>6.2f} "
+              f"{result['recommend_ms']:>7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Offline cross-validated evaluation of the collaborative recommenders.
+Users are split into folds. For each fold a fraction of every test user's
+ratings is held out (the most recent ones when the ratings have a
+timestamp column, a random sample otherwise) and every model is fitted on
+the remaining ratings. Each (model, fold) pair runs in its own worker
+process.
+
+Quality is measured against the held-out ratings: precision@k, recall@k
+and NDCG@k of the top-k lists (held-out ratings >= --relevant count as
+relevant) and RMSE of the predicted ratings, next to fit time and ranking
+time per user. Timings come from parallel workers; use --workers 1 for
+uncontended figures.
+
+Usage:
+    python -m benchmarks.evaluate --users 5000 --movies 2000 --folds 5
+    python -m benchmarks.evaluate --data-dir backend/data --models user-user als --output eval.json
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from backend.models.recommender import (
+    CollaborativeFilteringRecommender,
+    MatrixFactorizationRecommender
+)
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+MODELS = ('user-user', 'user-knn', 'als')
+
+# (catalog, ratings_df, fold of every rating (-1 = never held out),
+# held-out flag of every rating), set in each worker by _init_worker()
+_dataset = None
+
+def _init_worker(catalog_arrays, ratings_df, folds, held_out):
+    """Pool initializer: receive the dataset once per worker process."""
+    global _dataset
+
+    # The catalog is sent as its arrays (see MovieCatalog.get_arrays())
+    _dataset = (MovieCatalog.from_arrays(catalog_arrays), ratings_df, folds, held_out)
+
+def build_model(name, args):
+    if name == 'user-user':
+        return CollaborativeFilteringRecommender()
+    if name == 'user-knn':
+        return CollaborativeFilteringRecommender(n_neighbors=args.neighbors)
+    return MatrixFactorizationRecommender(n_factors=args.factors, n_iter=args.iterations)
+
+def assign_folds(ratings_df, n_folds, holdout, min_ratings, seed):
+    """
+    Split users with at least min_ratings ratings into n_folds folds and
+    flag the ratings each of them holds out (at least one, and never all).
+
+    Returns:
+        Tuple of (fold of every rating, -1 for users never tested;
+        held-out flag of every rating)
+    """
+    rng = np.random.default_rng(seed)
+    user_ids = ratings_df['user_id'].to_numpy()
+    users, user_rows, counts = np.unique(user_ids, return_inverse=True, return_counts=True)
+
+    eligible = np.flatnonzero(counts >= min_ratings)
+    user_folds = np.full(len(users), -1)
+    user_folds[rng.permutation(eligible)] = np.arange(len(eligible)) % n_folds
+
+    # Rank each user's ratings newest first (or in random order)
+    if 'timestamp' in ratings_df.columns:
+        age = -ratings_df['timestamp'].to_numpy(dtype=np.float64)
+    else:
+        age = rng.random(len(ratings_df))
+    order = np.lexsort((age, user_rows))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.empty(len(ratings_df), dtype=np.int64)
+    rank[order] = np.arange(len(ratings_df)) - starts[user_rows[order]]
+
+    n_holdout = np.clip(np.round(counts * holdout), 1, counts - 1)
+    return user_folds[user_rows], rank < n_holdout[user_rows]
+
+def ranking_metrics(catalog, users, ranked, test_df, k, relevant_rating):
+    """
+    Precision@k, recall@k and NDCG@k (binary relevance), averaged over the
+    test users with at least one relevant held-out movie.
+
+    Args:
+        catalog: MovieCatalog the ranked indices refer to
+        users: Sorted test user IDs
+        ranked: rank_many() output aligned with users
+        test_df: Held-out ratings
+        k: List length
+        relevant_rating: Held-out ratings at or above this are relevant
+    """
+    recommended = np.full((len(users), k), -1)
+    for row, result in enumerate(ranked):
+        if result is not None:
+            recommended[row, :len(result[0])] = result[0]
+
+    relevant = test_df[test_df['rating'] >= relevant_rating]
+    relevant_rows = np.searchsorted(users, relevant['user_id'].to_numpy())
+    n_relevant = np.bincount(relevant_rows, minlength=len(users))
+
+    # A hit is a (user row, catalog index) pair among the relevant pairs;
+    # movies missing from the catalog can't be hit but still count as relevant
+    stride = len(catalog) + 1
+    relevant_keys = relevant_rows * stride + catalog.positions(relevant['movie_id'].to_numpy())
+    recommended_keys = np.arange(len(users))[:, None] * stride + recommended
+    hits = np.isin(recommended_keys, relevant_keys) & (recommended >= 0)
+
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    evaluated = n_relevant > 0
+    n_hits = hits[evaluated].sum(axis=1)
+    ideal = np.cumsum(discounts)[np.minimum(n_relevant[evaluated], k) - 1]
+    return {
+        'users': int(np.count_nonzero(evaluated)),
+        'precision': float(np.mean(n_hits / k)) if n_hits.size else float('nan'),
+        'recall': float(np.mean(n_hits / n_relevant[evaluated])) if n_hits.size else float('nan'),
+        'ndcg': float(np.mean(hits[evaluated] @ discounts / ideal)) if n_hits.size else float('nan')
+    }
+
+def rating_errors(model, test_df):
+    """Predicted minus held-out rating per held-out pair (NaN if not predictable)."""
+    movie_ids = model.movie_ids
+    order = np.argsort(movie_ids)
+    found = np.minimum(np.searchsorted(movie_ids[order], test_df['movie_id'].to_numpy()), len(order) - 1)
+    columns = order[found]
+    known = movie_ids[columns] == test_df['movie_id'].to_numpy()
+    ratings = test_df['rating'].to_numpy(dtype=np.float64)
+
+    errors = np.full(len(test_df), np.nan)
+    user_ids = test_df['user_id'].to_numpy()
+    by_user = np.argsort(user_ids, kind='stable')
+    users, starts = np.unique(user_ids[by_user], return_index=True)
+    for user_id, rows in zip(users.tolist(), np.split(by_user, starts[1:])):
+        user_idx = model.user_position(user_id)
+        rows = rows[known[rows]]
+        if user_idx is None or not len(rows):
+            continue
+        errors[rows] = model.predict_ratings(user_idx)[columns[rows]] - ratings[rows]
+    return errors
+
+def evaluate_fold(name, fold, args):
+    """Fit one model on one fold's training ratings and score its test users."""
+    catalog, ratings_df, folds, held_out = _dataset
+    test_mask = (folds == fold) & held_out
+    train_df, test_df = ratings_df[~test_mask], ratings_df[test_mask]
+
+    model = build_model(name, args)
+    start = time.perf_counter()
+    model.fit(catalog, train_df)
+    fit_seconds = time.perf_counter() - start
+
+    users = np.unique(test_df['user_id'].to_numpy())
+    start = time.perf_counter()
+    ranked = model.rank_many(users.tolist(), args.k)
+    rank_seconds = time.perf_counter() - start
+
+    errors = rating_errors(model, test_df)
+    predicted = ~np.isnan(errors)
+
+    result = ranking_metrics(catalog, users, ranked, test_df, args.k, args.relevant)
+    result.update({
+        'rmse': float(np.sqrt(np.mean(np.square(errors[predicted])))) if predicted.any() else float('nan'),
+        'coverage': float(np.mean(predicted)) if len(errors) else float('nan'),
+        'fit_seconds': fit_seconds,
+        'rank_ms_per_user': rank_seconds * 1000 / max(1, len(users))
+    })
+    return result
+
+def load_dataset(args):
+    """Catalog and ratings from --data-dir, or seeded synthetic data."""
+    if args.data_dir:
+        catalog = MovieCatalog(pd.read_csv(os.path.join(args.data_dir, 'movies.csv')))
+        ratings_df = pd.read_csv(os.path.join(args.data_dir, 'user_ratings.csv'))
+    else:
+        catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+        ratings_df = generate_ratings(args.users, args.movies, args.ratings_per_user, seed=args.seed)
+    return catalog, ratings_df.dropna(subset=['user_id', 'movie_id', 'rating']).reset_index(drop=True)
+
+def summarize(results, k):
+    """One table row per model: mean ± std across folds."""
+    columns = [
+        ('precision', f'prec@{k}'), ('recall', f'recall@{k}'), ('ndcg', f'ndcg@{k}'),
+        ('rmse', 'rmse'), ('coverage', 'cover'), ('fit_seconds', 'fit s'),
+        ('rank_ms_per_user', 'rank ms/user')
+    ]
+    print(f"{'model':>10} " + ' '.join(f'{title:>15}' for _, title in columns))
+    for name, folds in results.items():
+        cells = []
+        for key, _ in columns:
+            values = np.array([fold[key] for fold in folds])
+            cells.append(f'{np.mean(values):.4f}±{np.std(values):.4f}')
+        print(f"{name:>10} " + ' '.join(f'{cell:>15}' for cell in cells))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=list(MODELS))
+    parser.add_argument('--data-dir', help="Directory with movies.csv and user_ratings.csv (default: synthetic data)")
+    parser.add_argument('--movies', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--ratings-per-user', type=int, default=30)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--holdout', type=float, default=0.2, help="Fraction of each test user's ratings held out")
+    parser.add_argument('--min-ratings', type=int, default=5, help="Users with fewer ratings are never tested")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--relevant', type=float, default=4.0, help="Lowest held-out rating counted as relevant")
+    parser.add_argument('--neighbors', type=int, default=50)
+    parser.add_argument('--factors', type=int, default=32)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Also write per-fold results as JSON")
+    args = parser.parse_args()
+
+    catalog, ratings_df = load_dataset(args)
+    folds, held_out = assign_folds(ratings_df, args.folds, args.holdout, args.min_ratings, args.seed)
+    print(f"{len(ratings_df)} ratings, {len(catalog)} movies, {args.folds} folds, "
+          f"{int(held_out[folds >= 0].sum())} held-out ratings")
+
+    # Handed over through the initializer, so any start method works
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker,
+        initargs=(catalog.get_arrays(), ratings_df, folds, held_out)
+    ) as pool:
+        futures = {
+            name: [pool.submit(evaluate_fold, name, fold, args) for fold in range(args.folds)]
+            for name in args.models
+        }
+        results = {name: [future.result() for future in fold_futures] for name, fold_futures in futures.items()}
+
+    print()
+    summarize(results, args.k)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'parameters': vars(args), 'results': results}, f, indent=2)
+        print(f"Wrote per-fold results to {args.output}")
+
+if __name__ == '__main__':
+    main()
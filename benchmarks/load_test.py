@@ -0,0 +1,111 @@
+"""
+Concurrent load test for the recommendation API.
+Drives the FastAPI app in-process over ASGI (httpx) with a mix of slow
+collaborative and fast content-based requests, once with scoring inline
+on the event loop and once on the scoring executor, and reports
+throughput and per-route tail latency.
+
+The app runs on its own event loop in a background thread, like a server
+worker, so time spent queued behind a blocking handler is included in
+the measured client latency.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 32 --requests 2000 --workers 4
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import httpx
+import numpy as np
+from backend.main import app
+from backend.models.recommender import content_recommender, collaborative_recommender
+from backend.utils.catalog import MovieCatalog
+from backend.utils.executor import configure_executor
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+class ServerThreadTransport(httpx.AsyncBaseTransport):
+    """Forward requests to the ASGI app running on a separate event loop."""
+    
+    def __init__(self, server_loop):
+        self.server_loop = server_loop
+        self.transport = httpx.ASGITransport(app=app)
+    
+    async def handle_async_request(self, request):
+        body = await request.aread()
+        request = httpx.Request(request.method, request.url, headers=request.headers, content=body)
+        
+        async def forward():
+            response = await self.transport.handle_async_request(request)
+            return response.status_code, response.headers, await response.aread()
+        
+        future = asyncio.run_coroutine_threadsafe(forward(), self.server_loop)
+        status_code, headers, content = await asyncio.wrap_future(future)
+        return httpx.Response(status_code, headers=headers, content=content)
+
+def start_server_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+async def run_load(requests, concurrency, server_loop):
+    """Issue requests with a fixed number of concurrent clients."""
+    latencies = {'content-based': [], 'collaborative': []}
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    
+    transport = ServerThreadTransport(server_loop)
+    async with httpx.AsyncClient(transport=transport, base_url='http://load-test') as client:
+        async def worker():
+            while not queue.empty():
+                route, params = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(f'/recommend/{route}', params=params)
+                response.raise_for_status()
+                latencies[route].append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    
+    return elapsed, latencies
+
+def build_requests(args):
+    rng = np.random.default_rng(args.seed)
+    requests = []
+    for _ in range(args.requests):
+        if rng.random() < args.slow_fraction:
+            requests.append(('collaborative', {'user_id': int(rng.integers(1, args.users + 1))}))
+        else:
+            requests.append(('content-based', {'movie_id': int(rng.integers(1, args.movies + 1))}))
+    return requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--movies', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--slow-fraction', type=float, default=0.2)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+    content_recommender.fit(catalog)
+    collaborative_recommender.fit(catalog, generate_ratings(args.users, args.movies, seed=args.seed))
+    requests = build_requests(args)
+    
+    server_loop = start_server_loop()
+    print(f"{'mode':>10} {'req/s':>8} {'route':>14} {'p50 ms':>9} {'p99 ms':>9}")
+    for label, workers in (('inline', 0), (f'{args.workers} threads', args.workers)):
+        configure_executor(workers)
+        elapsed, latencies = asyncio.run(run_load(requests, args.concurrency, server_loop))
+        for route, values in latencies.items():
+            p50, p99 = np.percentile(values, [50, 99])
+            print(f"{label:>10} {len(requests) / elapsed:>8.0f} {route:>14} {p50:>9.2f} {p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
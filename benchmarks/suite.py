@@ -0,0 +1,265 @@
+"""
+Reproducible benchmark suite for the recommenders and the API.
+Every scenario runs in a fresh process on seeded synthetic data and
+reports fit time, peak resident memory, single-call latency percentiles
+and QPS, and batch throughput. The api scenario measures end-to-end
+latency through the FastAPI app with an in-process ASGI client.
+
+Results are written as JSON (with the git commit and environment), so
+runs can be compared across commits with --compare.
+
+Usage:
+    python -m benchmarks.suite --movies 5000 --users 20000 --output results.json
+    python -m benchmarks.suite --output new.json --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+from backend.main import app
+from backend.models.recommender import (
+    ContentBasedRecommender,
+    CollaborativeFilteringRecommender,
+    MatrixFactorizationRecommender,
+    content_recommender,
+    collaborative_recommender,
+    factorization_recommender
+)
+from backend.utils.catalog import MovieCatalog
+from benchmarks.synthetic import generate_movies, generate_ratings
+
+SCENARIOS = ('content', 'content-topk', 'collaborative', 'collaborative-knn', 'factorization', 'api')
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def latency_summary(seconds):
+    """Percentiles (ms) and sequential QPS of per-call durations in seconds."""
+    milliseconds = np.asarray(seconds) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {
+        'calls': len(milliseconds),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'mean_ms': round(float(milliseconds.mean()), 4),
+        'qps': round(len(milliseconds) / float(np.sum(seconds)), 1)
+    }
+
+def build_model(scenario, args):
+    if scenario == 'content':
+        return ContentBasedRecommender()
+    if scenario == 'content-topk':
+        return ContentBasedRecommender(top_k=args.top_k, n_jobs=args.n_jobs)
+    if scenario == 'collaborative':
+        return CollaborativeFilteringRecommender()
+    if scenario == 'collaborative-knn':
+        return CollaborativeFilteringRecommender(n_neighbors=args.neighbors, n_jobs=args.n_jobs)
+    return MatrixFactorizationRecommender(n_factors=args.factors, n_jobs=args.n_jobs)
+
+def run_model(scenario, args, catalog, ratings_df):
+    """Fit one model and time single and batch recommendations."""
+    model = build_model(scenario, args)
+
+    start = time.perf_counter()
+    if scenario.startswith('content'):
+        model.fit(catalog)
+        ids = catalog.movie_ids
+    else:
+        model.fit(catalog, ratings_df)
+        ids = model.user_ids
+    fit_seconds = time.perf_counter() - start
+    fit_rss_mb = peak_rss_mb()
+
+    # Measure scoring, not the result cache
+    model.cache = None
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(ids, size=args.calls, replace=len(ids) < args.calls).tolist()
+
+    durations = []
+    for item_id in sample:
+        start = time.perf_counter()
+        model.recommend(item_id, args.limit)
+        durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, len(sample), args.batch_size):
+        model.recommend_many(sample[offset:offset + args.batch_size], args.limit)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'fit_seconds': round(fit_seconds, 4),
+        'fit_peak_rss_mb': round(fit_rss_mb, 1),
+        'single': latency_summary(durations),
+        'batch': {
+            'batch_size': args.batch_size,
+            'ids_per_second': round(len(sample) / batch_seconds, 1)
+        }
+    }
+
+async def time_requests(app, paths):
+    """Issue requests one at a time through an in-process ASGI client."""
+    transport = httpx.ASGITransport(app=app)
+    durations = []
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for path in paths:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            durations.append(time.perf_counter() - start)
+    return durations
+
+def run_api(args, catalog, ratings_df):
+    """Fit the serving models, then time each route end to end."""
+    start = time.perf_counter()
+    content_recommender.fit(catalog)
+    collaborative_recommender.fit(catalog, ratings_df)
+    factorization_recommender.fit(catalog, ratings_df)
+    fit_seconds = time.perf_counter() - start
+    for model in (content_recommender, collaborative_recommender, factorization_recommender):
+        model.cache = None
+
+    rng = np.random.default_rng(args.seed)
+    movie_ids = rng.choice(catalog.movie_ids, size=args.calls).tolist()
+    user_ids = rng.choice(collaborative_recommender.user_ids, size=args.calls).tolist()
+    routes = {
+        'content-based': [f'/recommend/content-based?movie_id={m}&limit={args.limit}' for m in movie_ids],
+        'collaborative': [f'/recommend/collaborative?user_id={u}&limit={args.limit}' for u in user_ids],
+        'collaborative-als': [
+            f'/recommend/collaborative?user_id={u}&limit={args.limit}&model=als' for u in user_ids
+        ]
+    }
+
+    return {
+        'fit_seconds': round(fit_seconds, 4),
+        'fit_peak_rss_mb': round(peak_rss_mb(), 1),
+        'routes': {
+            name: latency_summary(asyncio.run(time_requests(app, paths)))
+            for name, paths in routes.items()
+        }
+    }
+
+def run_scenario(scenario, args, queue):
+    """Entry point of a scenario's process."""
+    # Model progress messages would end up in the JSON report on stdout
+    sys.stdout = sys.stderr
+    catalog = MovieCatalog(generate_movies(args.movies, seed=args.seed))
+    ratings_df = generate_ratings(args.users, args.movies, args.ratings_per_user, seed=args.seed)
+    if scenario == 'api':
+        result = run_api(args, catalog, ratings_df)
+    else:
+        result = run_model(scenario, args, catalog, ratings_df)
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    queue.put(result)
+
+def measure(scenario, args):
+    """Run one scenario in a fresh process, so peak RSS is its own."""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=run_scenario, args=(scenario, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+def headline(result):
+    """The (name, value) figures compared across runs."""
+    figures = [
+        ('fit_seconds', result['fit_seconds']),
+        ('peak_rss_mb', result['peak_rss_mb'])
+    ]
+    if 'single' in result:
+        figures.append(('single p50_ms', result['single']['p50_ms']))
+        figures.append(('single p99_ms', result['single']['p99_ms']))
+        figures.append(('batch ids/s', result['batch']['ids_per_second']))
+    for route, summary in result.get('routes', {}).items():
+        figures.append((f'{route} p50_ms', summary['p50_ms']))
+        figures.append((f'{route} p99_ms', summary['p99_ms']))
+    return figures
+
+def compare(results, baseline):
+    """Print each headline figure next to a previous run's."""
+    print(f"\nvs {baseline['environment'].get('commit')} ({baseline['environment'].get('timestamp')})")
+    print(f"{'scenario':>18} {'metric':>28} {'before':>10} {'after':>10} {'change':>8}")
+    for scenario, result in results.items():
+        previous = baseline['results'].get(scenario)
+        if previous is None:
+            continue
+        before = {name: value for name, value in headline(previous)}
+        for name, value in headline(result):
+            if name in before and before[name]:
+                change = (value - before[name]) / before[name] * 100
+                print(f"{scenario:>18} {name:>28} {before[name]:>10.3f} {value:>10.3f} {change:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--movies', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--ratings-per-user', type=int, default=20)
+    parser.add_argument('--calls', type=int, default=500, help="Recommendations timed per scenario")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--top-k', type=int, default=50)
+    parser.add_argument('--neighbors', type=int, default=50)
+    parser.add_argument('--factors', type=int, default=32)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON results here (default: stdout)")
+    parser.add_argument('--compare', help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    for scenario in args.scenarios:
+        print(f"Running {scenario}...", file=sys.stderr)
+        results[scenario] = measure(scenario, args)
+
+    report = {
+        'environment': environment(),
+        'parameters': {
+            name: value for name, value in vars(args).items()
+            if name not in ('scenarios', 'output', 'compare')
+        },
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"Wrote results to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
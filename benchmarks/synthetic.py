@@ -0,0 +1,128 @@
+"""
+Seeded synthetic data generators for benchmarks.
+Produces DataFrames in the same schema as backend/data/movies.csv and
+backend/data/user_ratings.csv, and can write them out as a dataset for
+load_movies_data() / load_user_ratings().
+
+Usage:
+    python -m benchmarks.synthetic --movies 5000 --users 20000 --output /tmp/synthetic-data
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Comedy', 'Crime', 'Drama',
+    'Fantasy', 'Horror', 'Mystery', 'Romance', 'Sci-Fi', 'Thriller'
+]
+
+def generate_movies(n_movies, seed=0):
+    """
+    Generate a synthetic movie catalog.
+    
+    Args:
+        n_movies: Number of movies to generate
+        seed: Random seed
+    
+    Returns:
+        DataFrame with movie_id, title, genres, director, cast, rating,
+        year and description columns
+    """
+    rng = np.random.default_rng(seed)
+    n_directors = max(10, n_movies // 20)
+    n_actors = max(50, n_movies // 4)
+    
+    genre_counts = rng.integers(1, 4, size=n_movies)
+    genres = [
+        '|'.join(rng.choice(GENRES, size=count, replace=False))
+        for count in genre_counts
+    ]
+    directors = rng.integers(0, n_directors, size=n_movies)
+    cast = rng.integers(0, n_actors, size=(n_movies, 3))
+    
+    return pd.DataFrame({
+        'movie_id': np.arange(1, n_movies + 1),
+        'title': [f'Movie {i}' for i in range(1, n_movies + 1)],
+        'genres': genres,
+        'director': [f'Director{d}' for d in directors],
+        'cast': ['|'.join(f'Actor{a}' for a in row) for row in cast],
+        'rating': np.round(rng.uniform(5.0, 9.5, size=n_movies), 1),
+        'year': rng.integers(1970, 2024, size=n_movies),
+        'description': [f'Synthetic movie number {i}.' for i in range(1, n_movies + 1)]
+    })
+
+def generate_ratings(n_users, n_movies, ratings_per_user=20, n_factors=8, seed=0):
+    """
+    Generate synthetic user ratings from a low-rank taste model, so that
+    similar users genuinely rate movies alike.
+    
+    Args:
+        n_users: Number of users
+        n_movies: Number of movies (movie ids 1..n_movies)
+        ratings_per_user: Average number of ratings per user
+        n_factors: Rank of the latent taste model
+        seed: Random seed
+    
+    Returns:
+        DataFrame with user_id, movie_id, rating columns (integer 1-5)
+    """
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(size=(n_users, n_factors))
+    movie_factors = rng.normal(size=(n_movies, n_factors))
+    
+    # Popularity-skewed movie sampling, a few duplicates are dropped below
+    popularity = 1.0 / np.arange(1, n_movies + 1) ** 0.8
+    popularity /= popularity.sum()
+    counts = np.maximum(1, rng.poisson(ratings_per_user, size=n_users))
+    user_idx = np.repeat(np.arange(n_users), counts)
+    movie_idx = rng.choice(n_movies, size=len(user_idx), p=popularity)
+    
+    affinity = np.einsum('ij,ij->i', user_factors[user_idx], movie_factors[movie_idx])
+    raw = 3.0 + affinity / np.sqrt(n_factors) * 1.5 + rng.normal(scale=0.5, size=len(user_idx))
+    
+    ratings_df = pd.DataFrame({
+        'user_id': user_idx + 1,
+        'movie_id': movie_idx + 1,
+        'rating': np.clip(np.rint(raw), 1, 5).astype(int)
+    })
+    return ratings_df.drop_duplicates(['user_id', 'movie_id']).reset_index(drop=True)
+
+def write_dataset(directory, n_movies, n_users, ratings_per_user=20, seed=0):
+    """
+    Write movies.csv and user_ratings.csv into a directory.
+    
+    Args:
+        directory: Target directory (created if missing)
+        n_movies: Number of movies
+        n_users: Number of users
+        ratings_per_user: Average number of ratings per user
+        seed: Random seed
+    
+    Returns:
+        Tuple of (movie count, rating count)
+    """
+    os.makedirs(directory, exist_ok=True)
+    movies_df = generate_movies(n_movies, seed=seed)
+    ratings_df = generate_ratings(n_users, n_movies, ratings_per_user, seed=seed)
+    movies_df.to_csv(os.path.join(directory, 'movies.csv'), index=False)
+    ratings_df.to_csv(os.path.join(directory, 'user_ratings.csv'), index=False)
+    return len(movies_df), len(ratings_df)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic movies/ratings dataset.")
+    parser.add_argument('--movies', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--ratings-per-user', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help="Target directory")
+    args = parser.parse_args()
+    
+    n_movies, n_ratings = write_dataset(
+        args.output, args.movies, args.users, args.ratings_per_user, args.seed
+    )
+    print(f"Wrote {n_movies} movies and {n_ratings} ratings to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Script to fit the models and persist their artifacts for fast startup
+# Usage: ./scripts/build-artifacts.sh [--output DIR]
+
+echo "Building model artifacts..."
+python3 -m backend.build_artifacts "$@"
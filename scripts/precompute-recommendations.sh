@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Script to precompute top-N recommendation lists for all movies and users
+# Usage: ./scripts/precompute-recommendations.sh [--top-n 50] [--workers 4]
+
+echo "Precomputing recommendations..."
+python3 -m backend.precompute "$@"